@@ -0,0 +1,467 @@
+"""
+Benchmarks for the engine and render hot paths.
+
+Every benchmark is timed like ``timeit``: the call is repeated until a run takes
+at least ``MIN_RUN_TIME`` seconds, the run is repeated ``REPEATS`` times and the
+fastest time per call is kept. Rendering runs under the SDL dummy video driver,
+so no window is opened. Startup benchmarks time a fresh interpreter importing
+the engine or the render layer.
+
+Memory benchmarks (``memory.*``) report the bytes held per object instead,
+measured with ``tracemalloc`` over many copies; a larger value is a regression
+just like a slower time.
+
+Usage:
+
+    python benchmarks/run.py --save benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json --threshold 0.25
+
+``--compare`` exits with status 1 when a benchmark is slower than the baseline
+by more than the threshold (0.25 = 25%).
+"""
+
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Render off-screen
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import time
+
+from typing import Callable, Dict, List, Optional
+
+
+MIN_RUN_TIME = 0.2
+REPEATS = 5
+
+# Standard positions, as moves played from the empty board with player 1 first
+POSITIONS = {
+    "empty": [],
+    "opening": [(1, 1), (0, 0)],
+    "midgame": [(1, 1), (0, 0), (2, 1), (0, 2)],
+    "won": [(0, 0), (0, 1), (2, 0), (0, 0), (0, 1)],
+}
+
+_benchmarks: List[tuple] = []
+_memory_benchmarks: List[tuple] = []
+
+# Objects built by every memory benchmark
+MEMORY_COUNT = 10000
+
+
+def benchmark(name: str, repeats: int = REPEATS, min_time: float = MIN_RUN_TIME):
+    """Register a benchmark factory: it returns the callable to time, after any setup."""
+    def register(factory: Callable[[], Callable[[], None]]):
+        _benchmarks.append((name, factory, repeats, min_time))
+        return factory
+    return register
+
+
+def memory_benchmark(name: str, count: int = MEMORY_COUNT):
+    """Register a memory benchmark factory: it returns a callable building one object to measure."""
+    def register(factory: Callable[[], Callable[[], object]]):
+        _memory_benchmarks.append((name, factory, count))
+        return factory
+    return register
+
+
+def position(name: str, size: int = 3, win_length: int = 3):
+    from src.game import Game
+    game = Game(ai_first=False, size=size, win_length=win_length)
+    for move in POSITIONS[name]:
+        game.make_move(*move)
+    return game
+
+
+def measure_memory(build: Callable[[], object], count: int) -> float:
+    """Return the bytes held per object, building ``count`` of them."""
+    import tracemalloc
+    # Shared tables and caches are built once, outside the measurement
+    build()
+    tracemalloc.start()
+    objects = [None] * count
+    start = tracemalloc.get_traced_memory()[0]
+    for index in range(count):
+        objects[index] = build()
+    held = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return held / count
+
+
+def time_call(function: Callable[[], None], repeats: int, min_time: float) -> float:
+    """Return the fastest time per call in seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 24:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    best = elapsed / number
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+##### ENGINE #####
+
+for _name in POSITIONS:
+    def _final_state(name=_name):
+        game = position(name)
+        return game.final_state
+    benchmark(f"game.final_state[{_name}]")(_final_state)
+
+    def _empty_squares(name=_name):
+        game = position(name)
+        return game.get_empty_squares
+    benchmark(f"game.get_empty_squares[{_name}]")(_empty_squares)
+
+
+@benchmark("game._mark_move[empty]")
+def _mark_move():
+    game = position("empty")
+    masks, hashes = list(game.masks), list(game.hashes)
+
+    def mark():
+        game._mark_move(1, 1, 1)
+        # Put the board back without timing a second move
+        game.masks[:] = masks
+        game.hashes[:] = hashes
+        game.marked_squares = 0
+    return mark
+
+
+@benchmark("game.make_move+unmake_move[midgame]")
+def _make_unmake():
+    game = position("midgame")
+
+    def make_unmake():
+        game.make_move(2, 2)
+        game.unmake_move()
+    return make_unmake
+
+
+@benchmark("record.encode+decode[midgame]")
+def _record_round_trip():
+    from src import record
+    game_record = record.GameRecord.from_game(position("midgame"), (None, 1))
+    header = record.HEADER.size
+
+    def round_trip():
+        data = record.encode(game_record)
+        record.decode(data[:header], data[header:])
+    return round_trip
+
+
+##### AI #####
+
+def _ai_eval(level: int, name: str, size: int = 3, win_length: int = 3):
+    from src.ai import AI
+    game = position(name, size, win_length)
+    ai = AI(game, level=level, player=game.current_player)
+    # Measure the search itself, not the tablebase or the opening book
+    ai._probe = lambda game: None
+    ai._book = lambda game: None
+
+    def evaluate():
+        ai.table.clear()
+        ai.eval(game)
+    return evaluate
+
+
+for _level in (0, 1, 2, 3):
+    for _name in ("empty", "opening", "midgame"):
+        benchmark(f"ai.eval[level={_level},{_name}]", repeats=3, min_time=0.05)(
+            lambda level=_level, name=_name: _ai_eval(level, name)
+        )
+
+
+@benchmark("ai.eval[mcts,5x5 empty]", repeats=3, min_time=0.05)
+def _ai_mcts():
+    import random
+    from src.ai import AI, MCTS_LEVEL
+    game = position("empty", 5, 4)
+    ai = AI(game, level=MCTS_LEVEL, player=game.current_player, node_limit=1024, rng=random.Random(0))
+
+    def evaluate():
+        # A fresh tree every time, so no playouts are reused
+        ai.mcts.clear()
+        ai.eval(game)
+    return evaluate
+
+
+@benchmark("ai.eval[book,empty]")
+def _ai_book():
+    from src import book
+    from src.ai import AI
+    if book.load() is None:
+        return None
+    game = position("empty")
+    ai = AI(game, player=game.current_player)
+    ai._probe = lambda game: None
+
+    return lambda: ai.eval(game)
+
+
+@benchmark("ai.eval[tablebase,empty]")
+def _ai_tablebase():
+    from src import tablebase
+    from src.ai import AI
+    if tablebase.load() is None:
+        return None
+    game = position("empty")
+    ai = AI(game, player=game.current_player)
+
+    return lambda: ai.eval(game)
+
+
+##### RENDER #####
+
+def _render_setup(name: str):
+    try:
+        import pygame
+    except ImportError:
+        return None
+    from src import constants
+    from src.board import Board
+    pygame.init()
+    screen = pygame.display.set_mode((constants.WIDTH, constants.HEIGHT))
+    game = position(name)
+    return pygame, screen, game, Board(constants.WIDTH, constants.HEIGHT, game)
+
+
+@benchmark("board.draw_figures[midgame]")
+def _draw_figures():
+    setup = _render_setup("midgame")
+    if setup is None:
+        return None
+    _, screen, _, board = setup
+    return lambda: board.draw_figures(screen)
+
+
+@benchmark("render.frame[midgame]")
+def _frame():
+    setup = _render_setup("midgame")
+    if setup is None:
+        return None
+    pygame, screen, game, board = setup
+    from src import constants
+
+    def frame():
+        screen.fill(constants.BACKGROUND_COLOR)
+        board.draw(screen)
+        board.draw_figures(screen)
+        board.draw_turn_indicator(screen, game.get_current_player_symbol())
+        pygame.display.update()
+    return frame
+
+
+@benchmark("render.frame[won]")
+def _frame_won():
+    setup = _render_setup("won")
+    if setup is None:
+        return None
+    pygame, screen, game, board = setup
+    from src import constants
+
+    def frame():
+        screen.fill(constants.BACKGROUND_COLOR)
+        board.draw(screen)
+        board.draw_figures(screen)
+        board.draw_win_line(screen)
+        board.draw_winner_announcement(screen, game.winner)
+        pygame.display.update()
+    return frame
+
+
+@benchmark("render.dirty_frame[idle]")
+def _dirty_frame_idle():
+    setup = _render_setup("midgame")
+    if setup is None:
+        return None
+    pygame, screen, game, board = setup
+
+    def frame():
+        dirty = board.render(screen)
+        dirty += board.draw_turn_indicator(screen, game.get_current_player_symbol())
+        if dirty:
+            pygame.display.update(dirty)
+    return frame
+
+
+@benchmark("render.dirty_frame[move]")
+def _dirty_frame_move():
+    setup = _render_setup("midgame")
+    if setup is None:
+        return None
+    pygame, screen, game, board = setup
+
+    def frame():
+        # One frame after a move and one after taking it back
+        for step in (lambda: game.make_move(2, 2), game.unmake_move):
+            step()
+            dirty = board.render(screen)
+            dirty += board.draw_turn_indicator(screen, game.get_current_player_symbol())
+            pygame.display.update(dirty)
+    return frame
+
+
+@benchmark("render.rotation_frame[midgame]")
+def _rotation_frame():
+    setup = _render_setup("midgame")
+    if setup is None:
+        return None
+    pygame, screen, _, board = setup
+    board.start_rotation(0)
+
+    def frame():
+        # A new frame of the animation each call, from the cached frames
+        board._rotation = board._rotation[:2] + (None,)
+        pygame.display.update(board.draw_rotation(screen, board.ROTATION_MS // 2))
+    return frame
+
+
+@benchmark("render.selection_screen")
+def _selection_screen():
+    setup = _render_setup("empty")
+    if setup is None:
+        return None
+    pygame, screen, _, board = setup
+
+    def frame():
+        board.draw_selection_screen(screen)
+        pygame.display.update()
+    return frame
+
+
+@benchmark("render.game_over_overlay[won]")
+def _game_over_overlay():
+    setup = _render_setup("won")
+    if setup is None:
+        return None
+    _, screen, game, board = setup
+    return lambda: board.draw_winner_announcement(screen, game.winner)
+
+
+##### MEMORY #####
+
+for _name in ("empty", "midgame"):
+    memory_benchmark(f"memory.game[{_name}]")(lambda name=_name: position(name).copy)
+    memory_benchmark(f"memory.game_state[{_name}]")(lambda name=_name: position(name).snapshot)
+
+
+##### STARTUP #####
+
+def _import_time(modules: str):
+    import subprocess
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-c", f"import {modules}"]
+    return lambda: subprocess.run(command, cwd=root, check=True, stdout=subprocess.DEVNULL)
+
+
+# A fresh interpreter for every call; the bare interpreter is the floor of the others
+for _name, _modules in (("python", "sys"), ("engine", "src.game, src.ai"), ("render", "src.board")):
+    benchmark(f"startup.import[{_name}]", repeats=5, min_time=0)(
+        lambda modules=_modules: _import_time(modules)
+    )
+
+
+##### RUNNER #####
+
+def run(selected: Optional[str] = None) -> Dict[str, float]:
+    """
+    Run the benchmarks whose name contains ``selected``.
+
+    Returns:
+        Dict[str, float]: Seconds per call, or bytes per object for memory
+        benchmarks, for every benchmark that could run.
+    """
+    results = {}
+    for name, factory, repeats, min_time in _benchmarks:
+        if selected and selected not in name:
+            continue
+        function = factory()
+        if function is None:
+            print(f"{name:45} skipped")
+            continue
+        results[name] = time_call(function, repeats, min_time)
+        print(f"{name:45} {results[name] * 1e6:14.3f} us", flush=True)
+    for name, factory, count in _memory_benchmarks:
+        if selected and selected not in name:
+            continue
+        results[name] = measure_memory(factory(), count)
+        print(f"{name:45} {results[name]:14.1f} B", flush=True)
+    return results
+
+
+def _display(name: str, value: float) -> float:
+    """Show times in microseconds and memory in bytes."""
+    return value if name.startswith("memory.") else value * 1e6
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    Returns:
+        List[str]: Names of the benchmarks slower than the baseline by more than ``threshold``.
+    """
+    regressions = []
+    print(f"\n{'benchmark':45} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        change = seconds / baseline[name] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:45} {_display(name, baseline[name]):14.3f} {_display(name, seconds):14.3f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the engine and render hot paths")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", default=None, help="write the results to this JSON baseline")
+    parser.add_argument("--compare", default=None, help="compare the results with this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({
+                "machine": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "processor": platform.processor(),
+                },
+                "results": results,
+            }, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,22 +2,41 @@
 
 from src.board import Board
 from src import constants
+from src import text
 from src.game import Game
-from src.ai import AI
+from src.ai import AI, ANALYSIS_TOP_MOVES, MCTS_LEVEL
+from src.worker import AIWorker, AnalysisWorker
 
+import argparse
 import pygame
 import sys
 
 
+parser = argparse.ArgumentParser(description="Twist Tac Toe")
+parser.add_argument("--size", type=int, default=constants.BOARD_SIZE, help="rows and columns of the board")
+parser.add_argument("--win-length", type=int, default=constants.WIN_LENGTH, help="marks in a row needed to win")
+args = parser.parse_args()
+
 pygame.init()
 screen = pygame.display.set_mode((constants.WIDTH, constants.HEIGHT))
-clock = pygame.time.Clock()
 
 ##### Instance of Class
 
-game = Game(ai_first=False)
+game = Game(ai_first=False, size=args.size, win_length=args.win_length)
 board = Board(constants.WIDTH, constants.HEIGHT, game)
 ai = AI(game)
+# Posted by the AI worker when its move is ready, so the idle loop wakes up
+AI_MOVE_READY = pygame.USEREVENT + 1
+# Searches for the AI's move off the render thread
+ai_worker = AIWorker(on_done=lambda: pygame.event.post(pygame.event.Event(AI_MOVE_READY)))
+# Posted by the analysis worker when the scores of a position are ready
+ANALYSIS_READY = pygame.USEREVENT + 2
+# Scores the moves of the positions shown while the analysis overlay is on:
+# every move on 3x3, only the best ones on bigger boards
+analysis_worker = AnalysisWorker(
+    AI(game, level=2), on_done=lambda: pygame.event.post(pygame.event.Event(ANALYSIS_READY)),
+    top=None if game.size <= 3 else ANALYSIS_TOP_MOVES,
+)
 
 # Add title
 pygame.display.set_caption("TIC-TAC-TOE")
@@ -28,11 +47,22 @@ running = True
 game_over = False
 game_started = False
 vs_ai = False
+# Toggled with the A key
+show_analysis = False
+# Board the game over screen was last drawn for
+game_over_drawn = None
+# The selection screen is only redrawn when shown or when the hovered button changes
+selection_dirty = True
+hovered_button = None
+button_rects = []
 
 ai_level = 0
+AI_NAMES = {0: 'Random', 1: 'Minimax', MCTS_LEVEL: 'MCTS'}
 #### RESET GAME
 def reset_game() -> None:
-    global game, board, ai, game_over, game_started, vs_ai, ai_level
+    global game, board, ai, game_over, game_started, vs_ai, ai_level, selection_dirty
+    ai_worker.cancel()
+    analysis_worker.clear()
     game.reset()
     board = Board(constants.WIDTH, constants.HEIGHT, game)
     ai = AI(game, ai_level) if vs_ai else None
@@ -40,37 +70,66 @@ def reset_game() -> None:
     game_started = False
     vs_ai = False
     ai_level = 0
+    selection_dirty = True
 
 
 def draw_dimmed_board(screen, board, winner_text):
     """Draw a dimmed board with winner announcement."""
-    dim_surface = pygame.Surface((constants.WIDTH, constants.HEIGHT), pygame.SRCALPHA)
-    dim_surface.fill((0, 0, 0, 128))  # Semi-transparent black
-    screen.blit(dim_surface, (0, 0))
-    
-    font = pygame.font.Font(None, 74)
-    text_surface = font.render(winner_text, True, (255, 255, 255))
+    # Semi-transparent black, built once for the window size
+    screen.blit(text.overlay(screen.get_size(), (0, 0, 0, 128)), (0, 0))
+
+    text_surface = text.render(winner_text, (255, 255, 255), 74)
     text_rect = text_surface.get_rect(center=(constants.WIDTH // 2, constants.HEIGHT // 2))
     screen.blit(text_surface, text_rect)
 
 
 ##### MAIN LOOP #####
 
-# To run the window, use the loop
+# To run the window, use the loop. It sleeps in pygame.event.wait until there
+# is input, an AI move or an animation step, so an idle window costs no CPU.
 while running:
+    #### SELECTION SCREEN ####
+    if not game_started and selection_dirty:
+        button_rects = board.draw_selection_screen(screen)
+        pygame.display.update()
+        selection_dirty = False
+
+    # Only the animations need to wake up without an event
+    if board.rotating:
+        timeout = Board.ROTATION_MS // Board.ROTATION_FRAMES
+    elif ai_worker.busy:
+        timeout = Board.THINKING_STEP_MS - pygame.time.get_ticks() % Board.THINKING_STEP_MS
+    else:
+        timeout = 0  # Wait for the next event
+    events = [pygame.event.wait(timeout)] + pygame.event.get()
+
     # pygame.QUIT event means the user clicked X to close the window.
-    for event in pygame.event.get():
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
 
+        if event.type == pygame.WINDOWEXPOSED:
+            # The window contents were lost, paint everything again
+            selection_dirty = True
+            board.invalidate()
+            game_over_drawn = None
+
         if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
             reset_game()
             continue
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_a:
+            show_analysis = not show_analysis
+            continue
             
         
-        #### SELECTION SCREEN ####
         if not game_started:
-            button_rects = board.draw_selection_screen(screen)
+            if event.type == pygame.MOUSEMOTION:
+                # Keep the hover highlight responsive without redrawing on every motion
+                hovered = next((i for i, rect in enumerate(button_rects) if rect.collidepoint(event.pos)), None)
+                if hovered != hovered_button:
+                    hovered_button = hovered
+                    selection_dirty = True
             if event.type == pygame.MOUSEBUTTONDOWN:
                 for i, rect in enumerate(button_rects):
                     if rect.collidepoint(event.pos):
@@ -85,9 +144,15 @@ while running:
                             vs_ai = True
                             ai_level = 1
                             ai = AI(game, ai_level)
+                        elif i == 3:
+                            vs_ai = True
+                            ai_level = MCTS_LEVEL
+                            ai = AI(game, ai_level)
         else:
+            # Clicks are ignored while the AI is thinking or the board is turning
+            ai_turn = vs_ai and game.current_player == 2 and game.gamemode == 'ai'
             # If the mouse is clicked it will switch to
-            if not game_over and event.type == pygame.MOUSEBUTTONDOWN:
+            if not game_over and not ai_turn and not board.rotating and event.type == pygame.MOUSEBUTTONDOWN:
                 # How to access the coordinate to link the console board to the GUI
                 # MOUSEBUTTONDOWN -> Return position
                 # https://www.pygame.org/docs/ref/event.html#pygame.event.get
@@ -102,7 +167,11 @@ while running:
 
                 # Vs Player
                 current_player_symbol = game.get_current_player_symbol()
+                marked_squares = game.marked_squares
                 game_state = game.handle_move(clicked_row, clicked_col)
+                if game.marked_squares != marked_squares:
+                    # Clicks on taken cells do not move, nor turn the board
+                    board.start_rotation(pygame.time.get_ticks())
                 if game_state != "continue":
                     game_over = True
                     if game_state == "draw":
@@ -111,36 +180,58 @@ while running:
                     else:
                         winner_text = f"Player {current_player_symbol} wins!"
 
-
-                # Vs AI
-                if not game_over and vs_ai and game.current_player == 2 and game.gamemode == 'ai':
-                    pygame.display.update()
-                    #game_state = game.handle_ai_move(ai)
-                    ai_move = ai.eval(game)
-                    if ai_move:
-                        row, col = ai_move
-                        game_state = game.handle_move(row, col)
-                        if game_state != "continue":
-                            game_over = True
-                            if game_state == "draw":
-                                winner_text = "It's a draw!"
-                            elif game_state == "player_2_win":
-                                winner_text = f"AI ({['Random', 'Minimax'][ai_level]}) wins!"
-
-        if game_started:
-            screen.fill(constants.BACKGROUND_COLOR)
-            board.draw(screen)
-            board.draw_figures(screen)
-            if game_over:
+    # Vs AI: search in the background and play the move once it is ready
+    if game_started and not game_over and vs_ai and game.current_player == 2 and game.gamemode == 'ai':
+        if not ai_worker.busy:
+            # Leave the CPU to the AI
+            analysis_worker.cancel()
+            ai_worker.start(ai, game)
+        # The AI's move waits until the human's move has finished turning the board
+        ready, ai_move = ai_worker.poll() if not board.rotating else (False, None)
+        if ready and ai_move:
+            row, col = ai_move
+            game_state = game.handle_move(row, col)
+            board.start_rotation(pygame.time.get_ticks())
+            if game_state != "continue":
+                game_over = True
+                if game_state == "draw":
+                    winner_text = "It's a draw!"
+                elif game_state == "player_2_win":
+                    winner_text = f"AI ({AI_NAMES[ai_level]}) wins!"
+
+    if game_started and board.rotating:
+        # The position, the status and the scores are shown once the board has turned
+        dirty = board.draw_rotation(screen, pygame.time.get_ticks())
+        if dirty:
+            pygame.display.update(dirty)
+    if game_started and not board.rotating:
+        # Only the areas that changed since the last frame are repainted
+        dirty = board.render(screen)
+        if game_over:
+            if game_over_drawn is not board:
+                # The dimmed overlay is blended once over a freshly painted board
+                board.invalidate()
+                board.render(screen)
                 board.draw_win_line(screen)
                 draw_dimmed_board(screen, board, winner_text)
                 # board.display_restart_message(screen)
-            else:
-                current_player_symbol = game.get_current_player_symbol()
-                board.draw_turn_indicator(screen, current_player_symbol)
-        
-    pygame.display.update()
-    clock.tick(60)
-
+                game_over_drawn = board
+                dirty = [board.rect]
+        elif ai_worker.busy:
+            dirty += board.draw_thinking_indicator(screen, pygame.time.get_ticks())
+        else:
+            current_player_symbol = game.get_current_player_symbol()
+            dirty += board.draw_turn_indicator(screen, current_player_symbol)
+        if not game_over:
+            # Each position is analyzed once in the background, then drawn from the cache
+            analysis = None
+            if show_analysis and not ai_worker.busy:
+                analysis = analysis_worker.get(game)
+            dirty += board.draw_analysis(screen, analysis)
+        if dirty:
+            pygame.display.update(dirty)
+
+ai_worker.cancel()
+analysis_worker.cancel()
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -1,4 +1,14 @@
-from . import board
+"""
+Twist Tac Toe.
+
+The engine (``game``, ``ai`` and the modules they use) is plain Python and
+imports without pygame or NumPy, so headless workers start quickly. The
+rendering layer (``board``, ``text``) needs pygame and is only imported when it
+is first used (PEP 562).
+"""
+
+import importlib
+
 from . import constants
 from . import game
 
@@ -6,4 +16,15 @@ __all__ = [
     "board", 
     "constants",
     "game",
-]
\ No newline at end of file
+]
+
+# Submodules that import pygame, loaded on first attribute access
+_LAZY_MODULES = ("board", "text")
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
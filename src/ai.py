@@ -2,19 +2,128 @@
 AI module for playing a game of Tic Tac Toe.
 
 This module contains the AI class which is responsible for making moves in the game 
-using random selection or the minimax algorithm with alpha-beta pruning.
+using random selection, a lookup in the perfect-play tablebase (see ``tablebase``)
+or in the opening book (see ``book``), or the minimax algorithm with alpha-beta pruning, or a Monte Carlo tree search
+(see ``mcts``) for boards too big for minimax.
+
+Minimax runs as an iterative-deepening search under a per-move budget, so it
+always answers in bounded time, even on boards too big to search completely.
+With ``workers`` set, every iteration splits the root moves over a process
+pool instead (see ``AI._parallel_search``).
+
+Every move produces a ``SearchStats`` record. It is handed to the ``on_search``
+hook of the AI and logged at DEBUG level on the ``src.ai`` logger; neither
+costs anything when unused.
 
 Classes:
+    SearchBudget: Limits of a single minimax search.
+    SearchStats: What the AI did to pick a move.
+    MoveScore: Score of one move in an analysis of every legal move.
     AI: A class to represent the AI player in the game.
 """
 
 
+import logging
+import math
+import multiprocessing
 import random
-import copy
-import numpy as np
+import time
 
-from typing import Optional, Tuple
+from concurrent import futures
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from . import book
 from . import game
+from . import symmetry
+from . import tablebase
+from . import transposition
+from .game import Game, GameState
+
+
+class SearchBudget(NamedTuple):
+    """
+    Limits of a single minimax search. None means unlimited.
+
+    Attributes:
+        time_limit (float): Wall-clock seconds per move.
+        node_limit (int): Positions searched per move.
+        max_depth (int): Deepest iteration, in plies.
+    """
+    time_limit: Optional[float] = None
+    node_limit: Optional[int] = None
+    max_depth: Optional[int] = None
+
+
+class SearchStats(NamedTuple):
+    """
+    What the AI did to pick one move.
+
+    Attributes:
+        method (str): "random", "tablebase", "book", "minimax" or "mcts".
+        value (float): Score of the move from the AI's point of view, 0 for random moves.
+        move (Optional[Tuple[int, int]]): The move played, None if there was none.
+        nodes (int): Positions searched, or random playouts for MCTS.
+        cutoffs (int): Alpha-beta cutoffs.
+        tt_hits (int): Transposition table lookups that found the position.
+        depth (int): Deepest minimax iteration that completed, or deepest MCTS node, in plies.
+        elapsed (float): Wall-clock seconds spent choosing the move.
+    """
+    method: str
+    value: float = 0
+    move: Optional[Tuple[int, int]] = None
+    nodes: int = 0
+    cutoffs: int = 0
+    tt_hits: int = 0
+    depth: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def nps(self) -> float:
+        """Nodes searched per second."""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class MoveScore(NamedTuple):
+    """
+    Score of one legal move, from the point of view of the player making it.
+
+    Attributes:
+        value (float): Minimax value of the move: at least 1 for a win, at most -1
+            for a loss, otherwise a draw or a heuristic score.
+        plies (Optional[int]): Plies until the game ends with best play, counting
+            the move itself, None if the search did not reach the end of the game.
+    """
+    value: float
+    plies: Optional[int] = None
+
+    @property
+    def outcome(self) -> Optional[int]:
+        """1 for a win, 0 for a draw, -1 for a loss, None if the move was not solved."""
+        if self.plies is None:
+            return None
+        return (self.value > 0) - (self.value < 0)
+
+
+logger = logging.getLogger(__name__)
+
+# Minimax difficulty levels. Higher levels search longer and deeper; levels
+# above the highest one use the highest budget.
+LEVEL_BUDGETS = {
+    1: SearchBudget(time_limit=0.5),
+    2: SearchBudget(time_limit=2.0),
+    3: SearchBudget(time_limit=5.0),
+}
+
+# Moves scored exactly by the analysis overlay on boards bigger than 3x3,
+# where scoring every move would cost about a full search per move
+ANALYSIS_TOP_MOVES = 3
+
+# Level that plays with Monte Carlo tree search instead of minimax. Its node
+# limit counts random playouts.
+MCTS_LEVEL = 4
+MCTS_BUDGET = SearchBudget(time_limit=2.0)
+
+# The budget is checked once every this many nodes
+_BUDGET_CHECK_INTERVAL = 1024
 
 
 class AI:
@@ -22,16 +131,49 @@ class AI:
     AI Player for a game.
 
     This class implements an AI player that can make moves using either
-    random selection or the minimax algorithm with alpha-beta pruning.
+    random selection, perfect play or Monte Carlo tree search. Perfect play is answered from the
+    memory-mapped tablebase when it has been built, from the opening book
+    in the first plies of a game, and falls back to the minimax algorithm with
+    alpha-beta pruning otherwise.
+
+    Minimax deepens one ply at a time until the search budget of its level
+    runs out, and plays the best move of the last completed iteration. It is
+    implemented as a negamax principal variation search with move ordering
+    (winning moves, blocks, killer moves, history, center and corners).
+    Positions at the depth limit are scored by ``heuristic``. Results are
+    cached in a transposition table that is kept between moves and cleared
+    when the game is reset.
+
+    Level MCTS_LEVEL plays with Monte Carlo tree search instead, which scales
+    to boards where minimax cannot see far. Its tree is also kept between moves.
 
     Attributes:
         game: The game instance.
-        level (int): The AI difficulty level (0 for random, 1+ for minimax).
+        level (int): The AI difficulty level (0 for random, 1 to 3 for minimax, MCTS_LEVEL for MCTS).
         player (int): The player number for this AI (usually 2).
         opponent (int): The opponent's player number.
+        table (transposition.TranspositionTable): Cache of minimax results.
+        budget (SearchBudget): Limits of each minimax or MCTS search.
+        rng (random.Random): Source of randomness for random moves.
+        stop_event (threading.Event): When set, the running search stops as soon as
+            it next checks its budget and the AI returns no move.
+        on_search (callable): Called with the SearchStats of every move, or None.
+        stats (SearchStats): Statistics of the last move, None before the first one.
+        workers (int): Processes searching the root moves in parallel, 0 or 1 to search in this process.
     """
 
-    def __init__(self, game, level: Optional[int] = 1, player: Optional[int] = 2) -> None:
+    def __init__(self,
+                 game,
+                 level: Optional[int] = 1,
+                 player: Optional[int] = 2,
+                 table_size: int = 1 << 16,
+                 replacement: str = "depth",
+                 time_limit: Optional[float] = None,
+                 node_limit: Optional[int] = None,
+                 rng: Optional[random.Random] = None,
+                 on_search: Optional[Callable[[SearchStats], None]] = None,
+                 workers: int = 0
+    ) -> None:
         """
         Initialize the AI player.
 
@@ -39,11 +181,59 @@ class AI:
             game: The game instance.
             level (int): The AI difficulty level (default is 1).
             player (int): The player number for this AI (default is 2).
+            table_size (int): Maximum transposition table entries (default is 65536).
+            replacement (str): Table replacement policy, "depth" or "lru" (default is "depth").
+            time_limit (float, optional): Seconds per move, overrides the level's budget.
+            node_limit (int, optional): Nodes per move, overrides the level's budget.
+            rng (random.Random, optional): Seeded source of randomness. Defaults to the random module.
+            on_search (callable, optional): Called with the SearchStats of every move.
+            workers (int): Processes for a parallel minimax search (default is 0, search in
+                this process). Call ``close`` to stop them.
         """
         self.game = game
         self.level = level
         self.player = player
         self.opponent = 1 if player == 2 else 2
+        self.rng = rng if rng is not None else random
+        self.table = transposition.TranspositionTable(table_size, replacement)
+        self._table_generation = game.generation
+
+        if level == MCTS_LEVEL:
+            budget = MCTS_BUDGET
+        else:
+            budget = LEVEL_BUDGETS[min(max(level or 1, 1), max(LEVEL_BUDGETS))]
+        if time_limit is not None:
+            budget = budget._replace(time_limit=time_limit)
+        if node_limit is not None:
+            budget = budget._replace(node_limit=node_limit)
+        self.budget = budget
+        self.stop_event = None
+        self.on_search = on_search
+        self.stats = None
+        self.mcts = None
+        if level == MCTS_LEVEL:
+            # MCTS needs NumPy, which the other levels do without
+            from . import mcts
+            self.mcts = mcts.MCTS(rng=self.rng)
+
+        self.workers = workers
+        self._pool = None
+        self._shared_alpha = None
+        self._shared_stop = None
+
+        # State of the running search; the defaults make minimax exhaustive
+        self._max_depth = float('inf')
+        self._deadline = None
+        self._node_limit = None
+        self._nodes = 0
+        self._cutoffs = 0
+        self._depth = 0
+        self._worker_hits = 0
+        self._aborted = False
+        self._cutoff = False
+        # Move ordering heuristics of the running search
+        self._history = []
+        self._killers = []
 
 
     def random_choice(self, game) -> Optional[Tuple[int, int]]:
@@ -58,10 +248,7 @@ class AI:
         """ 
         empty_cells = game.get_empty_squares()
         if empty_cells:
-            move = random.choice(empty_cells)
-            print(f"Random choice selected: {move}")  # Add this line
-            return move
-        print("No empty cells available")  
+            return self.rng.choice(empty_cells)
         return None
 
     def minimax(self, 
@@ -70,10 +257,12 @@ class AI:
                 alpha: float, 
                 beta: float, 
                 maximizing_player: bool
-    ) -> Tuple[int, Optional[Tuple[int, int]]]:
+    ) -> Tuple[float, Optional[Tuple[int, int]]]:
         """
         Implement the minimax algorithm with alpha-beta pruning.
 
+        Runs ``negamax`` and turns its score back into this AI's point of view.
+
         Args:
             game: The game instance.
             depth (int): The current depth in the game tree.
@@ -84,102 +273,717 @@ class AI:
         Returns:
             Tuple[float, Optional[Tuple[int, int]]]: The evaluation value and the best move.
         """
+        if maximizing_player:
+            return self.negamax(game, depth, alpha, beta)
+        value, move = self.negamax(game, depth, -beta, -alpha)
+        return -value, move
+
+    def negamax(self,
+                game,
+                depth: int,
+                alpha: float,
+                beta: float
+    ) -> Tuple[float, Optional[Tuple[int, int]]]:
+        """
+        Search a position with alpha-beta pruning, scoring it for the player to move.
+
+        Moves are tried best-first (see ``_ordered_moves``). The first move is
+        searched with the full window and the others with a null window, only
+        searching again when one of them turns out better (principal
+        variation search).
+
+        Args:
+            game: The game instance, searched in place and restored before returning.
+            depth (int): The current depth in the game tree.
+            alpha (float): The alpha value for pruning.
+            beta (float): The beta value for pruning.
+
+        Returns:
+            Tuple[float, Optional[Tuple[int, int]]]: The value for the player to move and the best move.
+        """
         # Terminal Case
         case = game.final_state()
-
-        if case == self.player:
-            return 10 - depth, None
-        elif case == self.opponent:
-            return depth - 10, None
-        elif game.is_board_full():
+        if case is not None:
+            if case == 0:
+                return 0, None
+            # Wins score higher the sooner they happen, and always above zero
+            win_score = game.layout.cells + 1
+            return (win_score - depth if case == game.current_player else depth - win_score), None
+
+        self._nodes += 1
+        if self._nodes % _BUDGET_CHECK_INTERVAL == 0 and self._out_of_budget():
+            self._aborted = True
+        if self._aborted:
             return 0, None
-        
-        if maximizing_player:
-            return self._maximize(game, depth, alpha, beta)
+
+        # Plies left in this iteration, capped by the plies left in the game
+        layout = game.layout
+        empty = layout.cells - game.marked_squares
+        remaining = min(self._max_depth - depth, empty)
+        if remaining <= 0:
+            self._cutoff = True
+            score = self.heuristic(game)
+            return (score if game.current_player == self.player else -score), None
+
+        # Transposition table probe, keyed by the board up to symmetry and the
+        # side to move. Moves are stored in the frame of the canonical board.
+        hashes = game.hashes
+        canonical = min(hashes)
+        transform = hashes.index(canonical)
+        key = canonical ^ transposition.SIDE_KEYS[game.current_player - 1]
+        alpha_start = alpha
+        entry = self.table.lookup(key)
+        hash_move = None
+        if entry is not None:
+            if entry.move is not None:
+                hash_move = symmetry.from_canonical(layout, entry.move, transform)
+            if entry.depth >= remaining:
+                if entry.depth < empty:
+                    # The stored result was itself cut off at a depth limit
+                    self._cutoff = True
+                value = self._from_table(entry.value, depth)
+                if entry.flag == transposition.EXACT:
+                    return value, hash_move
+                if entry.flag == transposition.LOWER_BOUND:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value, hash_move
+
+        best_value = float('-inf')
+        best_move = None
+        for row, col in self._ordered_moves(game, depth, hash_move):
+            game.make_move(row, col)
+            if best_move is None:
+                value = -self.negamax(game, depth + 1, -beta, -alpha)[0]
+            else:
+                # Null window: only prove that the move is no better than alpha
+                value = -self.negamax(game, depth + 1, -math.nextafter(alpha, math.inf), -alpha)[0]
+                if alpha < value < beta and not self._aborted:
+                    value = -self.negamax(game, depth + 1, -beta, -alpha)[0]
+            game.unmake_move()
+            if self._aborted:
+                break
+
+            if value > best_value:
+                best_value = value
+                best_move = (row, col)
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    self._cutoffs += 1
+                    self._record_cutoff(layout.cell_index(row, col), depth, remaining)
+                    break
+
+        if self._aborted:
+            return best_value, best_move
+
+        if best_value <= alpha_start:
+            flag = transposition.UPPER_BOUND
+        elif best_value >= beta:
+            flag = transposition.LOWER_BOUND
         else:
-            return self._minimize(game, depth, alpha, beta)
+            flag = transposition.EXACT
+        if best_move is not None:
+            stored_move = symmetry.to_canonical(layout, best_move, transform)
+        else:
+            stored_move = None
+        self.table.store(key, remaining, self._to_table(best_value, depth), flag, stored_move)
+        return best_value, best_move
 
-    def _maximize(self, game, depth: int, alpha: float, beta: float) -> Tuple[int, Optional[Tuple[int, int]]]:
+    def _ordered_moves(self, game, depth: int, hash_move: Optional[Tuple[int, int]]) -> List[Tuple[int, int]]:
         """
-        Handles the maximizing player's turn in the minimax algorithm.
+        Order the legal moves so that alpha-beta cuts off as early as possible.
+
+        The order is: the best move stored in the transposition table, moves
+        that win on the spot, moves that block a win of the opponent, the
+        killer moves of this depth, then the rest by history score and by the
+        number of lines through the cell (center and corners first). Rotation
+        maps lines onto lines, so a win or block found before the move still
+        holds after the board turns.
+
+        When the board is symmetric, moves leading to positions that are
+        rotations or reflections of each other are only searched once.
 
         Args:
-            game_copy (game.Game): A copy of the current game state.
+            game: The game instance.
             depth (int): The current depth in the game tree.
-            alpha (float): The alpha value for alpha-beta pruning.
-            beta (float): The beta value for alpha-beta pruning.
+            hash_move (Optional[Tuple[int, int]]): Best move stored for the position, if any.
 
         Returns:
-            Tuple[int, Optional[Tuple[int, int]]]: The best evaluation score and the best move as (row, col).
+            List[Tuple[int, int]]: Every empty square, best first.
         """
+        layout = game.layout
+        mine = game.masks[game.current_player - 1]
+        theirs = game.masks[2 - game.current_player]
+        free = ~(mine | theirs) & layout.full_mask
+        killers = self._killers[depth]
+        history = self._history
+        weights = layout.cell_weights
+
+        scored = []
+        while free:
+            bit = free & -free
+            free ^= bit
+            cell = bit.bit_length() - 1
+            if layout.wins_through(mine | bit, cell):
+                score = 4 << 40
+            elif layout.wins_through(theirs | bit, cell):
+                score = 3 << 40
+            elif cell in killers:
+                score = 2 << 40
+            else:
+                score = (history[cell] << 8) + weights[cell]
+            scored.append((score, cell))
+        # Stable sort keeps row-major order between equal scores
+        scored.sort(key=lambda item: -item[0])
+
+        cells = [cell for _, cell in scored]
+        if hash_move is not None:
+            hash_cell = layout.cell_index(*hash_move)
+            if hash_cell in cells:
+                cells.remove(hash_cell)
+                cells.insert(0, hash_cell)
+
+        hashes = game.hashes
+        if hashes[0] in hashes[1:]:
+            # The board maps onto itself, so some moves are equivalent
+            keys = game._piece_keys[game.current_player - 1]
+            seen = set()
+            unique = []
+            for cell in cells:
+                child = min(h ^ k for h, k in zip(hashes, keys[cell]))
+                if child not in seen:
+                    seen.add(child)
+                    unique.append(cell)
+            cells = unique
+        return [layout.positions[cell] for cell in cells]
+
+    def _record_cutoff(self, cell: int, depth: int, remaining: int) -> None:
+        """Remember a move that caused a cutoff for the killer and history heuristics."""
+        killers = self._killers[depth]
+        if killers[0] != cell:
+            killers[1] = killers[0]
+            killers[0] = cell
+        self._history[cell] += remaining * remaining
+
+    @staticmethod
+    def _to_table(value: float, depth: int) -> float:
+        """Make a win/loss score relative to the stored node instead of the root."""
+        # Heuristic scores stay within (-1, 1), wins and losses are at least 1
+        if value >= 1:
+            return value + depth
+        if value <= -1:
+            return value - depth
+        return value
+
+    @staticmethod
+    def _from_table(value: float, depth: int) -> float:
+        """Turn a stored win/loss score back into a score relative to the root."""
+        if value >= 1:
+            return value - depth
+        if value <= -1:
+            return value + depth
+        return value
+
+    def heuristic(self, game) -> float:
+        """
+        Score a position that was not searched to the end.
 
-        max_eval = float('-inf')
-        best_move = None
+        Every line that only one player has marks on is still open for that
+        player and counts 4 ** marks for them. The board rotates after every
+        move, but a rotation maps lines onto lines, so the open lines of the
+        current board are exactly the open lines of every later rotation.
 
-        for row, col in game.get_empty_squares():
-            game_copy = copy.deepcopy(game)
-            game_copy._mark_move(row, col, self.player)
-            eval, _ = self.minimax(game_copy, depth + 1, alpha, beta, False)
+        Args:
+            game: The game instance.
 
-            if eval > max_eval:
-                max_eval = eval
-                best_move = (row, col)
-            alpha = max(alpha, eval)
-            if beta <= alpha:
+        Returns:
+            float: Score from this AI's point of view, strictly between -1 and 1
+            so that it never outweighs a win or a loss.
+        """
+        mine = game.masks[self.player - 1]
+        theirs = game.masks[self.opponent - 1]
+        score = 0
+        for line in game.layout.lines:
+            own = mine & line
+            other = theirs & line
+            if own and not other:
+                score += 4 ** bin(own).count("1")
+            elif other and not own:
+                score -= 4 ** bin(other).count("1")
+        return score / (len(game.layout.lines) * 4 ** game.layout.win_length + 1)
+
+    def _out_of_budget(self) -> bool:
+        """Check if the running search has used up its budget."""
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        if self._max_depth <= 1:
+            # The first iteration always completes so there is a move to play
+            return False
+        if self._node_limit is not None and self._nodes >= self._node_limit:
+            return True
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def search(self, game, maximizing_player: bool) -> Tuple[float, Optional[Tuple[int, int]]]:
+        """
+        Run an iterative-deepening minimax search within the AI's budget.
+
+        Between moves of equal value, the first one in row-major order is
+        played, so the result does not depend on the order moves are searched in.
+
+        Args:
+            game: The game instance.
+            maximizing_player (bool): True if this AI is the player to move.
+
+        Returns:
+            Tuple[float, Optional[Tuple[int, int]]]: The value and best move of the
+            deepest iteration that finished.
+        """
+        if self.workers > 1:
+            return self._parallel_search(game, maximizing_player)
+        budget = self.budget
+        start = time.perf_counter()
+        self._deadline = start + budget.time_limit if budget.time_limit is not None else None
+        self._node_limit = budget.node_limit
+        self._nodes = 0
+        self._cutoffs = 0
+        self._depth = 0
+        cells = game.layout.cells
+        self._history = [0] * cells
+        self._killers = [[None, None] for _ in range(cells + 1)]
+
+        empty = len(game.get_empty_squares())
+        max_depth = empty if budget.max_depth is None else min(empty, budget.max_depth)
+        best = (0, None)
+        for depth in range(1, max_depth + 1):
+            self._max_depth = depth
+            self._aborted = False
+            self._cutoff = False
+            value, move = self.negamax(game, 0, float('-inf'), float('inf'))
+            if self._aborted:
+                if self.stop_event is not None and self.stop_event.is_set():
+                    best = (0, None)
+                break
+            cutoff = self._cutoff
+            move = self._first_best_move(game, value, move)
+            if self._aborted and self.stop_event is not None and self.stop_event.is_set():
+                best = (0, None)
+                break
+            best = (value if maximizing_player else -value, move)
+            self._depth = depth
+            # Stop early once the budget ran out, the whole tree was searched or the result is a forced win or loss
+            if self._aborted or not cutoff or abs(value) >= 1:
                 break
 
-        return max_eval, best_move
-    
-    def _minimize(self, game, depth: int, alpha: float, beta: float) -> Tuple[int, Optional[Tuple[int, int]]]:
+        self._max_depth = float('inf')
+        self._aborted = False
+        return best
+
+    def _first_best_move(self, game, value: float, move: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
         """
-        Handles the minimizing player's turn in the minimax algorithm.
+        Find the first move in row-major order that reaches the root value.
+
+        Each move before ``move`` gets a null-window search proving whether it
+        scores at least ``value``.
 
         Args:
-            game_copy (game.Game): A copy of the current game state.
-            depth (int): The current depth in the game tree.
-            alpha (float): The alpha value for alpha-beta pruning.
-            beta (float): The beta value for alpha-beta pruning.
+            game: The game instance at the root.
+            value (float): Root value found by the search, for the player to move.
+            move (Optional[Tuple[int, int]]): Best move found by the search.
 
         Returns:
-            Tuple[int, Optional[Tuple[int, int]]]: The best evaluation score and the best move as (row, col).
+            Optional[Tuple[int, int]]: The first move of that value, ``move`` if the budget runs out.
         """
-                
-        min_eval = float('inf')
-        best_move = None
+        if move is None:
+            return move
+        below = math.nextafter(value, -math.inf)
+        for candidate in game.get_empty_squares():
+            if candidate == move:
+                break
+            game.make_move(*candidate)
+            score = -self.negamax(game, 1, -value, -below)[0]
+            game.unmake_move()
+            if self._aborted:
+                break
+            if score >= value:
+                return candidate
+        return move
 
-        for row, col in game.get_empty_squares():
-            game_copy = copy.deepcopy(game)
-            game_copy._mark_move(row, col, self.opponent)
-            eval, _ = self.minimax(game_copy, depth + 1, alpha, beta, True)
+    def analyze(self, game, top: Optional[int] = None) -> Dict[Tuple[int, int], MoveScore]:
+        """
+        Score the best legal moves of the current position in one multi-PV search.
+
+        Each iteration makes a single pass over the root moves, best first,
+        sharing the budget, the move ordering heuristics and the
+        transposition table. The score of the ``top``-th best move found so
+        far is the lower bound of the window of every later move: a move
+        that fails low is only proven to be outside the top moves, at the
+        cost of a null-window search, and only the others get an exact
+        score. With ``top`` left to None there is no bound, so every move
+        costs a full-window search, about as much as a separate search per
+        move; on boards bigger than 3x3, pass a small ``top`` (see
+        ANALYSIS_TOP_MOVES). A move is searched again at the next depth only
+        while its score still rests on the heuristic.
 
-            if eval < min_eval:
-                min_eval = eval
-                best_move = (row, col)
-            beta = min(beta, eval)
-            if beta <= alpha:
+        Args:
+            game: The game instance, or a GameState snapshot.
+            top (int, optional): Number of best moves to score exactly, every move if None.
+
+        Returns:
+            Dict[Tuple[int, int], MoveScore]: The score of the best ``top`` moves as of the
+            deepest iteration that finished, for the player to move, and of any move
+            tied with them. Empty if there are no legal moves or the stop_event was set.
+        """
+        if isinstance(game, GameState):
+            game = Game.from_state(game)
+        if game.final_state() is not None:
+            return {}
+        budget = self.budget
+        self._deadline = time.perf_counter() + budget.time_limit if budget.time_limit is not None else None
+        self._node_limit = budget.node_limit
+        self._nodes = 0
+        self._cutoffs = 0
+        cells = game.layout.cells
+        self._history = [0] * cells
+        self._killers = [[None, None] for _ in range(cells + 1)]
+
+        moves = game.get_empty_squares()
+        empty = len(moves)
+        top = empty if top is None else max(1, min(top, empty))
+        max_depth = empty if budget.max_depth is None else min(empty, budget.max_depth)
+        win_score = cells + 1
+        scores = {}
+        for depth in range(1, max_depth + 1):
+            self._max_depth = depth
+            self._aborted = False
+            iteration = {}
+            # Moves outside the top whose bound may still change at a deeper iteration
+            unsettled = False
+            bound = float('-inf')
+            # Best moves first, so that the bound rises early and their results are in the table
+            for move in sorted(moves, key=lambda move: -scores[move].value if move in scores else math.inf):
+                if move in scores and scores[move].plies is not None:
+                    value = scores[move].value
+                    iteration[move] = scores[move]
+                else:
+                    self._cutoff = False
+                    # Just below the bound, so that moves tied with it are scored exactly
+                    alpha = math.nextafter(bound, -math.inf)
+                    game.make_move(*move)
+                    value = -self.negamax(game, 1, float('-inf'), -alpha)[0]
+                    game.unmake_move()
+                    if self._aborted:
+                        break
+                    if value <= alpha:
+                        unsettled = unsettled or self._cutoff and value > -1
+                        continue
+                    if abs(value) >= 1:
+                        iteration[move] = MoveScore(value, win_score - abs(value))
+                    elif not self._cutoff:
+                        iteration[move] = MoveScore(value, empty)
+                    else:
+                        iteration[move] = MoveScore(value)
+                if len(iteration) >= top:
+                    bound = sorted((score.value for score in iteration.values()), reverse=True)[top - 1]
+            if self._aborted:
+                if self.stop_event is not None and self.stop_event.is_set():
+                    scores = {}
                 break
+            # Only the top moves, and the moves tied with them, keep an exact score
+            scores = {move: score for move, score in iteration.items() if score.value >= bound}
+            self._depth = depth
+            if not unsettled and all(score.plies is not None for score in scores.values()):
+                break
+
+        self._max_depth = float('inf')
+        self._aborted = False
+        return {move: scores[move] for move in moves if move in scores}
+
+    def _parallel_search(self, game, maximizing_player: bool) -> Tuple[float, Optional[Tuple[int, int]]]:
+        """
+        Run the iterative-deepening search with the root moves split over a process pool.
+
+        Each iteration searches the best move of the previous one first, alone,
+        then hands the other root moves out to the pool (young brothers wait).
+        The best root score found so far is shared with the workers as the
+        alpha bound of every move they start. Moves are searched just below
+        that bound, so ties still get an exact score, and the result is the
+        first move in row-major order with the best score, like ``search``.
+
+        The time limit and stop_event reach every worker; the node limit is
+        only checked between iterations.
+
+        Args:
+            game: The game instance.
+            maximizing_player (bool): True if this AI is the player to move.
+
+        Returns:
+            Tuple[float, Optional[Tuple[int, int]]]: The value and best move of the
+            deepest iteration that finished.
+        """
+        if self._pool is None:
+            self._shared_alpha = multiprocessing.Value("d", -math.inf)
+            self._shared_stop = multiprocessing.Event()
+            self._pool = futures.ProcessPoolExecutor(
+                self.workers, initializer=_init_worker,
+                initargs=(self.level, self.table.capacity, self.table.policy, self._shared_alpha, self._shared_stop),
+            )
+        self._shared_stop.clear()
+
+        budget = self.budget
+        deadline = time.perf_counter() + budget.time_limit if budget.time_limit is not None else None
+        self._nodes = 0
+        self._cutoffs = 0
+        self._depth = 0
+        self._worker_hits = 0
+        layout = game.layout
+        self._history = [0] * layout.cells
+        self._killers = [[None, None] for _ in range(layout.cells + 1)]
+        # The position itself, not the moves that led to it: a game built from a
+        # snapshot or set up through its masks has no move history
+        position = (game.snapshot(), self.player, game.generation)
+
+        empty = len(game.get_empty_squares())
+        max_depth = empty if budget.max_depth is None else min(empty, budget.max_depth)
+        best = (0, None)
+        for depth in range(1, max_depth + 1):
+            if depth > 1 and budget.node_limit is not None and self._nodes >= budget.node_limit:
+                break
+            # The first iteration always completes so there is a move to play
+            time_left = None if depth == 1 or deadline is None else deadline - time.perf_counter()
+            moves = self._ordered_moves(game, 0, best[1])
+            self._shared_alpha.value = -math.inf
+
+            scores = {}
+            cutoff = aborted = False
+            pending = set()
+            for index, move in enumerate(moves):
+                task = (position, layout.cell_index(*move), depth, time_left)
+                pending.add(self._pool.submit(_search_root_move, task))
+                if index > 0 and index < len(moves) - 1:
+                    continue
+                # Wait for the first move alone, then for all the others together
+                while pending:
+                    done, pending = futures.wait(pending, timeout=0.05, return_when=futures.FIRST_COMPLETED)
+                    if self.stop_event is not None and self.stop_event.is_set():
+                        self._shared_stop.set()
+                    for future in done:
+                        cell, score, bound, nodes, cutoffs, hits, worker_cutoff, worker_aborted = future.result()
+                        self._nodes += nodes
+                        self._cutoffs += cutoffs
+                        self._worker_hits += hits
+                        cutoff = cutoff or worker_cutoff
+                        aborted = aborted or worker_aborted
+                        # A score at or below the bound only says the move is worse than the best one
+                        if score > bound:
+                            scores[cell] = score
+                            if score > self._shared_alpha.value:
+                                self._shared_alpha.value = score
+
+            if aborted:
+                if self.stop_event is not None and self.stop_event.is_set():
+                    best = (0, None)
+                break
+            value = max(scores.values())
+            # Moves to positions equivalent under a symmetry were only searched once
+            hashes, keys = game.hashes, game._piece_keys[game.current_player - 1]
+
+            def child(cell: int) -> int:
+                return min(h ^ k for h, k in zip(hashes, keys[cell]))
+
+            best_cells = [cell for cell, score in scores.items() if score == value]
+            best_children = {child(cell) for cell in best_cells}
+            move = layout.positions[min(best_cells)]
+            for candidate in game.get_empty_squares():
+                if child(layout.cell_index(*candidate)) in best_children:
+                    move = candidate
+                    break
+            best = (value if maximizing_player else -value, move)
+            self._depth = depth
+            if not cutoff or abs(value) >= 1:
+                break
+        return best
 
-        return min_eval, best_move
+    def close(self) -> None:
+        """Stop the worker processes of the parallel search, if they were started."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _probe(self, game) -> Optional[tablebase.Probe]:
+        """
+        Look up the current position in the shared tablebase.
+
+        Args:
+            game: The game instance.
+
+        Returns:
+            Optional[tablebase.Probe]: The solved entry for the player to move, or None
+            if the tablebase has not been built or does not know the position.
+        """
+        if game.layout is not tablebase.LAYOUT:
+            return None
+        table = tablebase.load()
+        if table is None:
+            return None
+        return table.probe(game.masks[0], game.masks[1], game.current_player)
+
+    def _book(self, game) -> Optional[tablebase.Probe]:
+        """
+        Look up the current position in the shared opening book.
+
+        Args:
+            game: The game instance.
+
+        Returns:
+            Optional[tablebase.Probe]: The solved entry for the player to move, or None
+            if the position is past the opening or the book file is missing.
+        """
+        if game.layout is not book.LAYOUT:
+            return None
+        opening_book = book.load()
+        if opening_book is None:
+            return None
+        return opening_book.probe(game)
+
+    def _probe_value(self, game, probe: tablebase.Probe) -> float:
+        """
+        Turn a tablebase or book answer into a minimax score from this AI's point of view.
+
+        Wins and losses score like in ``negamax``, by the plies left until the game ends.
+        """
+        if probe.value == tablebase.DRAW:
+            return 0
+        score = game.layout.cells + 1 - probe.distance
+        if probe.value == tablebase.LOSS:
+            score = -score
+        return score if game.current_player == self.player else -score
 
     def eval(self, game) -> Optional[Tuple[int, int]]:
         """
         Evaluate the game state and return the best move.
 
         Args:
-            game: The game instance.
+            game: The game instance, or a GameState snapshot.
 
         Returns:
             Optional[Tuple[int, int]]: The best move as (row, col), or None if no move is possible.
-        """ 
+        """
+        return self.eval_with_stats(game)[0]
+
+    def eval_with_stats(self, game) -> Tuple[Optional[Tuple[int, int]], SearchStats]:
+        """
+        Evaluate the game state and return the best move with the statistics of the search.
+
+        Args:
+            game: The game instance, or a GameState snapshot.
+
+        Returns:
+            Tuple[Optional[Tuple[int, int]], SearchStats]: The best move as (row, col), or None
+            if no move is possible, and how it was found.
+        """
+        start = time.perf_counter()
+        if isinstance(game, GameState):
+            game = Game.from_state(game)
         if self.level == 0:
             # Random choice
-            eval = "Random"
-            print("Random choice selected")
             move = self.random_choice(game)
+            stats = SearchStats("random", move=move)
+        elif self.mcts is not None:
+            if game.generation != self._table_generation:
+                self.mcts.clear()
+                self._table_generation = game.generation
+            value, move = self.mcts.search(game, self.budget.time_limit, self.budget.node_limit, self.stop_event)
+            if self.stop_event is not None and self.stop_event.is_set():
+                move = None
+            if game.current_player != self.player:
+                value = -value
+            stats = SearchStats("mcts", value, move, self.mcts.playouts, depth=self.mcts.depth)
         else:
-            # minimax algo choice
-            print("Minimax choice selected")
-            eval, move = self.minimax(game, 0, float('-inf'), float('inf'), False) # False: AI -> Minimize 
-        print(f" AI Eval: {eval}, Move: {move}")
-        return move
-    
\ No newline at end of file
+            # Solved positions and opening positions are answered without a search
+            probe, method = self._probe(game), "tablebase"
+            if probe is None:
+                probe, method = self._book(game), "book"
+            if probe is not None:
+                move = probe.move
+                stats = SearchStats(method, self._probe_value(game, probe), move)
+            else:
+                # minimax algo choice
+                if game.generation != self._table_generation:
+                    self.table.clear()
+                    self._table_generation = game.generation
+                # The side to move maximizes when it is this AI
+                maximizing = game.current_player == self.player
+                hits = self.table.hits
+                self._worker_hits = 0
+                value, move = self.search(game, maximizing)
+                stats = SearchStats(
+                    "minimax", value, move, self._nodes, self._cutoffs,
+                    self.table.hits - hits + self._worker_hits, self._depth,
+                )
+        stats = stats._replace(elapsed=time.perf_counter() - start)
+
+        self.stats = stats
+        if self.on_search is not None:
+            self.on_search(stats)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s move %s value %s: %d nodes, %d cutoffs, %d tt hits, depth %d, %.1f ms, %.0f nps",
+                stats.method, stats.move, stats.value, stats.nodes, stats.cutoffs,
+                stats.tt_hits, stats.depth, stats.elapsed * 1e3, stats.nps,
+            )
+        return move, stats
+
+
+##### PARALLEL SEARCH WORKERS #####
+
+# The AI of this worker process and the shared alpha bound, set by _init_worker
+_worker = None
+
+
+def _init_worker(level, table_size, replacement, alpha, stop) -> None:
+    """Create the AI of a worker process of the parallel search."""
+    global _worker
+    ai = AI(Game(), level, table_size=table_size, replacement=replacement)
+    ai.stop_event = stop
+    _worker = (ai, alpha)
+
+
+def _search_root_move(task) -> tuple:
+    """
+    Search one root move in a worker process.
+
+    Args:
+        task: ((GameState of the root, AI player, game generation of the root),
+            root cell, iteration depth, seconds left or None).
+
+    Returns:
+        tuple: (cell, score for the player to move, bound the score is exact above,
+        nodes, cutoffs, table hits, depth limit reached, aborted).
+    """
+    (state, player, generation), cell, depth, time_left = task
+    ai, alpha = _worker
+    if ai.player != player or ai._table_generation != generation:
+        # The heuristic depends on which player the AI is, and a new game
+        # starts from an empty table, like in the AI that owns the pool
+        ai.player, ai.opponent = player, 3 - player
+        ai._table_generation = generation
+        ai.table.clear()
+
+    position = Game.from_state(state)
+    cells = position.layout.cells
+    ai._max_depth = depth
+    ai._deadline = None if time_left is None else time.perf_counter() + time_left
+    ai._node_limit = None
+    ai._nodes = ai._cutoffs = 0
+    ai._aborted = ai._cutoff = False
+    ai._history = [0] * cells
+    ai._killers = [[None, None] for _ in range(cells + 1)]
+    hits = ai.table.hits
+
+    bound = math.nextafter(alpha.value, -math.inf)
+    position.make_move(*position.layout.positions[cell])
+    score = -ai.negamax(position, 1, -math.inf, -bound)[0]
+    return cell, score, bound, ai._nodes, ai._cutoffs, ai.table.hits - hits, ai._cutoff, ai._aborted
@@ -0,0 +1,220 @@
+"""
+Vectorized stepping of many games at once with NumPy.
+
+``GameBatch`` holds N boards as one contiguous ``int8`` array and applies the
+same rules as ``Game`` to all of them in a handful of array operations: a
+vector of moves is placed in one call, every board that moved is rotated in one
+gather, and the lines through each new mark are checked together. This is what
+self-play data generation, rollouts and load simulations use instead of looping
+over ``Game`` objects.
+
+Classes:
+    GameBatch: N rotating boards stepped together.
+"""
+
+import numpy as np
+
+from typing import Optional
+from . import bitboard
+from . import constants
+
+
+ONGOING = -1
+DRAW = 0
+
+
+class GameBatch:
+    """
+    N rotating boards stepped together.
+
+    Cells are stored row-major, like the bitboards: 0 is empty, otherwise the
+    player number. Status is ONGOING, DRAW or the number of the winner.
+
+    Attributes:
+        layout (bitboard.Layout): Board size, win length and line tables.
+        cells (np.ndarray): (N, size * size) int8 cells of every board.
+        current_player (np.ndarray): (N,) int8 player to move on every board.
+        status (np.ndarray): (N,) int8 status of every board.
+    """
+
+    def __init__(self,
+                 count: int,
+                 size: int = constants.BOARD_SIZE,
+                 win_length: int = constants.WIN_LENGTH,
+                 first_player=1
+    ) -> None:
+        """
+        Initialize N empty boards.
+
+        Args:
+            count (int): Number of boards.
+            size (int): Rows and columns of every board (default is BOARD_SIZE).
+            win_length (int): Marks in a row needed to win (default is WIN_LENGTH).
+            first_player (int or np.ndarray): Player to move first, for all boards or per board.
+        """
+        self.layout = bitboard.get_layout(size, win_length)
+        self.cells = np.zeros((count, self.layout.cells), dtype=np.int8)
+        self.current_player = np.empty(count, dtype=np.int8)
+        self.current_player[:] = first_player
+        self.status = np.full(count, ONGOING, dtype=np.int8)
+
+        # cells[:, i] after a rotation comes from cells[:, unrotation[i]] before it
+        self._rotation_source = np.array(self.layout.unrotation, dtype=np.intp)
+        self._lines = np.array(self.layout.line_cells, dtype=np.intp)
+        # Lines through every cell, padded by repeating the first one: (cells, widest, K)
+        widest = max(len(lines) for lines in self.layout.lines_through)
+        through = []
+        for cell in range(self.layout.cells):
+            indexes = [i for i, line in enumerate(self.layout.line_cells) if cell in line]
+            indexes += indexes[:1] * (widest - len(indexes))
+            through.append(self._lines[indexes])
+        self._lines_through = np.array(through, dtype=np.intp)
+
+    @classmethod
+    def from_game(cls, game, count: int) -> "GameBatch":
+        """
+        Make a batch of ``count`` copies of a game's current position.
+
+        Args:
+            game: The game instance to copy.
+            count (int): Number of boards.
+
+        Returns:
+            GameBatch: The new batch.
+        """
+        batch = cls(count, game.size, game.win_length)
+        batch.set_position(game)
+        return batch
+
+    def set_position(self, game) -> None:
+        """
+        Put every board back to a game's current position.
+
+        Reusing a batch this way is much cheaper than building a new one.
+
+        Args:
+            game: The game instance to copy, with the same board size as the batch.
+        """
+        row = np.zeros(self.layout.cells, dtype=np.int8)
+        for player in (1, 2):
+            mask = game.masks[player - 1]
+            row[[cell for cell in range(self.layout.cells) if mask >> cell & 1]] = player
+        self.cells[:] = row
+        self.current_player[:] = game.current_player
+        state = game.final_state()
+        self.status[:] = ONGOING if state is None else state
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    @property
+    def boards(self) -> np.ndarray:
+        """(N, size, size) view of the cells, indexed as ``boards[i, row, col]``."""
+        return self.cells.reshape(len(self.cells), self.layout.size, self.layout.size)
+
+    def ongoing(self) -> np.ndarray:
+        """(N,) bool mask of the boards still being played."""
+        return self.status == ONGOING
+
+    def random_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Pick a uniformly random empty cell on every ongoing board.
+
+        Args:
+            rng (np.random.Generator): Source of randomness.
+
+        Returns:
+            np.ndarray: (N,) cell index per board, -1 for finished boards.
+        """
+        scores = rng.random(self.cells.shape)
+        scores[self.cells != 0] = -1.0
+        moves = scores.argmax(axis=1)
+        moves[~self.ongoing()] = -1
+        return moves
+
+    def play(self, moves: np.ndarray) -> np.ndarray:
+        """
+        Place a mark for the player to move on every board, without rotating.
+
+        Boards that are finished, get -1 or get an occupied cell are left alone.
+
+        Args:
+            moves (np.ndarray): (N,) cell index per board.
+
+        Returns:
+            np.ndarray: (N,) bool mask of the boards where a mark was placed.
+        """
+        moves = np.asarray(moves, dtype=np.intp)
+        moved = self.ongoing() & (moves >= 0)
+        index = np.flatnonzero(moved)
+        cells = moves[index]
+        free = self.cells[index, cells] == 0
+        index, cells = index[free], cells[free]
+        moved[:] = False
+        moved[index] = True
+
+        players = self.current_player[index]
+        self.cells[index, cells] = players
+
+        # Only lines through the new marks can have been completed
+        lines = self._lines_through[cells]
+        owned = self.cells[index[:, None, None], lines] == players[:, None, None]
+        won = owned.all(axis=2).any(axis=1)
+        self.status[index[won]] = players[won]
+        full = (self.cells[index] != 0).all(axis=1) & ~won
+        self.status[index[full]] = DRAW
+        return moved
+
+    def rotate(self, mask: Optional[np.ndarray] = None) -> None:
+        """
+        Rotate boards by 90 degrees, like ``Game._rotate_board``.
+
+        Args:
+            mask (np.ndarray, optional): (N,) bool mask of the boards to rotate. Defaults to all.
+        """
+        if mask is None:
+            self.cells[:] = self.cells[:, self._rotation_source]
+        else:
+            self.cells[mask] = self.cells[mask][:, self._rotation_source]
+
+    def step(self, moves: np.ndarray) -> np.ndarray:
+        """
+        Play one move on every board the way ``Game.make_move`` does.
+
+        Places the marks, rotates the boards that moved and passes their turn.
+
+        Args:
+            moves (np.ndarray): (N,) cell index per board, -1 to skip a board.
+
+        Returns:
+            np.ndarray: (N,) bool mask of the boards where a move was played.
+        """
+        moved = self.play(moves)
+        self.rotate(moved)
+        self.current_player[moved] = 3 - self.current_player[moved]
+        return moved
+
+    def play_random(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Play random moves on every board until all of them are finished.
+
+        Returns:
+            np.ndarray: (N,) final status of every board.
+        """
+        while self.ongoing().any():
+            self.step(self.random_moves(rng))
+        return self.status
+
+    def compute_status(self) -> np.ndarray:
+        """
+        Recompute the status of every board from its cells, checking every line.
+
+        Returns:
+            np.ndarray: (N,) status per board, ONGOING, DRAW or the winner.
+        """
+        values = self.cells[:, self._lines]  # (N, lines, K)
+        status = np.full(len(self.cells), ONGOING, dtype=np.int8)
+        status[(self.cells != 0).all(axis=1)] = DRAW
+        for player in (2, 1):
+            status[(values == player).all(axis=2).any(axis=1)] = player
+        return status
@@ -0,0 +1,193 @@
+"""
+Bitboard tables for the Tic Tac Toe board.
+
+Each player's marks are kept as an integer mask where bit ``row * size + col``
+is set when the player owns that cell. Everything the game needs on every move
+(the win lines through each cell, the 90 degree rotation and the list of empty
+cells) is computed once per board size and win length by ``Layout``, so the game
+logic only does table lookups and a few integer operations.
+
+Classes:
+    Layout: Precomputed tables for one board size and win length.
+"""
+
+from functools import lru_cache
+from typing import Optional, Tuple
+from . import constants
+
+
+# Masks are rotated a chunk of bits at a time through lookup tables. A 3x3
+# board fits in a single chunk, so its rotation is one table lookup.
+CHUNK_BITS = 9
+
+
+def _permute(mask: int, permutation: Tuple[int, ...]) -> int:
+    """Move every set bit of ``mask`` to its destination in ``permutation``."""
+    result = 0
+    for source, destination in enumerate(permutation):
+        if mask >> source & 1:
+            result |= 1 << destination
+    return result
+
+
+class Layout:
+    """
+    Precomputed bitboard tables for an N x N board with K in a row to win.
+
+    Attributes:
+        size (int): Number of rows and columns.
+        win_length (int): Number of marks in a row needed to win.
+        cells (int): Number of cells on the board.
+        full_mask (int): Mask with every cell set.
+        lines (Tuple[int, ...]): Mask of every winning line.
+        line_cells (Tuple[Tuple[int, ...], ...]): Cell indexes of every line, in order.
+        lines_through (Tuple[Tuple[int, ...], ...]): Masks of the lines through each cell.
+        cell_weights (Tuple[int, ...]): Number of lines through each cell, highest in the
+            center and the corners of a 3x3 board.
+        rotation (Tuple[int, ...]): Destination of every cell after one rotation.
+        unrotation (Tuple[int, ...]): Destination of every cell when undoing a rotation.
+        positions (Tuple[Tuple[int, int], ...]): (row, col) of every cell index.
+    """
+
+    def __init__(self, size: int, win_length: int) -> None:
+        """
+        Build the tables for a board.
+
+        Args:
+            size (int): Number of rows and columns.
+            win_length (int): Number of marks in a row needed to win.
+
+        Raises:
+            ValueError: If the win length does not fit on the board.
+        """
+        if size < 1 or not 1 <= win_length <= size:
+            raise ValueError(f"Cannot play {win_length} in a row on a {size}x{size} board")
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+        self.full_mask = (1 << self.cells) - 1
+
+        self.line_cells = self._build_lines()
+        self.lines = tuple(sum(1 << cell for cell in line) for line in self.line_cells)
+        self.lines_through = tuple(
+            tuple(mask for mask in self.lines if mask >> cell & 1)
+            for cell in range(self.cells)
+        )
+        self.cell_weights = tuple(len(lines) for lines in self.lines_through)
+
+        # Matches np.rot90(board, k=1): the mark at (row, col) ends up at (size - 1 - col, row)
+        self.rotation = tuple(
+            self.cell_index(size - 1 - col, row)
+            for row in range(size)
+            for col in range(size)
+        )
+        self.unrotation = tuple(self.rotation.index(cell) for cell in range(self.cells))
+        self._rotate_chunks = self._build_chunks(self.rotation)
+        self._unrotate_chunks = self._build_chunks(self.unrotation)
+
+        self.positions = tuple(self.cell_position(cell) for cell in range(self.cells))
+        if self.cells <= CHUNK_BITS:
+            # occupied mask -> (row, col) of every empty cell, in row-major order
+            self._empty_squares = tuple(
+                tuple(self.positions[i] for i in range(self.cells) if not occupied >> i & 1)
+                for occupied in range(1 << self.cells)
+            )
+        else:
+            self._empty_squares = None
+
+    def cell_index(self, row: int, col: int) -> int:
+        """Return the bit index of the cell at (row, col)."""
+        return row * self.size + col
+
+    def cell_position(self, index: int) -> Tuple[int, int]:
+        """Return the (row, col) of the cell with the given bit index."""
+        return divmod(index, self.size)
+
+    def _build_lines(self) -> Tuple[Tuple[int, ...], ...]:
+        """Build every run of win_length cells along a row, column or diagonal."""
+        size, length = self.size, self.win_length
+        lines = []
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row = row + d_row * (length - 1)
+                    end_col = col + d_col * (length - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        lines.append(tuple(
+                            self.cell_index(row + d_row * i, col + d_col * i)
+                            for i in range(length)
+                        ))
+        return tuple(lines)
+
+    def _build_chunks(self, permutation: Tuple[int, ...]) -> Tuple[Tuple[int, Tuple[int, ...]], ...]:
+        """
+        Split a cell permutation into per-chunk lookup tables.
+
+        Returns:
+            Tuple[Tuple[int, Tuple[int, ...]], ...]: (shift, table) pairs where
+            ``table[(mask >> shift) & chunk]`` is where that chunk's bits end up.
+        """
+        chunks = []
+        for shift in range(0, self.cells, CHUNK_BITS):
+            width = min(CHUNK_BITS, self.cells - shift)
+            targets = permutation[shift:shift + width]
+            chunks.append((shift, tuple(_permute(value, targets) for value in range(1 << width))))
+        return tuple(chunks)
+
+    @staticmethod
+    def _apply(mask: int, chunks) -> int:
+        """Permute the bits of ``mask`` through chunk tables from _build_chunks."""
+        if len(chunks) == 1:
+            return chunks[0][1][mask]
+        result = 0
+        for shift, table in chunks:
+            result |= table[mask >> shift & ((1 << CHUNK_BITS) - 1)]
+        return result
+
+    def rotate(self, mask: int) -> int:
+        """Rotate a player mask by 90 degrees."""
+        return self._apply(mask, self._rotate_chunks)
+
+    def unrotate(self, mask: int) -> int:
+        """Undo one rotation of a player mask."""
+        return self._apply(mask, self._unrotate_chunks)
+
+    def empty_squares(self, occupied: int) -> Tuple[Tuple[int, int], ...]:
+        """Return the (row, col) of every cell not set in ``occupied``, in row-major order."""
+        if self._empty_squares is not None:
+            return self._empty_squares[occupied]
+        positions = self.positions
+        free = ~occupied & self.full_mask
+        squares = []
+        while free:
+            low = free & -free
+            squares.append(positions[low.bit_length() - 1])
+            free ^= low
+        return tuple(squares)
+
+    def has_win(self, mask: int) -> bool:
+        """Check if a player mask covers a complete line."""
+        for line in self.lines:
+            if mask & line == line:
+                return True
+        return False
+
+    def wins_through(self, mask: int, cell: int) -> bool:
+        """Check if a player mask covers a complete line through ``cell``."""
+        for line in self.lines_through[cell]:
+            if mask & line == line:
+                return True
+        return False
+
+    def winning_line(self, mask: int) -> Optional[Tuple[int, ...]]:
+        """Return the cells of the first complete line in ``mask``, if any."""
+        for line, cells in zip(self.lines, self.line_cells):
+            if mask & line == line:
+                return cells
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_layout(size: int = constants.BOARD_SIZE, win_length: int = constants.WIN_LENGTH) -> Layout:
+    """Return the shared tables for a board, building them on first use."""
+    return Layout(size, win_length)
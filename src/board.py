@@ -3,8 +3,22 @@ Module for managing the game board in a Tic-Tac-Toe game using Pygame.
 
 This module contains the Board class which handles drawing the game board,
 game pieces, and various UI elements.
+
+The grid and the X/O marks are rendered once into surfaces and blitted from
+there. ``Board.render`` only repaints the cells that changed since the last
+frame and returns the dirty rects to pass to ``pygame.display.update``.
+
+``Board.draw_analysis`` overlays the score of the empty cells analyzed by
+``AI.analyze`` in the same way.
+
+The quarter turn of the board after every move is animated from a handful of
+frames, rotated once from an offscreen render of the board and cached per
+board state, so each step of the animation is a single blit.
 """
 from . import constants
+from . import text
+from collections import OrderedDict
+from typing import List, Optional
 import pygame
 
 class Board:
@@ -18,8 +32,21 @@ class Board:
         game: Reference to the main game object.
         font (pygame.font.Font): Font for regular text.
         large_font (pygame.font.Font): Font for large text.
+        rect (pygame.Rect): Area covered by the board.
     """
 
+    # Milliseconds between two steps of the AI thinking animation
+    THINKING_STEP_MS = 300
+
+    # Length of the rotation animation, the frames it is made of, and the
+    # board states whose frames are kept (each frame is a full window surface)
+    ROTATION_MS = 240
+    ROTATION_FRAMES = 6
+    ROTATION_CACHE_SIZE = 3
+
+    # Color of the analysis scores by outcome: win, draw, loss, not solved
+    ANALYSIS_COLORS = {1: (163, 190, 140), 0: constants.BORDER_LINE, -1: (191, 97, 106), None: (129, 161, 193)}
+
     def __init__(self, width, height, game) -> None:
         """
         Initialize the Board object.
@@ -31,17 +58,142 @@ class Board:
         """
         self.width = width
         self.height = height
-        self.cell_size = min(width, height) // 3  # To ensure all the cell size is same
+        self.cell_size = min(width, height) // game.size  # To ensure all the cell size is same
         self.game = game
+        # Keep the marks proportional to the cells on bigger boards
+        self.figure_width = max(3, constants.CIRCLE_WIDTH * 3 // game.size)
+
+        self.font = text.get_font("comincsans", 36, system=True)
+        self.large_font = text.get_font(None, 72)
+
+        self.rect = pygame.Rect(0, 0, width, height)
+        # Background and grid lines, and one sprite per player, built on first use
+        self._grid = None
+        self._sprites = None
+        # Board as last rendered on the screen, None when the screen must be fully repainted
+        self._drawn = None
+        # (text, position, rect) of the status text on the screen, None when it is not shown
+        self._status = None
+        # Analysis shown on the screen, and the areas its scores cover
+        self._analysis = None
+        self._analysis_rects = []
+        # Rotation frames by board state, and (frames, start ticks, frame shown) of the running animation
+        self._rotation_frames = OrderedDict()
+        self._rotation = None
+
+    def _build_surfaces(self) -> None:
+        """Pre-render the static grid and the X and O sprites."""
+        self._grid = pygame.Surface((self.width, self.height))
+        self._grid.fill(constants.BACKGROUND_COLOR)
+        self.draw(self._grid)
+
+        center = self.cell_size // 2
+        self._sprites = {}
+        for player, draw in ((1, self._draw_circle), (2, self._draw_cross)):
+            sprite = pygame.Surface((self.cell_size, self.cell_size))
+            sprite.fill(constants.BACKGROUND_COLOR)
+            draw(sprite, center, center)
+            # A colorkey blit is much cheaper than per-pixel alpha
+            sprite.set_colorkey(constants.BACKGROUND_COLOR, pygame.RLEACCEL)
+            self._sprites[player] = sprite
+
+    def _cell_rect(self, row: int, col: int) -> pygame.Rect:
+        """Screen area of a cell."""
+        return pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+
+    def invalidate(self) -> None:
+        """Repaint the whole board on the next call to render."""
+        self._drawn = None
+        self._status = None
+        self._analysis = None
+        self._analysis_rects = []
+
+    def render(self, screen) -> List[pygame.Rect]:
+        """
+        Bring the grid and marks on the screen up to date with the game.
+
+        Only the cells that changed since the last call are repainted. The
+        board rotates after every move, which moves nearly every mark, so a
+        move is repainted as a single rect covering the whole board.
 
-        pygame.font.init()
-        self.font = pygame.font.SysFont("comincsans", 36)
-        self.large_font = pygame.font.Font(None, 72)
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+
+        Returns:
+            List[pygame.Rect]: Areas that were repainted, empty if nothing changed.
+        """
+        if self._grid is None:
+            self._build_surfaces()
+        board = self.game.board
+        drawn = self._drawn
+        if drawn is board:
+            return []
+
+        changed = []
+        if drawn is not None:
+            changed = [
+                (row, col)
+                for row in range(self.game.size)
+                for col in range(self.game.size)
+                if board[row][col] != drawn[row][col]
+            ]
+            if not changed:
+                self._drawn = board
+                return []
+        self._drawn = board
+
+        if drawn is None or len(changed) > 1:
+            screen.blit(self._grid, (0, 0))
+            self.draw_figures(screen)
+            self._status = None
+            self._analysis = None
+            self._analysis_rects = []
+            return [self.rect.copy()]
+
+        # The scores are drawn again, over the changed cells, by the next draw_analysis
+        self._analysis = None
+        rects = []
+        for row, col in changed:
+            rect = self._cell_rect(row, col)
+            self.restore(screen, rect)
+            rects.append(rect)
+            if self._status is not None and rect.colliderect(self._status[2]):
+                # The status text is drawn again on top by its next call
+                rects.append(self.restore(screen, self._status[2]))
+                self._status = None
+        return rects
+
+    def restore(self, screen, rect: pygame.Rect) -> pygame.Rect:
+        """
+        Repaint the grid and marks under an area, erasing whatever was drawn over them.
+
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+            rect (pygame.Rect): The area to repaint.
+
+        Returns:
+            pygame.Rect: The repainted area.
+        """
+        if self._grid is None:
+            self._build_surfaces()
+        rect = rect.clip(self.rect)
+        screen.blit(self._grid, rect, rect)
+        board = self.game.board
+        clip = screen.get_clip()
+        screen.set_clip(rect)
+        first_row, last_row = rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size
+        first_col, last_col = rect.left // self.cell_size, (rect.right - 1) // self.cell_size
+        for row in range(first_row, min(last_row, self.game.size - 1) + 1):
+            for col in range(first_col, min(last_col, self.game.size - 1) + 1):
+                if board[row][col]:
+                    screen.blit(self._sprites[board[row][col]], self._cell_rect(row, col))
+        screen.set_clip(clip)
+        return rect
 
     def draw(self, screen) -> None:
         """Draw the game grid on the screen."""
         # Start 1 since we will multiply by cell_size
-        for i in range(1, 3):
+        for i in range(1, self.game.size):
             # calculate the horizontal line
             # Start Position for a 600x600 board is (0, 200) -> (600, 200)
             pygame.draw.line(
@@ -62,14 +214,15 @@ class Board:
 
     def draw_figures(self, screen) -> None:
         """Draw the game pieces (X and 0) on the screen."""
-        for row in range(constants.BOARD_ROWS):
-            for col in range(constants.BOARD_COLUMNS):
-                center_x = int(col * self.cell_size + self.cell_size // 2)
-                center_y = int(row * self.cell_size + self.cell_size // 2)
-                if self.game.board[row][col] == 1:
-                    self._draw_circle(screen, center_x, center_y)
-                elif self.game.board[row][col] == 2:
-                    self._draw_cross(screen, center_x, center_y)
+        if self._sprites is None:
+            self._build_surfaces()
+        board = self.game.board
+        sprites = self._sprites
+        size = self.cell_size
+        for row in range(self.game.size):
+            for col in range(self.game.size):
+                if board[row][col]:
+                    screen.blit(sprites[board[row][col]], (col * size, row * size))
 
     def _draw_circle(self, screen, center_x: int, center_y: int) -> None:
         """Draw a circle (O) at the specified position."""
@@ -78,7 +231,7 @@ class Board:
             constants.CIRCLE_COLOR,
             (center_x, center_y),
             self.cell_size // 3,
-            constants.CIRCLE_WIDTH,
+            self.figure_width,
         )
 
     def _draw_cross(self, screen, center_x: int, center_y: int) -> None:
@@ -89,64 +242,38 @@ class Board:
             constants.CROSS_COLOR,
             (center_x - offset, center_y - offset),
             (center_x + offset, center_y + offset),
-            constants.CROSS_WIDTH,
+            self.figure_width,
         )
         pygame.draw.line(
             screen,
             constants.CROSS_COLOR,
             (center_x - offset, center_y + offset),
             (center_x + offset, center_y - offset),
-            constants.CROSS_WIDTH,
+            self.figure_width,
         )
     
     def draw_win_line(self, screen) -> None:
         """Draw the winning line on the screen."""
-        state = self.game.final_state()
-        if state == 0:
-            return
-        
-        player = state
-        for col in range(constants.BOARD_COLUMNS):
-            if all(self.game.board[row][col] == player for row in range(constants.BOARD_ROWS)):
-                self._draw_vertical_win(screen, col, player)
-                return
-            
-        for row in range(constants.BOARD_ROWS):
-            if all(self.game.board[row][col] == player for col in range(constants.BOARD_COLUMNS)):
-                self._draw_horizontal_win(screen, row, player)
-                return
-            
-        if all(self.game.board[i][i] == player for i in range(3)):
-            # Since nag flip yung y-axis, we need to flip the diagonal
-            self._draw_diagonal_win_dsc(screen, player)
-            return
-        
-        if all(self.game.board[i][2-i] == player for i in range(3)):
-            # Same dito, since nag flip yung y-axis, we need to flip the diagonal
-            self._draw_diagonal_win_asc(screen, player)
+        line = self.game.winning_line()
+        if line is None:
             return
 
-    def _draw_vertical_win(self, screen, col: int, player: int) -> None:
-        """Draw a vertical winning line on the screen."""
-        pos_x = col * self.cell_size + self.cell_size // 2
-        color = self._get_player_color(player)
-        pygame.draw.line(screen, color, (pos_x, 10), (pos_x, self.height - 10), 15)
-
-    def _draw_horizontal_win(self, screen, row: int, player: int) -> None:
-        """Draw a horizontal winning line."""
-        pos_y = row * self.cell_size + self.cell_size // 2
-        color = self._get_player_color(player)
-        pygame.draw.line(screen, color, (10, pos_y), (self.width - 10, pos_y), 15)
-    
-    def _draw_diagonal_win_asc(self, screen, player: int) -> None:
-        """Draw an ascending diagonal winning line."""
-        color = self._get_player_color(player)
-        pygame.draw.line(screen, color, (10, self.height - 10), (self.width - 10, 10), 15)
+        player = self.game.winner
+        (start_row, start_col), (end_row, end_col) = line[0], line[-1]
+        d_row = (end_row > start_row) - (end_row < start_row)
+        d_col = (end_col > start_col) - (end_col < start_col)
 
-    def _draw_diagonal_win_dsc(self, screen, player: int) -> None:
-        """Draw a descending diagonal winning line."""
-        color = self._get_player_color(player)
-        pygame.draw.line(screen, color, (10, 10), (self.width - 10, self.height - 10), 15)
+        # Run from cell center to cell center, stretched to 10px from the edge of the end cells
+        overshoot = self.cell_size // 2 - 10
+        start = (
+            start_col * self.cell_size + self.cell_size // 2 - d_col * overshoot,
+            start_row * self.cell_size + self.cell_size // 2 - d_row * overshoot,
+        )
+        end = (
+            end_col * self.cell_size + self.cell_size // 2 + d_col * overshoot,
+            end_row * self.cell_size + self.cell_size // 2 + d_row * overshoot,
+        )
+        pygame.draw.line(screen, self._get_player_color(player), start, end, 15)
 
     @staticmethod
     def _get_player_color(player: int):
@@ -161,6 +288,7 @@ class Board:
     def restart(self, screen) -> None:
         """Restart the game and clear the screen."""
         self.game.restart()
+        self.invalidate()
         screen.fill(constants.BACKGROUND_COLOR)
         self.draw(screen)
         pygame.display.update()
@@ -187,48 +315,182 @@ class Board:
 
     def draw_winner_announcement(self, screen, winner):
         """Draw the winner announcement on the screen."""
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))  # Black with 50% opacity
-        screen.blit(overlay, (0, 0))
+        # Black with 50% opacity
+        screen.blit(text.overlay((self.width, self.height), (0, 0, 0, 128)), (0, 0))
 
-        text = "It's a Draw!" if winner == "draw" else f"Player {winner} Wins!"
-        text_surface = self.large_font.render(text, True, constants.WINNER_TEXT_COLOR)
+        message = "It's a Draw!" if winner == "draw" else f"Player {winner} Wins!"
+        text_surface = text.render(message, constants.WINNER_TEXT_COLOR, 72)
         text_rect = text_surface.get_rect(center=(self.width // 2, self.height // 2 - 50))
         screen.blit(text_surface, text_rect)
 
-        restart_text = self.font.render("Press R to restart", True, constants.BORDER_LINE)
+        restart_text = text.render("Press R to restart", constants.BORDER_LINE, 36, "comincsans", system=True)
         restart_rect = restart_text.get_rect(center=(self.width // 2, self.height // 2 + 50))
         screen.blit(restart_text, restart_rect)
 
-    def draw_turn_indicator(self, screen, current_player_symbol):
-        """Draw the current player's turn indicator."""
-        turn_text = f" Turn: {current_player_symbol}"
-        text_surface = self.font.render(turn_text, True, constants.BORDER_LINE)
-        text_rect = text_surface.get_rect(center=(self.width // 2, 50))
+    def _draw_status(self, screen, message: str, **position) -> List[pygame.Rect]:
+        """
+        Draw the status text over the board, replacing the previous one.
+
+        Returns:
+            List[pygame.Rect]: Areas that were repainted, empty if the text is already shown.
+        """
+        status = self._status
+        if status is not None and status[0] == message and status[1] == position:
+            return []
+        rects = []
+        if status is not None:
+            rects.append(self.restore(screen, status[2]))
+        text_surface = text.render(message, constants.BORDER_LINE, 36, "comincsans", system=True)
+        text_rect = text_surface.get_rect(**position)
         screen.blit(text_surface, text_rect)
+        self._status = (message, position, text_rect)
+        rects.append(text_rect)
+        return rects
+
+    def draw_turn_indicator(self, screen, current_player_symbol) -> List[pygame.Rect]:
+        """Draw the current player's turn indicator and return the repainted areas."""
+        return self._draw_status(screen, f" Turn: {current_player_symbol}", center=(self.width // 2, 50))
+
+    def draw_thinking_indicator(self, screen, ticks: int) -> List[pygame.Rect]:
+        """Draw an animated indicator while the AI searches for its move and return the repainted areas."""
+        dots = "." * (ticks // self.THINKING_STEP_MS % 4)
+        return self._draw_status(screen, f" AI thinking{dots}", midleft=(self.width // 2 - 80, 50))
+
+    @property
+    def rotating(self) -> bool:
+        """True while the rotation animation is playing."""
+        return self._rotation is not None
+
+    def _build_rotation_frames(self) -> List[pygame.Surface]:
+        """Render the current board offscreen and rotate it into the animation frames."""
+        if self._grid is None:
+            self._build_surfaces()
+        surface = self._grid.copy()
+        self.draw_figures(surface)
+        frames = []
+        for step in range(self.ROTATION_FRAMES):
+            # Game._rotate_board turns the board a quarter counterclockwise, so the
+            # board before the move is the current one turned a quarter clockwise
+            angle = -90 * (self.ROTATION_FRAMES - step) / self.ROTATION_FRAMES
+            rotated = pygame.transform.rotate(surface, angle)
+            # The padding of the rotated surface is the background color, so a
+            # window-sized crop of its center covers the whole board
+            crop = self.rect.copy()
+            crop.center = rotated.get_rect().center
+            frames.append(rotated.subsurface(crop).copy())
+        return frames
+
+    def start_rotation(self, ticks: int) -> None:
+        """
+        Start animating the rotation that follows a move.
+
+        Call it once the move has been made: the animation turns the board from
+        where it was into the current position.
+
+        Args:
+            ticks (int): Current time, from pygame.time.get_ticks.
+        """
+        key = tuple(self.game.masks)
+        frames = self._rotation_frames.get(key)
+        if frames is None:
+            frames = self._build_rotation_frames()
+            self._rotation_frames[key] = frames
+            if len(self._rotation_frames) > self.ROTATION_CACHE_SIZE:
+                self._rotation_frames.popitem(last=False)
+        else:
+            self._rotation_frames.move_to_end(key)
+        self._rotation = (frames, ticks, None)
+
+    def draw_rotation(self, screen, ticks: int) -> List[pygame.Rect]:
+        """
+        Show the frame of the rotation animation for the current time.
+
+        The animation lasts ROTATION_MS whatever the frame rate. Once it is
+        over, the board is repainted in full by the next call to render.
+
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+            ticks (int): Current time, from pygame.time.get_ticks.
+
+        Returns:
+            List[pygame.Rect]: Areas that were repainted, empty if the frame is already shown
+            or the animation is over.
+        """
+        if self._rotation is None:
+            return []
+        frames, start, shown = self._rotation
+        step = (ticks - start) * self.ROTATION_FRAMES // self.ROTATION_MS
+        if step >= self.ROTATION_FRAMES:
+            self._rotation = None
+            self.invalidate()
+            return []
+        if step == shown:
+            return []
+        screen.blit(frames[step], (0, 0))
+        self._rotation = (frames, start, step)
+        # The frame covers the status text and the scores, which are drawn again afterwards
+        self.invalidate()
+        return [self.rect.copy()]
+
+    def draw_analysis(self, screen, analysis: Optional[dict]) -> List[pygame.Rect]:
+        """
+        Draw the score of every analyzed cell, replacing the scores drawn before.
+
+        A solved move shows its outcome for the player to move and the plies
+        until the game ends, e.g. "Win in 3"; a move that was not searched to
+        the end shows its heuristic score.
+
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+            analysis (dict, optional): MoveScore by (row, col), from ``AI.analyze``.
+                None to remove the scores.
+
+        Returns:
+            List[pygame.Rect]: Areas that were repainted, empty if the analysis is already shown.
+        """
+        if analysis is not None and analysis is self._analysis or analysis is None and not self._analysis_rects:
+            return []
+        rects = [self.restore(screen, rect) for rect in self._analysis_rects]
+        self._analysis = analysis
+        self._analysis_rects = []
+        for (row, col), score in (analysis or {}).items():
+            outcome = score.outcome
+            if outcome is None:
+                label = f"{score.value:+.2f}"
+            else:
+                label = f"{('Loss', 'Draw', 'Win')[outcome + 1]} in {score.plies}"
+            text_surface = text.render(label, self.ANALYSIS_COLORS[outcome], max(14, self.cell_size // 5))
+            # Low in the cell, clear of the status text at the top of the window
+            cell = self._cell_rect(row, col)
+            text_rect = text_surface.get_rect(midbottom=(cell.centerx, cell.bottom - cell.height // 10))
+            screen.blit(text_surface, text_rect)
+            self._analysis_rects.append(text_rect)
+        return rects + self._analysis_rects
 
     def draw_selection_screen(self, screen):
         """Draw the game mode selection screen with Nord-themed buttons."""
         screen.fill(constants.BACKGROUND_COLOR)
-        font = pygame.font.Font(None, 36)
 
         options = [
             "Player vs Player",
             "Player vs AI (Random)",
-            "Player vs AI (Minimax)"
+            "Player vs AI (Minimax)",
+            "Player vs AI (MCTS)"
         ]
 
         # Nord theme colors
         nord_blue = (94, 129, 172)
         nord_red = (191, 97, 106)
         nord_green = (163, 190, 140)
+        nord_purple = (180, 142, 173)
         text_color = (229, 233, 240)  # Nord Snow Storm (light gray)
 
-        button_colors = [nord_blue, nord_red, nord_green]
+        button_colors = [nord_blue, nord_red, nord_green, nord_purple]
         button_hover_colors = [
             (122, 157, 200),  # Lighter blue
             (219, 125, 134),  # Lighter red
-            (191, 218, 168)   # Lighter green
+            (191, 218, 168),  # Lighter green
+            (208, 170, 201)   # Lighter purple
         ]
 
         button_rects = []
@@ -236,7 +498,7 @@ class Board:
             button_width = 300
             button_height = 60
             x = constants.WIDTH // 2 - button_width // 2
-            y = constants.HEIGHT // 2 + i * 100 - 100
+            y = constants.HEIGHT // 2 + i * 100 - 150
 
             button_rect = pygame.Rect(x, y, button_width, button_height)
             button_rects.append(button_rect)
@@ -250,9 +512,9 @@ class Board:
             pygame.draw.rect(screen, text_color, button_rect, 2, border_radius=10)
 
             # Draw text
-            text = font.render(option, True, text_color)
-            text_rect = text.get_rect(center=button_rect.center)
-            screen.blit(text, text_rect)
+            text_surface = text.render(option, text_color, 36)
+            text_rect = text_surface.get_rect(center=button_rect.center)
+            screen.blit(text_surface, text_rect)
 
         return button_rects    
     
\ No newline at end of file
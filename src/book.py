@@ -0,0 +1,179 @@
+"""
+Opening book for the rotating 3x3 board.
+
+The first replies of a game are the most expensive ones to search, since
+minimax has to look at nearly the whole tree, but there are only a few hundred
+distinct positions in the first plies once the board's symmetries are taken
+into account. ``build`` takes them from the solved game (see ``tablebase``),
+for either player moving first, and writes them to a small file that ships
+with the game:
+
+    header      MAGIC, VERSION, plies covered, number of entries
+    entries     uint32 each, sorted: position_index << 16 | tablebase entry
+
+Positions are stored in their canonical form (see ``symmetry.canonical``) and
+moves in the frame of that form. ``OpeningBook`` reads the file into a dict,
+so a probe costs one canonicalization and one lookup.
+
+Build the file with:
+
+    python -m src.book [path]
+
+Classes:
+    OpeningBook: The book, loaded in memory.
+
+Functions:
+    build: Write the opening book file.
+    load: The shared book, read on first use.
+"""
+
+import os
+import struct
+import sys
+
+from array import array
+from typing import Dict, Optional
+from . import symmetry
+from . import tablebase
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+MAGIC = b"TTOB"
+VERSION = 1
+HEADER = struct.Struct("<4sHBI")
+
+# Positions with fewer marks than this are in the book
+BOOK_PLIES = 5
+
+LAYOUT = tablebase.LAYOUT
+
+
+def _canonical_index(player_1: int, player_2: int, player: int) -> int:
+    """Entry index of the canonical form of a position."""
+    best = None
+    for transform in range(symmetry.TRANSFORMS):
+        image = (
+            symmetry.transform_mask(LAYOUT, player_1, transform),
+            symmetry.transform_mask(LAYOUT, player_2, transform),
+        )
+        if best is None or image < best:
+            best = image
+    return tablebase.position_index(best[0], best[1], player)
+
+
+def build(path: str = DEFAULT_PATH, plies: int = BOOK_PLIES) -> int:
+    """
+    Solve the game and write the opening book to ``path``.
+
+    Args:
+        path (str): Output file (default is DEFAULT_PATH).
+        plies (int): Positions with fewer marks than this are stored (default is BOOK_PLIES).
+
+    Returns:
+        int: Number of positions stored.
+    """
+    table = tablebase.solve()
+    entries = {}
+    layer = {(0, 0, 1), (0, 0, 2)}
+    for _ in range(plies):
+        next_layer = set()
+        for position in layer:
+            if tablebase._is_terminal(position[0], position[1]):
+                continue
+            index = _canonical_index(*position)
+            entries[index] = table[index]
+            next_layer.update(child for _, child in tablebase._children(*position))
+        layer = next_layer
+
+    packed = array("I", sorted(index << 16 | entry for index, entry in entries.items()))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, plies, len(packed)))
+        file.write(packed.tobytes())
+    os.replace(temp_path, path)
+    return len(packed)
+
+
+class OpeningBook:
+    """
+    The opening book, loaded in memory.
+
+    Attributes:
+        path (str): Path of the book file.
+        plies (int): Positions with fewer marks than this are covered.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        """
+        Read an opening book file.
+
+        Args:
+            path (str): Path of the book file.
+
+        Raises:
+            ValueError: If the file is not an opening book.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, self.plies, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or len(data) != HEADER.size + 4 * count:
+            raise ValueError(f"{path} is not an opening book")
+        packed = array("I", data[HEADER.size:])
+        if sys.byteorder == "big":
+            packed.byteswap()
+        self._entries: Dict[int, int] = {value >> 16: value & 0xFFFF for value in packed}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def probe(self, game) -> Optional[tablebase.Probe]:
+        """
+        Look up the current position of a game.
+
+        Args:
+            game: The game instance, on the 3x3 board.
+
+        Returns:
+            Optional[tablebase.Probe]: The solved entry with the move mapped onto
+            the board, or None if the position is not in the book.
+        """
+        if game.marked_squares >= self.plies:
+            return None
+        (player_1, player_2), transform = symmetry.canonical(game)
+        entry = self._entries.get(tablebase.position_index(player_1, player_2, game.current_player))
+        if entry is None:
+            return None
+        cell = entry >> 2 & 0b1111
+        move = None
+        if cell != tablebase.NO_MOVE:
+            move = symmetry.from_canonical(LAYOUT, LAYOUT.cell_position(cell), transform)
+        return tablebase.Probe(entry & 0b11, move, entry >> 6 & 0b1111)
+
+
+_loaded: Dict[str, Optional[OpeningBook]] = {}
+
+
+def load(path: Optional[str] = None) -> Optional[OpeningBook]:
+    """
+    Return the shared opening book for ``path``, reading it on first use.
+
+    Args:
+        path (str, optional): Book file. Defaults to ``DEFAULT_PATH``.
+
+    Returns:
+        Optional[OpeningBook]: The book, or None if the file does not exist.
+    """
+    path = path or DEFAULT_PATH
+    if _loaded.get(path) is None and os.path.exists(path):
+        _loaded[path] = OpeningBook(path)
+    return _loaded.get(path)
+
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    count = build(output)
+    print(f"Opening book of {count} positions written to {output}")
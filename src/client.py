@@ -0,0 +1,201 @@
+"""
+Client for the game server, and a load generator built on it.
+
+``Client`` sends requests to a ``GameServer`` and matches the replies by id;
+events pushed by the server are queued in ``Client.events``. Run as a module,
+it simulates many players, each playing random moves against the server's AI
+over its own connection, and prints a JSON summary of the load.
+
+Usage:
+
+    python -m src.client --port 8765 --players 1000 --games 5 --level 0
+
+Classes:
+    Client: One connection to the game server.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+
+from typing import List, Optional
+from .tournament import LatencyStats
+
+
+class Client:
+    """
+    One connection to the game server.
+
+    Attributes:
+        events (asyncio.Queue): Events pushed by the server, e.g. the opponent's moves.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.events = asyncio.Queue()
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765, unix: Optional[str] = None) -> "Client":
+        """
+        Open a connection to the server.
+
+        Args:
+            host (str): Server address (default is 127.0.0.1).
+            port (int): Server TCP port (default is 8765).
+            unix (str, optional): Connect to this Unix socket path instead of TCP.
+
+        Returns:
+            Client: The connected client.
+        """
+        if unix is not None:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op: str, **fields) -> dict:
+        """
+        Send a request and wait for its reply.
+
+        Args:
+            op (str): The operation, e.g. "new" or "move".
+            **fields: The other fields of the request.
+
+        Returns:
+            dict: The reply.
+        """
+        request_id = next(self._ids)
+        reply = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = reply
+        message = dict(fields, op=op, id=request_id)
+        self._writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        await self._writer.drain()
+        return await reply
+
+    async def _listen(self) -> None:
+        """Route every line from the server to its request or to the event queue."""
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                reply = self._pending.pop(message.get("id"), None)
+                if reply is not None:
+                    reply.set_result(message)
+                else:
+                    await self.events.put(message)
+        finally:
+            for reply in self._pending.values():
+                if not reply.done():
+                    reply.set_exception(ConnectionError("connection closed"))
+            self._pending.clear()
+
+    async def close(self) -> None:
+        """Close the connection."""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._listener.cancel()
+
+
+# Seconds to wait before retrying a move the server was too busy to take
+BUSY_RETRY_DELAY = 0.05
+
+
+async def play_random_games(client: Client, games: int, level: int, rng: random.Random, latency: LatencyStats) -> int:
+    """
+    Play games against the server's AI with random moves.
+
+    Moves refused because the server is busy are retried after a short delay.
+
+    Args:
+        client (Client): Connection to the server.
+        games (int): Number of games.
+        level (int): AI level of the server's player.
+        rng (random.Random): Source of the random moves.
+        latency (LatencyStats): Where to record the round trip of every move.
+
+    Returns:
+        int: Moves played.
+    """
+    moves = 0
+    for game in range(games):
+        reply = await client.request("new", mode="ai", level=level, ai_first=game % 2 == 1)
+        while not reply["ok"] and reply["error"] == "busy":
+            await asyncio.sleep(BUSY_RETRY_DELAY)
+            reply = await client.request("new", mode="ai", level=level, ai_first=game % 2 == 1)
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        session, state = reply["session"], reply["state"]
+        while state["status"] == "ongoing":
+            empty = [
+                (row, col)
+                for row, cells in enumerate(state["board"])
+                for col, cell in enumerate(cells)
+                if cell == 0
+            ]
+            row, col = rng.choice(empty)
+            while True:
+                start = time.perf_counter()
+                reply = await client.request("move", session=session, row=row, col=col)
+                latency.add(time.perf_counter() - start)
+                if reply["ok"] or reply["error"] != "busy":
+                    break
+                await asyncio.sleep(BUSY_RETRY_DELAY)
+            if not reply["ok"]:
+                raise RuntimeError(reply["error"])
+            state = reply["state"]
+            moves += 1
+        await client.request("leave", session=session)
+    return moves
+
+
+async def _load(args) -> dict:
+    latency = LatencyStats()
+    started = time.perf_counter()
+
+    async def player(number: int) -> int:
+        client = await Client.connect(args.host, args.port, args.unix)
+        try:
+            return await play_random_games(client, args.games, args.level, random.Random(args.seed + number), latency)
+        finally:
+            await client.close()
+
+    moves = sum(await asyncio.gather(*(player(number) for number in range(args.players))))
+    elapsed = time.perf_counter() - started
+    return {
+        "players": args.players,
+        "games": args.players * args.games,
+        "moves": moves,
+        "elapsed_s": round(elapsed, 3),
+        "moves_per_s": round(moves / elapsed, 1),
+        "latency": latency.summary(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate players against the game server")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=8765, help="server TCP port")
+    parser.add_argument("--unix", default=None, help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--players", type=int, default=100, help="simulated players, one connection each")
+    parser.add_argument("--games", type=int, default=1, help="games per player")
+    parser.add_argument("--level", type=int, default=0, help="AI level of the server's player")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random moves")
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(_load(args))))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -11,8 +11,11 @@ BACKGROUND_COLOR = (59, 66, 82)
 BORDER_LINE = (216, 222, 233)
 
 # GAME CONSOLE
-BOARD_ROWS = 3
-BOARD_COLUMNS = 3
+# The board rotates every turn, so it is always square
+BOARD_SIZE = 3
+BOARD_ROWS = BOARD_SIZE
+BOARD_COLUMNS = BOARD_SIZE
+WIN_LENGTH = 3
 
 # FIGURES
 CIRCLE_RADIUS = 60
@@ -1,48 +1,157 @@
-"""Module for managing the game logic of a Tic-Tac-Toe game."""
+"""Module for managing the game logic of a Tic-Tac-Toe game.
+
+Classes:
+    Game: The game being played, with everything needed to play and search it.
+    GameState: Compact immutable snapshot of a game, for storing many of them.
+"""
 
 from typing import Optional, List, Tuple
+from . import bitboard
 from . import constants
-import numpy as np
+from . import transposition
 
 
 class Game:
     """ Game Logic """
 
-    def __init__(self, ai_first = True) -> None:
+    def __init__(self,
+                 ai_first = True,
+                 size: int = constants.BOARD_SIZE,
+                 win_length: int = constants.WIN_LENGTH
+    ) -> None:
         """Instance of Game Logic
 
         Args:
             ai_first (bool, optional): AI First to Move. Defaults to True.
+            size (int, optional): Rows and columns of the board. Defaults to BOARD_SIZE.
+            win_length (int, optional): Marks in a row needed to win. Defaults to WIN_LENGTH.
         """
 
-        self.board = np.zeros((constants.BOARD_ROWS, constants.BOARD_COLUMNS))
+        self.layout = bitboard.get_layout(size, win_length)
+        self.size = size
+        self.win_length = win_length
+        self._piece_keys = transposition.piece_keys(self.layout)
+        # One bitboard per player, masks[0] for player 1 and masks[1] for player 2
+        self.masks = [0, 0]
+        # Zobrist hashes of the board under each symmetry: rotated 0, 1, 2 and 3
+        # more times, then the same mirrored (see transposition)
+        self.hashes = [0] * 8
+        # Bumped on every reset so caches built for the previous game are dropped
+        self.generation = 0
+        self._board_view = None
         self.ai_first = ai_first
         self.current_player = 2 if ai_first else 1
+        self.first_player = self.current_player
         self.gamemode = 'ai' 
-        self.empty_squares = self.board
         self.marked_squares = 0
+        # Winner so far and the marked_squares count of the winning move
+        self.winner = None
+        self._win_ply = 0
+        # Cells played so far, in order, so unmake_move can take them back
+        self._undo_stack = []
+
+    @property
+    def board(self) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Read-only view of the board, indexed as ``board[row][col]``.
+
+        Returns:
+            Tuple[Tuple[int, ...], ...]: 0 for an empty cell, otherwise the player number.
+        """
+        if self._board_view is None:
+            player_1, player_2 = self.masks
+            view = []
+            for row in range(self.size):
+                cells = []
+                for col in range(self.size):
+                    bit = 1 << self.layout.cell_index(row, col)
+                    cells.append(1 if player_1 & bit else 2 if player_2 & bit else 0)
+                view.append(tuple(cells))
+            self._board_view = tuple(view)
+        return self._board_view
+
+    def copy(self) -> "Game":
+        """Return an independent copy of the game, e.g. for a search on another thread."""
+        clone = Game.__new__(Game)
+        clone.__dict__.update(self.__dict__)
+        clone.masks = list(self.masks)
+        clone.hashes = list(self.hashes)
+        clone._undo_stack = list(self._undo_stack)
+        return clone
+
+    def snapshot(self) -> "GameState":
+        """Return a compact immutable snapshot of the current position."""
+        return GameState(
+            self.masks[0], self.masks[1], self.current_player,
+            self.first_player, self.size, self.win_length,
+        )
+
+    @classmethod
+    def from_state(cls, state: "GameState") -> "Game":
+        """
+        Build a game at the position of a snapshot.
+
+        The moves that led there are not part of the snapshot, so they cannot
+        be taken back with unmake_move. Nothing else needs them: the AI,
+        including its parallel search, works from the position alone.
+
+        Args:
+            state (GameState): The snapshot.
+
+        Returns:
+            Game: A new game at that position.
+        """
+        game = cls(ai_first=state.first_player == 2, size=state.size, win_length=state.win_length)
+        game.masks = [state.player_1, state.player_2]
+        for player, mask in ((1, state.player_1), (2, state.player_2)):
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                game._toggle_hash(player, bit.bit_length() - 1)
+            if game.layout.has_win(game.masks[player - 1]):
+                game.winner = player
+                game._win_ply = state.moves
+        game.marked_squares = state.moves
+        game.current_player = state.current_player
+        return game
+
+    @property
+    def hash(self) -> int:
+        """Zobrist hash of the current board."""
+        return self.hashes[0]
+
+    @property
+    def canonical_hash(self) -> int:
+        """Zobrist hash shared by the board and its 7 rotations and reflections."""
+        return min(self.hashes)
 
     def reset(self):
         """ Reset the game every time it end"""
-        self.board = np.zeros((constants.BOARD_ROWS, constants.BOARD_COLUMNS))
+        self.masks = [0, 0]
+        self.hashes = [0] * 8
+        self.generation += 1
+        self._board_view = None
+        self._undo_stack = []
         self.marked_squares = 0
+        self._win_ply = 0
+        self.winner = None
         self.ai_first = not self.ai_first
         self.current_player = 2 if self.ai_first else 1
+        self.first_player = self.current_player
 
 
     def final_state(self) -> Optional[int]:
         """
         Determine the final state of the game.
 
-        Returns:
-
+        Wins are detected when the winning mark is placed (see _mark_move), so
+        this only reads the cached winner and checks if the board is full.
 
         Returns:
             Optional[int]: 0 for draw, 1 for player 1 win, 2 for player 2 win, None for ongoing match
         """
-        for player in [1, 2]:
-            if self._check_win(player):
-                return player
+        if self.winner is not None:
+            return self.winner
         
         if self.is_board_full():
             return 0
@@ -61,7 +170,10 @@ class Game:
         Returns:
             str: Text whether it is draw, win, or continue
         """
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            return "continue"
         if self._space_is_available(row, col):
+            self._undo_stack.append(self.layout.cell_index(row, col))
             self._mark_move(row, col, self.current_player)
             state = self.final_state()
             if state is not None:  
@@ -71,15 +183,30 @@ class Game:
 
     def _rotate_board(self) -> None:
         """ Rotate the board every turn"""
-        self.board = np.rot90(self.board, k=1)
+        masks = self.masks
+        masks[0] = self.layout.rotate(masks[0])
+        masks[1] = self.layout.rotate(masks[1])
+        hashes = self.hashes
+        self.hashes = [hashes[1], hashes[2], hashes[3], hashes[0], hashes[5], hashes[6], hashes[7], hashes[4]]
+        self._board_view = None
+
+    def _unrotate_board(self) -> None:
+        """Undo one call to _rotate_board"""
+        masks = self.masks
+        masks[0] = self.layout.unrotate(masks[0])
+        masks[1] = self.layout.unrotate(masks[1])
+        hashes = self.hashes
+        self.hashes = [hashes[3], hashes[0], hashes[1], hashes[2], hashes[7], hashes[4], hashes[5], hashes[6]]
+        self._board_view = None
 
     def _space_is_available(self, row: int, column: int) -> bool:
         """Check if space is available"""
-        return self.board[row][column] == 0
+        occupied = self.masks[0] | self.masks[1]
+        return not occupied >> self.layout.cell_index(row, column) & 1
 
     def is_board_full(self) -> bool:
-        """Use the count function to count if there's still 0"""
-        return np.count_nonzero(self.board) == self.board.size
+        """Check if every cell is taken by either player"""
+        return self.masks[0] | self.masks[1] == self.layout.full_mask
     
     def _mark_move(self, row: int, column: int, player: int) -> None:
         """Mark a move in a board
@@ -89,19 +216,78 @@ class Game:
             column (int): Column wher the user want to place
             player (int): Player 1 for user or 2 for AI/player 2
         """
-        self.board[row][column] = player
+        cell = self.layout.cell_index(row, column)
+        mask = self.masks[player - 1] | 1 << cell
+        self.masks[player - 1] = mask
+        self._toggle_hash(player, cell)
         self.marked_squares += 1
+        # Only lines through the new mark can have been completed. The
+        # rotation maps lines onto lines, so it cannot change the result.
+        if self.winner is None and self.layout.wins_through(mask, cell):
+            self.winner = player
+            self._win_ply = self.marked_squares
         self._rotate_board()
 
+    def _toggle_hash(self, player: int, cell: int) -> None:
+        """XOR the key of a mark into the eight symmetry hashes"""
+        keys = self._piece_keys[player - 1][cell]
+        hashes = self.hashes
+        hashes[0] ^= keys[0]
+        hashes[1] ^= keys[1]
+        hashes[2] ^= keys[2]
+        hashes[3] ^= keys[3]
+        hashes[4] ^= keys[4]
+        hashes[5] ^= keys[5]
+        hashes[6] ^= keys[6]
+        hashes[7] ^= keys[7]
+
+    def make_move(self, row: int, column: int) -> None:
+        """Play a move for the current player without any checks.
+
+        Places the mark, rotates the board and passes the turn. The move can be
+        taken back exactly with unmake_move, so the AI can search in place
+        instead of copying the game.
+
+        Args:
+            row (int): Row of the empty square
+            column (int): Column of the empty square
+        """
+        cell = self.layout.cell_index(row, column)
+        self._undo_stack.append(cell)
+        self._mark_move(row, column, self.current_player)
+        self.current_player = 3 - self.current_player
+
+    def unmake_move(self) -> None:
+        """Take back the last move played with make_move.
+
+        Restores the board, hash, marked_squares and current_player to what
+        they were before that move.
+        """
+        cell = self._undo_stack.pop()
+        bit = 1 << cell
+        self._unrotate_board()
+        player = 1 if self.masks[0] & bit else 2
+        self.masks[player - 1] &= ~bit
+        self._toggle_hash(player, cell)
+        if self.marked_squares == self._win_ply:
+            self.winner = None
+        self.marked_squares -= 1
+        self.current_player = player
+
     
-    def get_empty_squares(self):
+    @property
+    def moves(self) -> List[Tuple[int, int]]:
+        """Moves played since the last reset, as (row, col) on the board they were played on."""
+        return [self.layout.positions[cell] for cell in self._undo_stack]
+
+    @property
+    def move_cells(self) -> Tuple[int, ...]:
+        """Moves played since the last reset, as cell indexes on the board they were played on."""
+        return tuple(self._undo_stack)
+
+    def get_empty_squares(self) -> List[Tuple[int, int]]:
         """Get a list of empty squares in the board"""
-        empty_sqrs = []
-        for row in range(constants.BOARD_ROWS):
-            for col in range(constants.BOARD_COLUMNS):
-                if self._space_is_available(row, col):
-                    empty_sqrs.append((row, col))
-        return empty_sqrs
+        return list(self.layout.empty_squares(self.masks[0] | self.masks[1]))
 
     def get_current_player_symbol(self):
         return 'O' if self.current_player == 1 else 'X'
@@ -117,27 +303,32 @@ class Game:
         Returns:
             bool: True if the player has won the game, False otherwise
         """
-        # Vertical Check
-        for col in range(constants.BOARD_COLUMNS):
-            if all(self.board[row][col] == player for row in range(constants.BOARD_ROWS)):
-                return True
-        
-        # Horizontal Check
-        for row in range(constants.BOARD_ROWS):
-            if all(self.board[row][col] == player for col in range(constants.BOARD_COLUMNS)):
-                return True
-        
-        # Diagonal Checks
-        if all(self.board[i][i] == player for i in range(3)) or \
-        all(self.board[i][2-i] == player for i in range(3)):
-            return True
-        
-        return False
+        return self.layout.has_win(self.masks[player - 1])
+
+    def winning_line(self) -> Optional[List[Tuple[int, int]]]:
+        """
+        Get the cells of the winning line.
+
+        Returns:
+            Optional[List[Tuple[int, int]]]: (row, col) of each cell along the line, or None if nobody has won
+        """
+        if self.winner is None:
+            return None
+        cells = self.layout.winning_line(self.masks[self.winner - 1])
+        return [self.layout.positions[cell] for cell in cells]
     
     def restart(self) -> None:
         """Restart the game."""
-        self.board = np.zeros((constants.BOARD_ROWS, constants.BOARD_COLUMNS))
+        self.masks = [0, 0]
+        self.hashes = [0] * 8
+        self.generation += 1
+        self._board_view = None
+        self._undo_stack = []
+        self.marked_squares = 0
+        self._win_ply = 0
+        self.winner = None
         self.current_player = 1
+        self.first_player = 1
 
     def _switch_player(self) -> None:
         """Switch the current player."""
@@ -166,6 +357,7 @@ class Game:
         if ai_move is not None:
             row, col = ai_move
             if self._space_is_available(row, col):
+                self._undo_stack.append(self.layout.cell_index(row, col))
                 self._mark_move(row, col, self.current_player) 
                 if self._check_win(self.current_player):
                     return "ai_win"
@@ -173,4 +365,81 @@ class Game:
                     return "draw"
                 self._switch_player()
             return "continue"
-        return "no_moves"
\ No newline at end of file
+        return "no_moves"
+
+
+class GameState:
+    """
+    Compact immutable snapshot of a game.
+
+    Holds the two player bitboards and a few small ints, with no per-instance
+    ``__dict__``. The target is at most 160 bytes per snapshot on 3x3, against
+    about 550 bytes for a ``Game`` (checked by the ``memory.*`` benchmarks). Snapshots are hashable and compare by
+    position, so they can key dicts and sets. Convert with ``Game.snapshot``
+    and ``Game.from_state``.
+
+    Attributes:
+        player_1 (int): Bitboard of player 1.
+        player_2 (int): Bitboard of player 2.
+        current_player (int): Player to move (1 or 2).
+        first_player (int): Player who moved first (1 or 2).
+        size (int): Rows and columns of the board.
+        win_length (int): Marks in a row needed to win.
+    """
+
+    __slots__ = ("player_1", "player_2", "current_player", "first_player", "size", "win_length")
+
+    def __init__(self,
+                 player_1: int = 0,
+                 player_2: int = 0,
+                 current_player: int = 1,
+                 first_player: int = 1,
+                 size: int = constants.BOARD_SIZE,
+                 win_length: int = constants.WIN_LENGTH
+    ) -> None:
+        """Snapshot of a position
+
+        Args:
+            player_1 (int, optional): Bitboard of player 1's marks. Defaults to 0.
+            player_2 (int, optional): Bitboard of player 2's marks. Defaults to 0.
+            current_player (int, optional): Player to move, 1 or 2. Defaults to 1.
+            first_player (int, optional): Player who moved first, 1 or 2. Defaults to 1.
+            size (int, optional): Rows and columns of the board. Defaults to BOARD_SIZE.
+            win_length (int, optional): Marks in a row needed to win. Defaults to WIN_LENGTH.
+        """
+        for name, value in zip(self.__slots__, (player_1, player_2, current_player, first_player, size, win_length)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("GameState is immutable")
+
+    def __delattr__(self, name) -> None:
+        raise AttributeError("GameState is immutable")
+
+    def _fields(self) -> tuple:
+        return (self.player_1, self.player_2, self.current_player, self.first_player, self.size, self.win_length)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
+    def __reduce__(self):
+        return GameState, self._fields()
+
+    def __repr__(self) -> str:
+        return "GameState(player_1={}, player_2={}, current_player={}, first_player={}, size={}, win_length={})".format(
+            *self._fields()
+        )
+
+    def copy(self) -> "GameState":
+        """Snapshots are immutable, so a copy is the snapshot itself."""
+        return self
+
+    @property
+    def moves(self) -> int:
+        """Number of marks on the board, one per move played."""
+        return bin(self.player_1 | self.player_2).count("1")
@@ -0,0 +1,199 @@
+"""
+Monte Carlo Tree Search for boards too big to search with minimax.
+
+The tree is grown with UCT: from the root, descend to the child with the best
+upper confidence bound until a node with untried moves is reached, expand one
+of them, and score the new node with random playouts. The playouts of one
+leaf run together on a ``GameBatch``, a NumPy array of boards, instead of one
+``Game`` per playout. The move played is the most visited child of the root.
+
+The tree is kept between moves: the next search starts from the node of the
+position that was actually reached, with every playout below it.
+
+Classes:
+    MCTS: UCT search with batched random playouts.
+"""
+
+import math
+import random
+import time
+import numpy as np
+
+from typing import Optional, Tuple
+from . import batch
+
+
+# Exploration constant of the UCT formula
+EXPLORATION = math.sqrt(2)
+
+
+class _Node:
+    """A position in the search tree, scored for the player who moved into it."""
+
+    __slots__ = ("move", "parent", "children", "untried", "player", "key", "visits", "reward")
+
+    def __init__(self, game, move: Optional[int], parent: Optional["_Node"], rng) -> None:
+        self.move = move
+        self.parent = parent
+        self.children = []
+        # Moves not expanded yet, as cell indexes, popped from the end in random order
+        self.untried = []
+        if game.final_state() is None:
+            occupied = game.masks[0] | game.masks[1]
+            self.untried = [cell for cell in range(game.layout.cells) if not occupied >> cell & 1]
+            rng.shuffle(self.untried)
+        # The player who made ``move``; rewards are counted from their side
+        self.player = 3 - game.current_player
+        self.key = (game.masks[0], game.masks[1], game.current_player)
+        self.visits = 0
+        self.reward = 0.0
+
+    def best_child(self) -> "_Node":
+        """The child with the highest upper confidence bound."""
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.reward / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits),
+        )
+
+
+class MCTS:
+    """
+    UCT search with batched random playouts.
+
+    Attributes:
+        batch_size (int): Random playouts run together from every new leaf.
+        rng (random.Random): Source of randomness for move ordering.
+        playouts (int): Playouts of the last search.
+        depth (int): Deepest node reached by the last search, in plies below the root.
+        reused (int): Playouts kept from the previous search by the last search.
+    """
+
+    def __init__(self, batch_size: int = 32, rng: Optional[random.Random] = None) -> None:
+        """
+        Initialize the search.
+
+        Args:
+            batch_size (int): Random playouts per leaf (default is 32).
+            rng (random.Random, optional): Seeded source of randomness. Defaults to the random module.
+        """
+        self.batch_size = batch_size
+        self.rng = rng if rng is not None else random
+        self.reseed()
+        self._batch = None
+        self._root = None
+        self.playouts = 0
+        self.depth = 0
+        self.reused = 0
+
+    def _find_root(self, game) -> _Node:
+        """Reuse the node of the current position from the previous tree, or start a new one."""
+        key = (game.masks[0], game.masks[1], game.current_player)
+        # Our move and the opponent's answer: the position is at most two plies down
+        frontier = [self._root] if self._root is not None else []
+        for _ in range(3):
+            for node in frontier:
+                if node.key == key:
+                    node.parent = None
+                    return node
+            frontier = [child for node in frontier for child in node.children]
+        return _Node(game, None, None, self.rng)
+
+    def search(self,
+               game,
+               time_limit: Optional[float] = None,
+               playout_limit: Optional[int] = None,
+               stop_event=None
+    ) -> Tuple[float, Optional[Tuple[int, int]]]:
+        """
+        Grow the tree from the current position and pick a move.
+
+        At least one leaf is scored, even with no budget at all.
+
+        Args:
+            game: The game instance; it is returned in the position it was given in.
+            time_limit (float, optional): Wall-clock seconds for the search.
+            playout_limit (int, optional): Random playouts for the search, counting reused ones.
+            stop_event (threading.Event, optional): Stops the search when set.
+
+        Returns:
+            Tuple[float, Optional[Tuple[int, int]]]: Expected score of the move for the
+            player to move, from -1 (loss) to 1 (win), and the move as (row, col).
+        """
+        layout = game.layout
+        if self._batch is None or self._batch.layout is not layout:
+            self._batch = batch.GameBatch(self.batch_size, game.size, game.win_length)
+            self._root = None
+
+        root = self._find_root(game)
+        self._root = root
+        self.reused = root.visits
+        self.depth = 0
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        playouts = 0
+
+        # A winning move needs no statistics
+        own = game.masks[game.current_player - 1]
+        for move in root.untried + [child.move for child in root.children]:
+            if layout.wins_through(own | 1 << move, move):
+                return 1.0, layout.positions[move]
+
+        while True:
+            node, path = root, []
+            # Selection
+            while not node.untried and node.children:
+                node = node.best_child()
+                game.make_move(*layout.positions[node.move])
+                path.append(node)
+            # Expansion
+            if node.untried:
+                move = node.untried.pop()
+                game.make_move(*layout.positions[move])
+                child = _Node(game, move, node, self.rng)
+                node.children.append(child)
+                node = child
+                path.append(node)
+            self.depth = max(self.depth, len(path))
+
+            # Simulation: a finished position is scored as if played out a full batch
+            count = self.batch_size
+            state = game.final_state()
+            if state is None:
+                self._batch.set_position(game)
+                status = self._batch.play_random(self._np_rng)
+                reward = float((status == node.player).sum()) + 0.5 * float((status == batch.DRAW).sum())
+            else:
+                reward = count * (1.0 if state == node.player else 0.5 if state == batch.DRAW else 0.0)
+            for _ in path:
+                game.unmake_move()
+            playouts += count
+
+            # Backpropagation, switching sides at every ply
+            while node is not None:
+                node.visits += count
+                node.reward += reward
+                reward = count - reward
+                node = node.parent
+
+            if not root.children and not root.untried:
+                break
+            if stop_event is not None and stop_event.is_set():
+                break
+            if playout_limit is not None and root.visits >= playout_limit:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        self.playouts = playouts
+        if not root.children:
+            return 0.0, None
+        best = max(root.children, key=lambda child: child.visits)
+        return 2 * best.reward / best.visits - 1, layout.positions[best.move]
+
+    def reseed(self) -> None:
+        """Draw the seed of the random playouts from ``rng`` again, e.g. after reseeding it."""
+        self._np_rng = np.random.default_rng(self.rng.getrandbits(64))
+
+    def clear(self) -> None:
+        """Drop the tree, e.g. when a new game starts."""
+        self._root = None
@@ -0,0 +1,249 @@
+"""
+Compact binary records of played games.
+
+A record file starts with ``MAGIC`` and holds any number of games back to
+back, so games can be appended to it and read back one at a time, without
+ever loading the whole file. Each game is a fixed ``HEADER`` followed by its
+moves, packed at ``move_bits`` bits each: 4 bits (half a byte) on 3x3.
+
+    size, win_length, first player, level of player 1, level of player 2,
+    result, seed (uint32), number of moves (uint16), packed moves
+
+A level of ``HUMAN`` stands for a human player, a result of ``UNFINISHED`` for
+a game that was abandoned. Moves are cell indexes (``row * size + col``) on the
+board as it was when the move was played, which is what ``Game.handle_move``
+takes, so a record replays into the exact same game.
+
+Classes:
+    GameRecord: One played game.
+    RecordWriter: Appends games to a record file.
+
+Functions:
+    move_bits: Bits used per move on a board.
+    encode: Pack a game into bytes.
+    decode: Unpack a game from its header and move bytes.
+    read_records: Iterate over the games of a record file.
+    replay: Play a record back through Game.handle_move.
+"""
+
+import struct
+
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Tuple
+from .game import Game
+
+
+MAGIC = b"TWTR\x01"
+HEADER = struct.Struct("<BBBBBBIH")
+
+# Level byte of a human player, and result byte of an abandoned game
+HUMAN = 0xFF
+UNFINISHED = 0xFF
+
+
+class GameRecord(NamedTuple):
+    """
+    One played game.
+
+    Attributes:
+        size (int): Rows and columns of the board.
+        win_length (int): Marks in a row needed to win.
+        first_player (int): Player who moved first, 1 or 2.
+        levels (Tuple[Optional[int], Optional[int]]): AI level of player 1 and
+            player 2, None for a human.
+        seed (int): Seed of the random choices of the AIs, 0 if unknown.
+        result (Optional[int]): 0 for a draw, otherwise the winner, None if unfinished.
+        moves (Tuple[int, ...]): Cell index of every move, in order.
+    """
+    size: int
+    win_length: int
+    first_player: int
+    levels: Tuple[Optional[int], Optional[int]]
+    seed: int
+    result: Optional[int]
+    moves: Tuple[int, ...]
+
+    @classmethod
+    def from_game(cls,
+                  game: Game,
+                  levels: Tuple[Optional[int], Optional[int]] = (None, None),
+                  seed: int = 0
+    ) -> "GameRecord":
+        """
+        Record the moves played in a game since its last reset.
+
+        Args:
+            game (Game): The game.
+            levels (Tuple[Optional[int], Optional[int]]): AI level of each player, None for humans.
+            seed (int): Seed of the random choices of the AIs (default is 0).
+
+        Returns:
+            GameRecord: The record.
+        """
+        return cls(
+            game.size, game.win_length, game.first_player, tuple(levels),
+            seed, game.final_state(), game.move_cells,
+        )
+
+
+def move_bits(size: int) -> int:
+    """Bits used per move on a board of ``size`` rows and columns: 4 on 3x3."""
+    return max(1, (size * size - 1).bit_length())
+
+
+def encode(record: GameRecord) -> bytes:
+    """
+    Pack a game into bytes.
+
+    Args:
+        record (GameRecord): The game.
+
+    Returns:
+        bytes: The header followed by the packed moves.
+    """
+    bits = move_bits(record.size)
+    packed = 0
+    for index, cell in enumerate(record.moves):
+        packed |= cell << (index * bits)
+    levels = [HUMAN if level is None else level for level in record.levels]
+    header = HEADER.pack(
+        record.size, record.win_length, record.first_player, levels[0], levels[1],
+        UNFINISHED if record.result is None else record.result,
+        record.seed & 0xFFFFFFFF, len(record.moves),
+    )
+    return header + packed.to_bytes((len(record.moves) * bits + 7) // 8, "little")
+
+
+def _move_bytes(header: tuple) -> int:
+    """Length of the packed moves following an unpacked header."""
+    return (header[7] * move_bits(header[0]) + 7) // 8
+
+
+def decode(header: bytes, data: bytes) -> GameRecord:
+    """
+    Unpack a game.
+
+    Args:
+        header (bytes): The HEADER.size bytes of the header.
+        data (bytes): The packed moves that follow it.
+
+    Returns:
+        GameRecord: The game.
+    """
+    size, win_length, first_player, level_1, level_2, result, seed, count = HEADER.unpack(header)
+    bits = move_bits(size)
+    mask = (1 << bits) - 1
+    packed = int.from_bytes(data, "little")
+    moves = tuple(packed >> (index * bits) & mask for index in range(count))
+    return GameRecord(
+        size, win_length, first_player,
+        (None if level_1 == HUMAN else level_1, None if level_2 == HUMAN else level_2),
+        seed, None if result == UNFINISHED else result, moves,
+    )
+
+
+class RecordWriter:
+    """
+    Appends games to a record file.
+
+    Writes are buffered; the file is complete once the writer is closed.
+    Use it as a context manager.
+
+    Attributes:
+        path (str): The record file.
+        games (int): Games written by this writer.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a record file for appending, creating it if needed.
+
+        Args:
+            path (str): The record file.
+
+        Raises:
+            ValueError: If the file exists and is not a record file.
+        """
+        self.path = path
+        self.games = 0
+        # Writes always go to the end; reading is only for checking the header
+        self._file: BinaryIO = open(path, "a+b")
+        self._file.seek(0, 2)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        else:
+            self._file.seek(0)
+            magic = self._file.read(len(MAGIC))
+            if magic != MAGIC:
+                self._file.close()
+                raise ValueError(f"{path} is not a game record file")
+
+    def write(self, record: GameRecord) -> None:
+        """Append one game."""
+        self._file.write(encode(record))
+        self.games += 1
+
+    def flush(self) -> None:
+        """Push the buffered games to the file."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """
+    Iterate over the games of a record file, reading one game at a time.
+
+    Args:
+        path (str): The record file.
+
+    Yields:
+        GameRecord: Every game, in the order they were written.
+
+    Raises:
+        ValueError: If the file is not a record file or ends in the middle of a game.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a game record file")
+        while True:
+            header = file.read(HEADER.size)
+            if not header:
+                return
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            length = _move_bytes(HEADER.unpack(header))
+            data = file.read(length)
+            if len(data) < length:
+                raise ValueError(f"{path} is truncated")
+            yield decode(header, data)
+
+
+def replay(record: GameRecord) -> Game:
+    """
+    Play a record back through ``Game.handle_move``.
+
+    Args:
+        record (GameRecord): The game.
+
+    Returns:
+        Game: The game after the last move.
+
+    Raises:
+        ValueError: If a move is illegal or comes after the end of the game.
+    """
+    game = Game(ai_first=record.first_player == 2, size=record.size, win_length=record.win_length)
+    for ply, cell in enumerate(record.moves):
+        if game.final_state() is not None:
+            raise ValueError(f"move {ply} comes after the end of the game")
+        if cell >= game.layout.cells or not game._space_is_available(*game.layout.positions[cell]):
+            raise ValueError(f"move {ply} is illegal")
+        game.handle_move(*game.layout.positions[cell])
+    return game
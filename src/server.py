@@ -0,0 +1,525 @@
+"""
+Headless game server hosting many concurrent sessions.
+
+Clients speak line-delimited JSON over TCP or a Unix socket: one request object
+per line, answered by one reply object per line. Every request may carry an
+``"id"``, which is echoed in its reply.
+
+    {"op": "new", "mode": "ai", "level": 1, "ai_first": false}
+    {"op": "new", "mode": "pvp"}
+    {"op": "join", "session": "3"}
+    {"op": "move", "session": "3", "row": 0, "col": 2}
+    {"op": "state", "session": "3"}
+    {"op": "leave", "session": "3"}
+    {"op": "stats"}
+
+Replies are ``{"ok": true, ...}`` or ``{"ok": false, "error": "..."}``. In a
+player vs player session the other player is sent
+``{"event": "state", "session": ..., "state": {...}}`` after every move, and
+``{"event": "left", ...}`` when the opponent leaves.
+
+Moves go through ``Game.handle_move``, so the board rotates exactly as in the
+pygame front end. The AI searches a copy of the game in a thread pool, so the
+event loop never blocks. A connection is served one request at a time, and
+the reply to a move against the AI only comes once the AI has answered, so a
+client cannot queue up work faster than it is done. At most ``ai_workers``
+searches run at once; when ``max_waiting`` more are already waiting, moves are
+refused with a "busy" error instead of piling up. New sessions are refused
+once ``max_sessions`` or ``max_memory`` is reached, memory being estimated per
+session by ``Session.memory``. With a ``record`` path, every session that
+played a move is appended to a binary game record file when it closes (see
+``record``).
+
+Usage:
+
+    python -m src.server --port 8765
+    python -m src.server --unix /tmp/twist.sock
+    python -m src.server --record games.twr
+
+Classes:
+    Session: One game and its players.
+    GameServer: Accepts connections and runs the sessions.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from . import constants
+from .ai import AI
+from .game import Game
+from .record import GameRecord, RecordWriter
+
+
+# Longest request line accepted, in bytes
+MAX_LINE = 4096
+
+# Objects shared by every game of the same size, not counted per session
+_SHARED_ATTRIBUTES = ("layout", "_piece_keys")
+
+# Approximate size of one LRU transposition table entry: the Entry tuple, its
+# key and value objects and the OrderedDict node
+_TABLE_ENTRY_BYTES = 300
+
+
+def _deep_sizeof(value) -> int:
+    """Size of an object and of the lists and tuples it holds."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(_deep_sizeof(item) for item in value)
+    return size
+
+
+class Session:
+    """
+    One game and its players.
+
+    Attributes:
+        id (str): Session identifier.
+        mode (str): "pvp" or "ai".
+        game (Game): The game being played.
+        ai (AI): The AI opponent, None in player vs player sessions.
+        players (Dict[int, object]): Connection of each seated player.
+        thinking (bool): True while the AI searches for its move.
+        memory_bytes (int): Size of the session when the server last accounted for it.
+    """
+
+    def __init__(self, session_id: str, mode: str, game: Game, ai: Optional[AI] = None) -> None:
+        self.id = session_id
+        self.mode = mode
+        self.game = game
+        self.ai = ai
+        self.players = {}
+        self.thinking = False
+        self.memory_bytes = 0
+
+    def state(self) -> dict:
+        """Return the game as a JSON-friendly dict."""
+        game = self.game
+        final = game.final_state()
+        if final is None:
+            status = "ongoing"
+        elif final == 0:
+            status = "draw"
+        else:
+            status = f"player_{final}_win"
+        return {
+            "board": [list(row) for row in game.board],
+            "current_player": game.current_player,
+            "status": status,
+            "moves": game.marked_squares,
+        }
+
+    def memory(self) -> int:
+        """
+        Estimate the bytes held by this session.
+
+        Counts the game, its containers and the AI with its transposition
+        table. Tables shared by every game of the same size are not counted.
+
+        Returns:
+            int: Approximate size in bytes.
+        """
+        game = self.game
+        size = sys.getsizeof(self) + sys.getsizeof(game) + sys.getsizeof(game.__dict__)
+        for name, value in game.__dict__.items():
+            if name not in _SHARED_ATTRIBUTES:
+                size += _deep_sizeof(value)
+        if self.ai is not None:
+            size += sys.getsizeof(self.ai) + sys.getsizeof(self.ai.__dict__)
+            size += sys.getsizeof(self.ai.table) + len(self.ai.table) * _TABLE_ENTRY_BYTES
+        return size
+
+
+class GameServer:
+    """
+    Accepts connections and runs the sessions.
+
+    Attributes:
+        sessions (Dict[str, Session]): Open sessions by id.
+        max_sessions (int): Open sessions allowed at once.
+        max_memory (int): Estimated session bytes allowed at once.
+        table_size (int): Transposition table entries per AI.
+        time_limit (float): Seconds per AI move, None for the level's budget.
+        node_limit (int): Nodes per AI move, None for the level's budget.
+        records (RecordWriter): Where finished sessions are recorded, or None.
+    """
+
+    def __init__(self,
+                 max_sessions: int = 10000,
+                 max_memory: int = 256 << 20,
+                 ai_workers: int = 4,
+                 max_waiting: int = 1000,
+                 table_size: int = 1 << 10,
+                 time_limit: Optional[float] = 0.5,
+                 node_limit: Optional[int] = None,
+                 record: Optional[str] = None
+    ) -> None:
+        """
+        Initialize a server without sessions.
+
+        Args:
+            max_sessions (int): Open sessions allowed at once (default is 10000).
+            max_memory (int): Estimated session bytes allowed at once (default is 256 MiB).
+            ai_workers (int): AI searches run at once (default is 4).
+            max_waiting (int): AI searches allowed to wait for a worker (default is 1000).
+            table_size (int): Transposition table entries per AI (default is 1024).
+            time_limit (float, optional): Seconds per AI move (default is 0.5).
+            node_limit (int, optional): Nodes per AI move.
+            record (str, optional): Game record file to append every closed session to.
+        """
+        self.sessions: Dict[str, Session] = {}
+        self.max_sessions = max_sessions
+        self.max_memory = max_memory
+        self.table_size = table_size
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.records = RecordWriter(record) if record is not None else None
+        self._executor = ThreadPoolExecutor(ai_workers, thread_name_prefix="ai-search")
+        self._ai_slots = asyncio.Semaphore(ai_workers)
+        self._max_waiting = max_waiting
+        self._waiting = 0
+        self._ids = itertools.count(1)
+        self._memory = 0
+        self._connections = 0
+        self._server = None
+
+    ##### LIFECYCLE #####
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix: Optional[str] = None) -> None:
+        """
+        Start listening.
+
+        Args:
+            host (str): Interface to listen on (default is 127.0.0.1).
+            port (int): TCP port, 0 to pick a free one (default is 8765).
+            unix (str, optional): Listen on this Unix socket path instead of TCP.
+        """
+        if unix is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, unix, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_LINE)
+
+    @property
+    def port(self) -> Optional[int]:
+        """TCP port the server listens on, None for a Unix socket."""
+        address = self._server.sockets[0].getsockname()
+        return address[1] if isinstance(address, tuple) else None
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled."""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening and shut the AI workers down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.records is not None:
+            for session in self.sessions.values():
+                self._record(session)
+            self.records.close()
+
+    ##### CONNECTIONS #####
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one client until it disconnects."""
+        connection = _Connection(writer)
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await connection.send({"ok": False, "error": "request too long"})
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    await connection.send({"ok": False, "error": "invalid json"})
+                    continue
+                reply = await self.handle(request, connection)
+                if "id" in request:
+                    reply["id"] = request["id"]
+                await connection.send(reply)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            for session_id in list(connection.sessions):
+                await self._leave(session_id, connection)
+            writer.close()
+
+    async def handle(self, request: dict, connection) -> dict:
+        """
+        Answer one request.
+
+        Args:
+            request (dict): The decoded request.
+            connection: The client connection, to seat it in sessions and push events.
+
+        Returns:
+            dict: The reply.
+        """
+        op = request.get("op")
+        try:
+            if op == "new":
+                return await self._new(request, connection)
+            if op == "join":
+                return self._join(request, connection)
+            if op == "move":
+                return await self._move(request, connection)
+            if op == "state":
+                session = self._session(request)
+                reply = {"ok": True, "session": session.id, "state": session.state()}
+                self._account(session)
+                return reply
+            if op == "leave":
+                await self._leave(self._session(request).id, connection)
+                return {"ok": True}
+            if op == "stats":
+                return {"ok": True, "stats": self.stats()}
+        except _RequestError as error:
+            return {"ok": False, "error": str(error)}
+        return {"ok": False, "error": f"unknown op: {op}"}
+
+    ##### OPERATIONS #####
+
+    def _session(self, request: dict) -> Session:
+        session = self.sessions.get(str(request.get("session")))
+        if session is None:
+            raise _RequestError("unknown session")
+        return session
+
+    async def _new(self, request: dict, connection) -> dict:
+        if len(self.sessions) >= self.max_sessions or self._memory >= self.max_memory:
+            raise _RequestError("server full")
+        mode = request.get("mode", "ai")
+        if mode not in ("ai", "pvp"):
+            raise _RequestError(f"unknown mode: {mode}")
+        try:
+            size = int(request.get("size", constants.BOARD_SIZE))
+            win_length = int(request.get("win_length", constants.WIN_LENGTH))
+            level = int(request.get("level", 1))
+        except (TypeError, ValueError):
+            raise _RequestError("size, win_length and level must be integers")
+        if not 1 <= win_length <= size <= 8:
+            raise _RequestError("unsupported board")
+
+        ai_first = request.get("ai_first", False)
+        if not isinstance(ai_first, bool):
+            raise _RequestError("ai_first must be true or false")
+        if mode == "ai" and ai_first:
+            self._check_ai_capacity()
+
+        game = Game(ai_first=ai_first, size=size, win_length=win_length)
+        game.gamemode = mode
+        ai = None
+        if mode == "ai":
+            ai = AI(
+                game, level, player=2, table_size=self.table_size, replacement="lru",
+                time_limit=self.time_limit, node_limit=self.node_limit,
+            )
+        session = Session(str(next(self._ids)), mode, game, ai)
+        session.players[1] = connection
+        connection.sessions.add(session.id)
+        self.sessions[session.id] = session
+
+        reply = {"ok": True, "session": session.id, "player": 1}
+        if ai is not None and game.current_player == ai.player:
+            reply["ai_move"] = await self._ai_move(session)
+        reply["state"] = session.state()
+        self._account(session)
+        return reply
+
+    def _join(self, request: dict, connection) -> dict:
+        session = self._session(request)
+        if session.mode != "pvp" or 2 in session.players:
+            raise _RequestError("session is full")
+        session.players[2] = connection
+        connection.sessions.add(session.id)
+        session.players[1].push({"event": "joined", "session": session.id, "player": 2})
+        reply = {"ok": True, "session": session.id, "player": 2, "state": session.state()}
+        self._account(session)
+        return reply
+
+    async def _move(self, request: dict, connection) -> dict:
+        session = self._session(request)
+        game = session.game
+        player = next((number for number, seated in session.players.items() if seated is connection), None)
+        if player is None:
+            raise _RequestError("not a player of this session")
+        if session.thinking or game.final_state() is not None or game.current_player != player:
+            raise _RequestError("not your turn")
+        try:
+            row, col = int(request["row"]), int(request["col"])
+        except (KeyError, TypeError, ValueError):
+            raise _RequestError("row and col must be integers")
+        if not (0 <= row < game.size and 0 <= col < game.size) or not game._space_is_available(row, col):
+            raise _RequestError("illegal move")
+
+        if session.ai is not None:
+            self._check_ai_capacity()
+
+        game.handle_move(row, col)
+        reply = {"ok": True, "session": session.id}
+        if session.ai is not None and game.final_state() is None:
+            reply["ai_move"] = await self._ai_move(session)
+        reply["state"] = session.state()
+        self._account(session)
+
+        opponent = session.players.get(3 - player)
+        if opponent is not None:
+            opponent.push({"event": "state", "session": session.id, "state": reply["state"]})
+        return reply
+
+    def _check_ai_capacity(self) -> None:
+        """Refuse work for the AI when too many searches are already waiting."""
+        if self._waiting >= self._max_waiting:
+            raise _RequestError("busy")
+
+    async def _ai_move(self, session: Session) -> Optional[List[int]]:
+        """Search and play the AI's move in the thread pool, without blocking the loop."""
+        if session.ai.level == 0:
+            # A random move costs less than a trip through the pool
+            move = session.ai.eval(session.game)
+            if move is None:
+                return None
+            session.game.handle_move(*move)
+            return list(move)
+
+        session.thinking = True
+        try:
+            self._waiting += 1
+            try:
+                await self._ai_slots.acquire()
+            finally:
+                self._waiting -= 1
+            try:
+                loop = asyncio.get_running_loop()
+                # The search runs on a copy, so the session can still be read meanwhile
+                move = await loop.run_in_executor(self._executor, session.ai.eval, session.game.copy())
+            finally:
+                self._ai_slots.release()
+        finally:
+            session.thinking = False
+        if move is None or session.id not in self.sessions:
+            return None
+        session.game.handle_move(*move)
+        return list(move)
+
+    async def _leave(self, session_id: str, connection) -> None:
+        session = self.sessions.get(session_id)
+        connection.sessions.discard(session_id)
+        if session is None:
+            return
+        for player, seated in list(session.players.items()):
+            if seated is connection:
+                del session.players[player]
+        if session.players:
+            for seated in session.players.values():
+                seated.push({"event": "left", "session": session_id})
+        else:
+            self._memory -= session.memory_bytes
+            del self.sessions[session_id]
+            self._record(session)
+
+    def _record(self, session: Session) -> None:
+        """Append a closed session to the record file, if it played any move."""
+        if self.records is not None and session.game.moves:
+            levels = (None, session.ai.level if session.ai is not None else None)
+            self.records.write(GameRecord.from_game(session.game, levels))
+
+    def _account(self, session: Session) -> None:
+        """Update the memory total after a session changed."""
+        if session.id in self.sessions:
+            memory = session.memory()
+            self._memory += memory - session.memory_bytes
+            session.memory_bytes = memory
+
+    def stats(self) -> dict:
+        """Return the load of the server."""
+        return {
+            "sessions": len(self.sessions),
+            "connections": self._connections,
+            "memory_bytes": self._memory,
+            "bytes_per_session": self._memory // len(self.sessions) if self.sessions else 0,
+            "ai_waiting": self._waiting,
+        }
+
+
+class _RequestError(Exception):
+    """A request that cannot be served; the message is sent back to the client."""
+
+
+class _Connection:
+    """Writes the replies and events of one client, one line at a time."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.sessions = set()
+        self._lock = asyncio.Lock()
+
+    async def send(self, message: dict) -> None:
+        """Write a message and wait until the client has read enough of its backlog."""
+        async with self._lock:
+            self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+            await self.writer.drain()
+
+    def push(self, message: dict) -> None:
+        """Send an event without waiting for it."""
+        asyncio.ensure_future(self._push(message))
+
+    async def _push(self, message: dict) -> None:
+        try:
+            await self.send(message)
+        except ConnectionError:
+            pass
+
+
+async def _serve(args) -> None:
+    server = GameServer(
+        max_sessions=args.max_sessions,
+        ai_workers=args.ai_workers,
+        time_limit=args.time_limit,
+        node_limit=args.node_limit,
+        record=args.record,
+    )
+    await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{server.port}"
+    print(f"Serving on {where}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve Twist Tac Toe games over line-delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-sessions", type=int, default=10000, help="open sessions allowed at once")
+    parser.add_argument("--ai-workers", type=int, default=4, help="AI searches run at once")
+    parser.add_argument("--time-limit", type=float, default=0.5, help="seconds per AI move")
+    parser.add_argument("--node-limit", type=int, default=None, help="nodes per AI move")
+    parser.add_argument("--record", default=None, help="append every closed session to this game record file")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
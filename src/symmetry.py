@@ -0,0 +1,115 @@
+"""
+Symmetries of the board: the 4 rotations and 4 reflections (dihedral group D4).
+
+Turning or mirroring the whole board does not change who wins with perfect
+play, even though the board rotates after every move. A rotation commutes with
+the twist. A reflection ``F`` turns it around (``R F = F R^-1``), so playing
+the mirrored move in the mirrored position gives the mirror of the real
+successor turned twice more, which is again a symmetry of it. By induction
+every position has the same value as its 8 images, and searches and caches can
+share one entry between them.
+
+Transform ``t`` maps a cell to ``transforms(layout)[t][cell]``: ``t`` in 0..3
+rotates ``t`` times like ``Game._rotate_board``, ``t`` in 4..7 mirrors left to
+right after rotating ``t - 4`` times. ``Game.hashes[t]`` is the Zobrist hash
+of the board under transform ``t``.
+
+Functions:
+    transforms: Cell permutations of the 8 symmetries of a board.
+    transform_mask: Apply a symmetry to a player mask.
+    canonical: Canonical form of a position and the transform that produces it.
+    to_canonical: Map a move into the canonical frame.
+    from_canonical: Map a move from the canonical frame back onto the board.
+"""
+
+from functools import lru_cache
+from typing import Tuple
+from . import bitboard
+
+
+# Symmetries of the board
+TRANSFORMS = 8
+
+
+@lru_cache(maxsize=None)
+def transforms(layout: bitboard.Layout) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Build the cell permutations of the 8 symmetries of a board.
+
+    Returns:
+        Tuple[Tuple[int, ...], ...]: ``transforms(layout)[t][cell]`` is where
+        ``cell`` ends up under transform ``t``.
+    """
+    size = layout.size
+    identity = tuple(range(layout.cells))
+    mirror = tuple(layout.cell_index(row, size - 1 - col) for row, col in layout.positions)
+
+    rotations = [identity]
+    for _ in range(3):
+        rotations.append(tuple(layout.rotation[cell] for cell in rotations[-1]))
+    reflections = [tuple(mirror[cell] for cell in rotated) for rotated in rotations]
+    return tuple(rotations + reflections)
+
+
+@lru_cache(maxsize=None)
+def _inverses(layout: bitboard.Layout) -> Tuple[Tuple[int, ...], ...]:
+    """Cell permutations undoing each transform."""
+    inverses = []
+    for permutation in transforms(layout):
+        inverse = [0] * layout.cells
+        for cell, target in enumerate(permutation):
+            inverse[target] = cell
+        inverses.append(tuple(inverse))
+    return tuple(inverses)
+
+
+def transform_mask(layout: bitboard.Layout, mask: int, transform: int) -> int:
+    """
+    Apply a symmetry to a player mask.
+
+    Args:
+        layout (bitboard.Layout): The board.
+        mask (int): Bitboard of one player.
+        transform (int): Index of the transform, 0 to 7.
+
+    Returns:
+        int: The transformed mask.
+    """
+    permutation = transforms(layout)[transform]
+    result = 0
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        result |= 1 << permutation[bit.bit_length() - 1]
+    return result
+
+
+def canonical(game) -> Tuple[Tuple[int, int], int]:
+    """
+    Find the canonical form of a position: its smallest image under the 8 symmetries.
+
+    Args:
+        game: The game instance.
+
+    Returns:
+        Tuple[Tuple[int, int], int]: The (player 1, player 2) masks of the canonical
+        form, and the transform that maps the board onto it.
+    """
+    layout = game.layout
+    player_1, player_2 = game.masks
+    best = None
+    for transform in range(TRANSFORMS):
+        image = (transform_mask(layout, player_1, transform), transform_mask(layout, player_2, transform))
+        if best is None or image < best[0]:
+            best = (image, transform)
+    return best
+
+
+def to_canonical(layout: bitboard.Layout, move: Tuple[int, int], transform: int) -> Tuple[int, int]:
+    """Map a (row, col) move on the board into the frame of ``transform``."""
+    return layout.positions[transforms(layout)[transform][layout.cell_index(*move)]]
+
+
+def from_canonical(layout: bitboard.Layout, move: Tuple[int, int], transform: int) -> Tuple[int, int]:
+    """Map a (row, col) move from the frame of ``transform`` back onto the board."""
+    return layout.positions[_inverses(layout)[transform][layout.cell_index(*move)]]
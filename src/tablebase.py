@@ -0,0 +1,248 @@
+"""
+Perfect-play tablebase for the rotating 3x3 board.
+
+The rotating game is small enough to solve completely. ``build`` walks every
+position reachable from the empty board with either player moving first
+(applying the rotation after each move, exactly like ``Game._mark_move``), then
+solves them backwards from the last layer to the first. The result is written
+as a flat binary file with one 16-bit entry per (board, side to move):
+
+    bits 0-1   value for the side to move (WIN, DRAW or LOSS, 0 if unreachable)
+    bits 2-5   best move as a cell index (NO_MOVE for finished games)
+    bits 6-9   number of plies until the game ends with best play
+
+``Tablebase`` opens the file with ``mmap`` so every process that loads it shares
+the same pages through the OS page cache, and a probe is a single table lookup.
+
+Build the file with:
+
+    python -m src.tablebase [path]
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from . import bitboard
+
+
+# The tablebase only covers the classic board: 3x3, three in a row
+LAYOUT = bitboard.get_layout(3, 3)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebase.bin")
+
+MAGIC = b"TTTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBI")
+ENTRY = struct.Struct("<H")
+
+UNKNOWN, WIN, DRAW, LOSS = 0, 1, 2, 3
+NO_MOVE = 15
+
+_OPPONENT_VALUE = {WIN: LOSS, LOSS: WIN, DRAW: DRAW}
+_RANK = {WIN: 2, DRAW: 1, LOSS: 0}
+
+# Index of a board is its base 3 encoding (0 empty, 1 player 1, 2 player 2)
+TERNARY = tuple(
+    sum(3 ** i for i in range(LAYOUT.cells) if mask >> i & 1)
+    for mask in range(1 << LAYOUT.cells)
+)
+ENTRY_COUNT = 3 ** LAYOUT.cells * 2
+
+
+class Probe(NamedTuple):
+    """A tablebase answer, from the point of view of the side to move."""
+    value: int
+    move: Optional[Tuple[int, int]]
+    distance: int
+
+
+def position_index(player_1: int, player_2: int, player: int) -> int:
+    """Return the entry index of a position with ``player`` to move."""
+    return (TERNARY[player_1] + 2 * TERNARY[player_2]) * 2 + player - 1
+
+
+def _pack(value: int, move: int, distance: int) -> int:
+    return value | move << 2 | distance << 6
+
+
+def _children(player_1: int, player_2: int, player: int):
+    """Yield (cell, position) for every move available to ``player``."""
+    rotate = LAYOUT.rotate
+    occupied = player_1 | player_2
+    for cell in range(LAYOUT.cells):
+        bit = 1 << cell
+        if occupied & bit:
+            continue
+        if player == 1:
+            yield cell, (rotate(player_1 | bit), rotate(player_2), 2)
+        else:
+            yield cell, (rotate(player_1), rotate(player_2 | bit), 1)
+
+
+def _is_terminal(player_1: int, player_2: int) -> bool:
+    return (
+        LAYOUT.has_win(player_1)
+        or LAYOUT.has_win(player_2)
+        or player_1 | player_2 == LAYOUT.full_mask
+    )
+
+
+def solve() -> array:
+    """
+    Solve every reachable position of the rotating board.
+
+    Returns:
+        array: Packed entries indexed by ``position_index``.
+    """
+    # Forward pass: collect reachable positions layer by layer (one layer per mark)
+    layers: List[set] = [{(0, 0, 1), (0, 0, 2)}]
+    for _ in range(LAYOUT.cells):
+        next_layer = set()
+        for position in layers[-1]:
+            if not _is_terminal(position[0], position[1]):
+                next_layer.update(child for _, child in _children(*position))
+        layers.append(next_layer)
+
+    # Backward pass: every child lives in the next layer, which is already solved
+    solved: Dict[Tuple[int, int, int], Tuple[int, int, int]] = {}
+    for layer in reversed(layers):
+        for position in layer:
+            solved[position] = _solve_position(position, solved)
+
+    table = array("H", bytes(2 * ENTRY_COUNT))
+    for position, (value, move, distance) in solved.items():
+        table[position_index(*position)] = _pack(value, move, distance)
+    return table
+
+
+def _solve_position(position, solved) -> Tuple[int, int, int]:
+    """Solve one position given the values of all its children."""
+    player_1, player_2, player = position
+    if LAYOUT.has_win(player_1) or LAYOUT.has_win(player_2):
+        # Only the player who just moved can have completed a line
+        return LOSS, NO_MOVE, 0
+    if player_1 | player_2 == LAYOUT.full_mask:
+        return DRAW, NO_MOVE, 0
+
+    best = None
+    for cell, child in _children(player_1, player_2, player):
+        child_value, _, child_distance = solved[child]
+        # Child values are for the opponent; flip them to our point of view
+        value = _OPPONENT_VALUE[child_value]
+        candidate = (value, cell, child_distance + 1)
+        if best is None or _better(candidate, best):
+            best = candidate
+    return best
+
+
+def _better(candidate, best) -> bool:
+    """Prefer wins over draws over losses, quick wins and slow losses."""
+    if _RANK[candidate[0]] != _RANK[best[0]]:
+        return _RANK[candidate[0]] > _RANK[best[0]]
+    if candidate[0] == WIN:
+        return candidate[2] < best[2]
+    if candidate[0] == LOSS:
+        return candidate[2] > best[2]
+    return False
+
+
+def build(path: str = DEFAULT_PATH) -> None:
+    """Solve the game and write the tablebase file to ``path``."""
+    table = solve()
+    if sys.byteorder == "big":
+        table.byteswap()
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, LAYOUT.size, LAYOUT.size, ENTRY_COUNT))
+        file.write(table.tobytes())
+    # Replace atomically so running workers never map a half written file
+    os.replace(temp_path, path)
+
+
+class Tablebase:
+    """
+    Read-only, memory-mapped view of a tablebase file.
+
+    Attributes:
+        path (str): Path of the mapped file.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        """
+        Map a tablebase file into memory.
+
+        Args:
+            path (str): Path of the tablebase file.
+
+        Raises:
+            ValueError: If the file is not a tablebase for the current board.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, rows, columns, count = HEADER.unpack_from(self._mmap, 0)
+        expected_size = HEADER.size + count * ENTRY.size
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or (rows, columns) != (LAYOUT.size, LAYOUT.size)
+            or count != ENTRY_COUNT
+            or len(self._mmap) != expected_size
+        ):
+            self._mmap.close()
+            raise ValueError(f"{path} is not a {LAYOUT.size}x{LAYOUT.size} tablebase")
+
+    def probe(self, player_1: int, player_2: int, player: int) -> Optional[Probe]:
+        """
+        Look up a position.
+
+        Args:
+            player_1 (int): Bitboard of player 1.
+            player_2 (int): Bitboard of player 2.
+            player (int): Player to move (1 or 2).
+
+        Returns:
+            Optional[Probe]: The solved entry, or None if the position is unreachable.
+        """
+        offset = HEADER.size + position_index(player_1, player_2, player) * ENTRY.size
+        (entry,) = ENTRY.unpack_from(self._mmap, offset)
+        value = entry & 0b11
+        if value == UNKNOWN:
+            return None
+        cell = entry >> 2 & 0b1111
+        move = None if cell == NO_MOVE else LAYOUT.cell_position(cell)
+        return Probe(value, move, entry >> 6 & 0b1111)
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+
+_loaded: Dict[str, Optional[Tablebase]] = {}
+
+
+def load(path: Optional[str] = None) -> Optional[Tablebase]:
+    """
+    Return the shared tablebase for ``path``, mapping it on first use.
+
+    Args:
+        path (str, optional): Tablebase file. Defaults to ``DEFAULT_PATH``.
+
+    Returns:
+        Optional[Tablebase]: The tablebase, or None if the file has not been built.
+    """
+    path = path or DEFAULT_PATH
+    if _loaded.get(path) is None and os.path.exists(path):
+        _loaded[path] = Tablebase(path)
+    return _loaded.get(path)
+
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    build(output)
+    print(f"Tablebase written to {output}")
@@ -0,0 +1,129 @@
+"""
+Shared cache of fonts, rendered text and overlay surfaces.
+
+Building a ``pygame.font.Font`` and rasterizing a string are the most expensive
+parts of drawing the UI, and the same few strings are drawn every frame. Fonts
+are created once per (name, size), rendered text is kept in a bounded LRU cache
+keyed by font, size, text and color, and translucent overlays are built once per
+window size.
+
+Surfaces returned from here are shared: blit them, never draw on them.
+
+Classes:
+    TextCache: Bounded LRU cache of rendered text surfaces.
+
+Functions:
+    get_font: The font for a name and size, created once.
+    render: Render text through the shared TextCache.
+    overlay: A translucent surface of a given size and color, created once.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+import pygame
+
+
+@lru_cache(maxsize=None)
+def get_font(name: Optional[str], size: int, system: bool = False) -> pygame.font.Font:
+    """
+    Get the font for a name and size, creating it on first use.
+
+    Args:
+        name (str, optional): Font file, system font name, or None for the default font.
+        size (int): Font size.
+        system (bool): True to look ``name`` up with ``pygame.font.SysFont`` (default is False).
+
+    Returns:
+        pygame.font.Font: The shared font.
+    """
+    if not pygame.font.get_init():
+        pygame.font.init()
+    if system:
+        return pygame.font.SysFont(name, size)
+    return pygame.font.Font(name, size)
+
+
+class TextCache:
+    """
+    Bounded LRU cache of rendered text surfaces.
+
+    Attributes:
+        capacity (int): Maximum number of surfaces kept.
+        hits (int): Renders answered from the cache.
+        misses (int): Renders that rasterized the text.
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            capacity (int): Maximum number of surfaces kept (default is 256).
+        """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def clear(self) -> None:
+        """Drop every cached surface."""
+        self._surfaces.clear()
+
+    def render(self,
+               text: str,
+               color: Tuple[int, ...],
+               size: int,
+               name: Optional[str] = None,
+               system: bool = False
+    ) -> pygame.Surface:
+        """
+        Render antialiased text, reusing the surface from an earlier call when possible.
+
+        Args:
+            text (str): The text.
+            color (Tuple[int, ...]): Text color.
+            size (int): Font size.
+            name (str, optional): Font name, see get_font (default is the pygame font).
+            system (bool): True if ``name`` is a system font (default is False).
+
+        Returns:
+            pygame.Surface: The shared text surface.
+        """
+        key = (name, size, system, text, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = get_font(name, size, system).render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
+
+
+_cache = TextCache()
+render = _cache.render
+
+
+@lru_cache(maxsize=16)
+def overlay(size: Tuple[int, int], color: Tuple[int, int, int, int]) -> pygame.Surface:
+    """
+    Get a translucent surface filled with a color, creating it once per size and color.
+
+    Args:
+        size (Tuple[int, int]): Width and height, usually the window size.
+        color (Tuple[int, int, int, int]): RGBA fill color.
+
+    Returns:
+        pygame.Surface: The shared overlay surface.
+    """
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    surface.fill(color)
+    return surface
@@ -0,0 +1,340 @@
+"""
+Headless AI vs AI tournaments on a process pool.
+
+Plays many games between two AI levels without opening a window, spread over a
+``multiprocessing`` pool, and streams the aggregated results while it runs:
+wins, draws and losses (split by which player moved first), and the per-move
+latency and nodes searched of each AI.
+
+Games are handed out in chunks. Every game reseeds the AIs' ``random.Random``
+from ``--seed`` and the game number (see ``game_seed``), and the first mover
+alternates from game to game like ``Game.reset``, so a run is reproducible
+whatever the number of workers or the chunk size. Minimax levels are only
+reproducible with ``--node-limit``, since a time budget depends on the machine.
+
+With ``--record PATH`` every game is also appended to a binary record file
+(see ``record``), in game order, with its own seed.
+
+Usage:
+
+    python -m src.tournament --games 10000 --p1-level 0 --p2-level 1 --workers 8
+    python -m src.tournament --games 100000 --p2-level 0 --record games.twr
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from . import constants
+from .ai import AI
+from .game import Game
+from .record import GameRecord, RecordWriter
+
+
+class TournamentConfig(NamedTuple):
+    """Settings shared by every game of a tournament."""
+    p1_level: int = 0
+    p2_level: int = 1
+    size: int = constants.BOARD_SIZE
+    win_length: int = constants.WIN_LENGTH
+    time_limit: Optional[float] = None
+    node_limit: Optional[int] = None
+    seed: int = 0
+    record: bool = False
+
+
+class LatencyStats:
+    """
+    Running summary of move latencies.
+
+    Latencies are counted in power-of-two microsecond buckets, so merging the
+    stats of millions of moves stays cheap and percentiles are accurate to a
+    factor of two.
+
+    Attributes:
+        count (int): Number of moves.
+        total (float): Sum of the latencies in seconds.
+        maximum (float): Slowest move in seconds.
+        buckets (List[int]): Moves per bucket, bucket ``i`` holding latencies below 2 ** i microseconds.
+    """
+
+    BUCKETS = 40
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = [0] * self.BUCKETS
+
+    def add(self, seconds: float) -> None:
+        """Record one move."""
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        bucket = min(int(seconds * 1e6).bit_length(), self.BUCKETS - 1)
+        self.buckets[bucket] += 1
+
+    def merge(self, other: "LatencyStats") -> None:
+        """Add the moves recorded by ``other``."""
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket holding the given fraction of moves, in seconds."""
+        if self.count == 0:
+            return 0.0
+        target = math.ceil(fraction * self.count)
+        seen = 0
+        for bucket, moves in enumerate(self.buckets):
+            seen += moves
+            if seen >= target:
+                return min((1 << bucket) / 1e6, self.maximum)
+        return self.maximum
+
+    def summary(self) -> Dict[str, float]:
+        """Return the mean, median, p99 and max latency in milliseconds."""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "moves": self.count,
+            "mean_ms": round(mean * 1e3, 3),
+            "p50_ms": round(self.percentile(0.5) * 1e3, 3),
+            "p99_ms": round(self.percentile(0.99) * 1e3, 3),
+            "max_ms": round(self.maximum * 1e3, 3),
+        }
+
+
+class TournamentResult:
+    """
+    Aggregated outcome of a set of games.
+
+    Attributes:
+        games (int): Games played.
+        outcomes (Dict[int, Dict[str, int]]): For each first mover (1 or 2), the
+            number of "p1_win", "p2_win" and "draw" results.
+        latency (Dict[int, LatencyStats]): Move latencies of each player.
+        nodes (Dict[int, int]): Positions searched by each player.
+        cpu_seconds (float): Time spent playing, summed over workers.
+        records (List[GameRecord]): Games played, if the tournament records them.
+            They are written out as chunks come in, not merged.
+    """
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.outcomes = {first: {"p1_win": 0, "p2_win": 0, "draw": 0} for first in (1, 2)}
+        self.latency = {1: LatencyStats(), 2: LatencyStats()}
+        self.nodes = {1: 0, 2: 0}
+        self.cpu_seconds = 0.0
+        self.records = []
+
+    def merge(self, other: "TournamentResult") -> None:
+        """Add the games of ``other``."""
+        self.games += other.games
+        for first in (1, 2):
+            for outcome, count in other.outcomes[first].items():
+                self.outcomes[first][outcome] += count
+        for player in (1, 2):
+            self.latency[player].merge(other.latency[player])
+            self.nodes[player] += other.nodes[player]
+        self.cpu_seconds += other.cpu_seconds
+
+    def summary(self) -> dict:
+        """Return the results as a JSON-friendly dict."""
+        totals = {
+            outcome: self.outcomes[1][outcome] + self.outcomes[2][outcome]
+            for outcome in ("p1_win", "p2_win", "draw")
+        }
+        return {
+            "games": self.games,
+            "results": totals,
+            "by_first_player": {str(first): dict(self.outcomes[first]) for first in (1, 2)},
+            "latency": {f"p{player}": self.latency[player].summary() for player in (1, 2)},
+            "nodes": {f"p{player}": self.nodes[player] for player in (1, 2)},
+            "cpu_ms_per_game": round(self.cpu_seconds / self.games * 1e3, 3) if self.games else 0.0,
+        }
+
+
+def play_game(game: Game, players: Dict[int, AI], result: TournamentResult, seed: Optional[int] = None) -> None:
+    """
+    Play one game to the end from the game's current position.
+
+    Args:
+        game (Game): The game, freshly reset.
+        players (Dict[int, AI]): AI for each player number.
+        result (TournamentResult): Where to record the outcome and latencies.
+        seed (int, optional): Seed of the game; when given, the game is added to ``result.records``.
+    """
+    first = game.current_player
+    state = game.final_state()
+    while state is None:
+        player = game.current_player
+        start = time.perf_counter()
+        move, stats = players[player].eval_with_stats(game)
+        result.latency[player].add(time.perf_counter() - start)
+        result.nodes[player] += stats.nodes
+        if move is None:
+            break
+        game.handle_move(*move)
+        state = game.final_state()
+
+    result.games += 1
+    outcome = "draw" if not state else f"p{state}_win"
+    result.outcomes[first][outcome] += 1
+    if seed is not None:
+        result.records.append(GameRecord.from_game(game, (players[1].level, players[2].level), seed))
+
+
+def game_seed(seed: int, index: int) -> int:
+    """
+    Seed of the random choices of one game of a tournament.
+
+    Args:
+        seed (int): Seed of the tournament.
+        index (int): Number of the game in the tournament, from 0.
+
+    Returns:
+        int: The seed, which fits in the uint32 of a game record.
+    """
+    return (seed * 1_000_003 + index) & 0xFFFFFFFF
+
+
+def seed_players(players: Dict[int, AI], rng: random.Random, seed: int) -> None:
+    """Reseed the ``rng`` shared by the players, and the playouts of MCTS players, before a game."""
+    rng.seed(seed)
+    for ai in players.values():
+        if ai.mcts is not None:
+            ai.mcts.reseed()
+
+
+def _players(game: Game, config: TournamentConfig, rng: random.Random) -> Dict[int, AI]:
+    """Create the AI of each player number, sharing ``rng``."""
+    players = {
+        player: AI(game, level, player, time_limit=config.time_limit, node_limit=config.node_limit, rng=rng)
+        for player, level in ((1, config.p1_level), (2, config.p2_level))
+    }
+    if config.node_limit is not None and config.time_limit is None:
+        # A node limit alone must not leave the level's clock running, or the
+        # games would depend on the load of the machine
+        for ai in players.values():
+            ai.budget = ai.budget._replace(time_limit=None)
+    return players
+
+
+def play_chunk(task) -> TournamentResult:
+    """
+    Play a chunk of consecutive games. Runs in the worker processes.
+
+    Args:
+        task: (config, index of the first game, number of games).
+
+    Returns:
+        TournamentResult: Outcome of the chunk.
+    """
+    config, first_game, count = task
+    rng = random.Random()
+    # Even games start with player 1, odd games with player 2, as if the game was reset in between
+    game = Game(ai_first=first_game % 2 == 1, size=config.size, win_length=config.win_length)
+    players = _players(game, config, rng)
+
+    result = TournamentResult()
+    start = time.process_time()
+    for index in range(first_game, first_game + count):
+        seed = game_seed(config.seed, index)
+        seed_players(players, rng, seed)
+        play_game(game, players, result, seed if config.record else None)
+        game.reset()
+    result.cpu_seconds = time.process_time() - start
+    return result
+
+
+def _tasks(config: TournamentConfig, games: int, chunk_size: int) -> Iterator[tuple]:
+    for first_game in range(0, games, chunk_size):
+        yield config, first_game, min(chunk_size, games - first_game)
+
+
+def run(config: TournamentConfig,
+        games: int,
+        workers: int = 0,
+        chunk_size: int = 50,
+        on_progress=None,
+        writer: Optional[RecordWriter] = None
+) -> TournamentResult:
+    """
+    Play a tournament.
+
+    Args:
+        config (TournamentConfig): Levels, board and seed.
+        games (int): Number of games.
+        workers (int): Worker processes, 0 to play in this process (default is 0).
+        chunk_size (int): Games per task handed to a worker (default is 50).
+        on_progress (callable, optional): Called with the running TournamentResult after every chunk.
+        writer (RecordWriter, optional): Where to append every game; needs ``config.record``.
+
+    Returns:
+        TournamentResult: Outcome of every game.
+    """
+    total = TournamentResult()
+    tasks = _tasks(config, games, chunk_size)
+    if workers <= 0:
+        results = map(play_chunk, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        # In order, so that the records are written in game order
+        results = pool.imap(play_chunk, tasks)
+    try:
+        for result in results:
+            if writer is not None:
+                for record in result.records:
+                    writer.write(record)
+            total.merge(result)
+            if on_progress is not None:
+                on_progress(total)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play AI vs AI games without a window")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--p1-level", type=int, default=0, help="AI level of player 1 (O)")
+    parser.add_argument("--p2-level", type=int, default=1, help="AI level of player 2 (X)")
+    parser.add_argument("--size", type=int, default=constants.BOARD_SIZE, help="rows and columns of the board")
+    parser.add_argument("--win-length", type=int, default=constants.WIN_LENGTH, help="marks in a row needed to win")
+    parser.add_argument("--time-limit", type=float, default=None, help="minimax seconds per move")
+    parser.add_argument("--node-limit", type=int, default=None, help="minimax nodes per move")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random moves")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes, 0 to play inline")
+    parser.add_argument("--chunk-size", type=int, default=50, help="games per worker task")
+    parser.add_argument("--record", default=None, help="append every game to this record file")
+    args = parser.parse_args(argv)
+
+    config = TournamentConfig(
+        args.p1_level, args.p2_level, args.size, args.win_length,
+        args.time_limit, args.node_limit, args.seed, args.record is not None,
+    )
+    started = time.perf_counter()
+
+    def report(result: TournamentResult) -> None:
+        line = result.summary()
+        line["elapsed_s"] = round(time.perf_counter() - started, 3)
+        print(json.dumps(line), flush=True)
+
+    if args.record is None:
+        run(config, args.games, args.workers, args.chunk_size, on_progress=report)
+    else:
+        with RecordWriter(args.record) as writer:
+            run(config, args.games, args.workers, args.chunk_size, on_progress=report, writer=writer)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
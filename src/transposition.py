@@ -0,0 +1,162 @@
+"""
+Zobrist hashing and the transposition table used by the minimax search.
+
+A Zobrist hash XORs one random key per (player, cell) for every mark on the
+board. The board rotates after every move, which would move every key, so
+``Game`` keeps eight hashes: ``hashes[t]`` is the hash of the board under
+symmetry ``t`` (see ``symmetry``), the first four being the board rotated 0 to
+3 more times and the last four their mirror images. Placing a mark XORs one
+key into each of them and a rotation just shifts each group of four by one, so
+the hash of the current board (``hashes[0]``) is always updated incrementally.
+The smallest of the eight identifies the position up to symmetry.
+
+Classes:
+    TranspositionTable: Bounded cache of search results keyed by Zobrist hash.
+"""
+
+import random
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+from . import bitboard
+from . import symmetry
+
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+_keys = random.Random(0x7715)
+SIDE_KEYS = (_keys.getrandbits(64), _keys.getrandbits(64))
+
+
+@lru_cache(maxsize=None)
+def piece_keys(layout: bitboard.Layout) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """
+    Build the Zobrist keys of a board.
+
+    Returns:
+        Tuple[Tuple[Tuple[int, ...], ...], ...]: ``keys[player - 1][cell]`` holds
+        the key of that mark in each of the eight symmetry hashes.
+    """
+    rng = random.Random(layout.size)
+    zobrist = [[rng.getrandbits(64) for _ in range(layout.cells)] for _ in range(2)]
+    permutations = symmetry.transforms(layout)
+
+    return tuple(
+        tuple(
+            tuple(zobrist[player][permutation[cell]] for permutation in permutations)
+            for cell in range(layout.cells)
+        )
+        for player in range(2)
+    )
+
+
+class Entry(NamedTuple):
+    """A stored search result."""
+    key: int
+    depth: int
+    value: float
+    flag: int
+    move: Optional[Tuple[int, int]]
+
+
+class TranspositionTable:
+    """
+    Bounded transposition table with exact, lower and upper bound entries.
+
+    Two replacement policies are available once the table is full:
+
+    - ``"depth"``: the table is a fixed array of slots indexed by the key and a
+      slot is only overwritten by a search of at least the same depth.
+    - ``"lru"``: the least recently used entry is evicted.
+
+    Attributes:
+        capacity (int): Maximum number of entries.
+        policy (str): Replacement policy, ``"depth"`` or ``"lru"``.
+        hits (int): Lookups that found an entry.
+        misses (int): Lookups that found nothing.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, policy: str = "depth") -> None:
+        """
+        Initialize an empty table.
+
+        Args:
+            capacity (int): Maximum number of entries (default is 65536).
+            policy (str): ``"depth"`` or ``"lru"`` (default is ``"depth"``).
+
+        Raises:
+            ValueError: If the policy is unknown or the capacity is not positive.
+        """
+        if policy not in ("depth", "lru"):
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.policy = policy
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        if self.policy == "depth":
+            self._slots = [None] * self.capacity
+        else:
+            self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: int) -> Optional[Entry]:
+        """
+        Find the entry stored for ``key``.
+
+        Returns:
+            Optional[Entry]: The entry, or None on a miss.
+        """
+        if self.policy == "depth":
+            entry = self._slots[key % self.capacity]
+            if entry is not None and entry.key != key:
+                entry = None
+        else:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store(self,
+              key: int,
+              depth: int,
+              value: float,
+              flag: int,
+              move: Optional[Tuple[int, int]]
+    ) -> None:
+        """
+        Store a search result.
+
+        Args:
+            key (int): Zobrist hash of the position and side to move.
+            depth (int): Depth searched below the position.
+            value (float): Value found by the search.
+            flag (int): EXACT, LOWER_BOUND or UPPER_BOUND.
+            move (Optional[Tuple[int, int]]): Best move found, if any.
+        """
+        entry = Entry(key, depth, value, flag, move)
+        if self.policy == "depth":
+            slot = key % self.capacity
+            current = self._slots[slot]
+            if current is None or current.key == key or current.depth <= depth:
+                self._slots[slot] = entry
+        else:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        if self.policy == "depth":
+            return sum(entry is not None for entry in self._slots)
+        return len(self._entries)
@@ -0,0 +1,192 @@
+"""
+Background AI search for the pygame front end.
+
+``AIWorker`` runs ``AI.eval`` on a daemon thread against a copy of the game, so
+the main loop keeps pumping events and drawing frames while the AI thinks. The
+main loop calls ``poll`` to pick up the move when it is ready; an ``on_done``
+callback, which the front end uses to post a pygame event, tells it when.
+
+``AnalysisWorker`` does the same for ``AI.analyze``, the scores of every
+legal move shown by the analysis overlay, and keeps every finished analysis so
+that a position seen before is answered at once.
+
+Classes:
+    AIWorker: Runs one AI search at a time off the render thread.
+    AnalysisWorker: Analyzes positions off the render thread and caches the results.
+"""
+
+import threading
+
+from typing import Callable, Dict, Optional, Tuple
+
+
+class AIWorker:
+    """
+    Runs one AI search at a time on a background thread.
+
+    Attributes:
+        busy (bool): True while a search is running or its move has not been polled.
+        stats: SearchStats of the last move that was polled, None before the first one.
+    """
+
+    def __init__(self, on_done: Optional[Callable[[], None]] = None) -> None:
+        """
+        Initialize an idle worker.
+
+        Args:
+            on_done (callable, optional): Called from the search thread when a search
+                finishes, after its move can be polled.
+        """
+        self.on_done = on_done
+        self._thread = None
+        self._stop_event = None
+        self._result = None
+        self._done = False
+        self._stats = None
+        self.busy = False
+        self.stats = None
+
+    def start(self, ai, game) -> None:
+        """
+        Start searching for the AI's move in the current position.
+
+        Any search still running is cancelled first.
+
+        Args:
+            ai: The AI player to move. It must not be used elsewhere until the move is polled.
+            game: The game instance. The search runs on a copy, so it can keep being drawn.
+        """
+        self.cancel()
+        self._stop_event = threading.Event()
+        ai.stop_event = self._stop_event
+        self._result = None
+        self._done = False
+        self.busy = True
+        self._thread = threading.Thread(
+            target=self._run, args=(ai, game.copy()), name="ai-search", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, ai, game) -> None:
+        """Thread body: search and publish the move."""
+        move, stats = ai.eval_with_stats(game)
+        self._result = move
+        self._stats = stats
+        self._done = True
+        if self.on_done is not None:
+            self.on_done()
+
+    def poll(self) -> Tuple[bool, Optional[Tuple[int, int]]]:
+        """
+        Check if the search has finished.
+
+        Returns:
+            Tuple[bool, Optional[Tuple[int, int]]]: (True, move) once the move is ready,
+            (False, None) while the AI is still thinking or nothing was started.
+        """
+        if not self.busy or not self._done:
+            return False, None
+        self.busy = False
+        self._thread = None
+        self.stats = self._stats
+        return True, self._result
+
+    def cancel(self) -> None:
+        """Stop the running search, if any, and drop its result."""
+        if self._thread is not None:
+            self._stop_event.set()
+            # The search checks the stop event every few milliseconds
+            self._thread.join()
+            self._thread = None
+        self._result = None
+        self._done = False
+        self.busy = False
+
+
+class AnalysisWorker:
+    """
+    Analyzes positions on a background thread and caches the results.
+
+    Attributes:
+        ai: The AI running the analyses. It is only used by this worker.
+        top (int): Best moves scored by each analysis, None for every move.
+        busy (bool): True while an analysis is running.
+    """
+
+    def __init__(self,
+                 ai,
+                 on_done: Optional[Callable[[], None]] = None,
+                 top: Optional[int] = None
+    ) -> None:
+        """
+        Initialize an idle worker with an empty cache.
+
+        Args:
+            ai: The AI running the analyses; its budget limits each one.
+            on_done (callable, optional): Called from the analysis thread when an
+                analysis finishes, after it is in the cache.
+            top (int, optional): Best moves to score, see ``AI.analyze``. Defaults to every move.
+        """
+        self.ai = ai
+        self.top = top
+        self.on_done = on_done
+        self._thread = None
+        self._stop_event = None
+        self._running = None
+        # Finished analyses by position: (player 1 mask, player 2 mask, player to move)
+        self._cache: Dict[tuple, dict] = {}
+        self.busy = False
+
+    @staticmethod
+    def _key(game) -> tuple:
+        return (game.masks[0], game.masks[1], game.current_player)
+
+    def get(self, game) -> Optional[dict]:
+        """
+        Return the analysis of the current position, starting it if needed.
+
+        Args:
+            game: The game instance. The analysis runs on a copy.
+
+        Returns:
+            Optional[dict]: The MoveScore of every move analyzed by (row, col), or None
+            while the position is being analyzed.
+        """
+        key = self._key(game)
+        analysis = self._cache.get(key)
+        if analysis is not None or self._running == key:
+            return analysis
+        self.cancel()
+        self._stop_event = threading.Event()
+        self.ai.stop_event = self._stop_event
+        self._running = key
+        self.busy = True
+        self._thread = threading.Thread(
+            target=self._run, args=(game.copy(), key, self._stop_event), name="ai-analysis", daemon=True
+        )
+        self._thread.start()
+        return None
+
+    def _run(self, game, key: tuple, stop_event: threading.Event) -> None:
+        """Thread body: analyze and cache the result unless cancelled."""
+        analysis = self.ai.analyze(game, self.top)
+        if stop_event.is_set():
+            return
+        self._cache[key] = analysis
+        self.busy = False
+        if self.on_done is not None:
+            self.on_done()
+
+    def cancel(self) -> None:
+        """Stop the running analysis, if any. Finished analyses stay cached."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self._running = None
+        self.busy = False
+
+    def clear(self) -> None:
+        """Stop the running analysis and drop the cache, e.g. when a new game starts."""
+        self.cancel()
+        self._cache.clear()
@@ -0,0 +1,298 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import book
+from src import tablebase
+from src import transposition
+from src.ai import AI
+from src.game import Game, GameState
+
+
+def test_tablebase_solves_empty_board_as_draw(tmp_path):
+    path = str(tmp_path / "tablebase.bin")
+    tablebase.build(path)
+    table = tablebase.Tablebase(path)
+    for player in (1, 2):
+        probe = table.probe(0, 0, player)
+        assert probe.value == tablebase.DRAW
+        assert probe.distance == 9
+    table.close()
+
+
+def test_ai_plays_winning_move_from_tablebase(tmp_path, monkeypatch):
+    path = str(tmp_path / "tablebase.bin")
+    tablebase.build(path)
+
+    game = Game(ai_first=True)
+    # X X .
+    # O O .
+    # . . .
+    game.masks = [0b000011000, 0b000000011]
+    ai = AI(game)
+
+    monkeypatch.setattr(tablebase, "DEFAULT_PATH", path)
+    assert ai._probe(game).value == tablebase.WIN
+    assert ai.eval(game) == (0, 2)
+
+
+def test_opening_book_matches_tablebase(tmp_path, monkeypatch):
+    table = tablebase.solve()
+    path = str(tmp_path / "book.bin")
+    book.build(path)
+    monkeypatch.setattr(book, "DEFAULT_PATH", path)
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+
+    def entry(game):
+        return table[tablebase.position_index(game.masks[0], game.masks[1], game.current_player)]
+
+    def walk(game, ai):
+        if game.marked_squares >= book.BOOK_PLIES or game.final_state() is not None:
+            return 0
+        solved = entry(game)
+        move, stats = ai.eval_with_stats(game)
+        # Scored like minimax: by the plies left for a win or a loss, from the AI's point of view
+        score = {tablebase.WIN: 10 - (solved >> 6), tablebase.DRAW: 0, tablebase.LOSS: (solved >> 6) - 10}[solved & 0b11]
+        assert stats.method == "book" and stats.value == (score if game.current_player == ai.player else -score)
+        # The book move is a best move: the game ends one ply sooner with the same result
+        game.make_move(*move)
+        expected = {tablebase.WIN: tablebase.LOSS, tablebase.LOSS: tablebase.WIN}
+        assert entry(game) & 0b11 == expected.get(solved & 0b11, solved & 0b11)
+        assert entry(game) >> 6 == (solved >> 6) - 1
+        game.unmake_move()
+        positions = 1
+        for child in game.get_empty_squares():
+            game.make_move(*child)
+            positions += walk(game, ai)
+            game.unmake_move()
+        return positions
+
+    for ai_first in (True, False):
+        game = Game(ai_first=ai_first)
+        assert walk(game, AI(game)) > 3000
+
+
+def test_transposition_table_persists_between_moves_and_clears_on_reset(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    game = Game(ai_first=True)
+    ai = AI(game, replacement="lru")
+
+    ai.eval(game)
+    assert len(ai.table) > 0
+
+    misses, hits = ai.table.misses, ai.table.hits
+    # The root result is still cached on the next call
+    ai.eval(game)
+    assert ai.table.misses == misses
+    assert ai.table.hits == hits + 1
+
+    game.reset()
+    game.current_player = 1
+    ai.table.store(1, 0, 0, transposition.EXACT, None)
+    ai.eval(game)
+    assert ai.table.lookup(1) is None
+
+
+def test_zobrist_hash_follows_rotation():
+    game = Game()
+    game._mark_move(0, 0, 1)
+    game._mark_move(1, 1, 2)
+    game._mark_move(0, 1, 1)
+
+    expected = 0
+    for row in range(3):
+        for col in range(3):
+            player = game.board[row][col]
+            if player:
+                expected ^= transposition.piece_keys(game.layout)[player - 1][row * 3 + col][0]
+    assert game.hash == expected
+
+
+def test_minimax_agrees_with_tablebase(tmp_path, monkeypatch):
+    path = str(tmp_path / "tablebase.bin")
+    tablebase.build(path)
+    table = tablebase.Tablebase(path)
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+
+    game = Game(ai_first=True)
+    for row, col in [(1, 1), (0, 0), (2, 1)]:
+        game.make_move(row, col)
+        ai = AI(game, player=game.current_player)
+        move = ai.eval(game)
+        probe = table.probe(game.masks[0], game.masks[1], game.current_player)
+        game.make_move(*move)
+        after = table.probe(game.masks[0], game.masks[1], game.current_player)
+        game.unmake_move()
+        # The minimax move keeps the tablebase value of the position
+        expected = {tablebase.WIN: tablebase.LOSS, tablebase.LOSS: tablebase.WIN}
+        assert expected.get(probe.value, probe.value) == after.value
+    table.close()
+
+
+def test_parallel_workers_clear_their_table_for_a_new_game(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    game = Game(ai_first=False)
+    parallel = AI(game, player=2, workers=2)
+    parallel.budget = parallel.budget._replace(time_limit=None)
+    game.make_move(1, 1)
+    parallel.eval_with_stats(game)
+
+    game.reset()
+    game.masks = [1 << 4, 0]
+    game.current_player = 2
+    sequential = AI(game, player=2)
+    sequential.budget = sequential.budget._replace(time_limit=None)
+    stats = parallel.eval_with_stats(game)[1]
+    parallel.close()
+    expected = sequential.eval_with_stats(game)[1]
+    assert (stats.value, stats.move, stats.depth) == (expected.value, expected.move, expected.depth)
+
+def test_budgeted_search_on_large_board_returns_legal_move():
+    game = Game(ai_first=True, size=7, win_length=4)
+    ai = AI(game, node_limit=3000)
+    move = ai.eval(game)
+    assert move in game.get_empty_squares()
+    assert ai._nodes <= 3000 + 1024
+
+
+def test_budgeted_search_takes_immediate_win():
+    game = Game(ai_first=True, size=5, win_length=4)
+    ai = AI(game, level=1, node_limit=20000)
+    # Three AI marks on the top row, with the fourth cell free
+    game.masks = [0b11000_00000, 0b00111]
+    game.current_player = 2
+    row, col = ai.eval(game)
+    game.make_move(row, col)
+    assert game.final_state() == 2
+
+
+def test_heuristic_prefers_open_lines():
+    game = Game(ai_first=True)
+    ai = AI(game)
+    game.masks = [0, 1 << 4]
+    assert 0 < ai.heuristic(game) < 1
+    game.masks = [1 << 4, 0]
+    assert -1 < ai.heuristic(game) < 0
+
+
+def test_eval_reports_search_stats(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    game = Game(ai_first=True)
+    reported = []
+    ai = AI(game, on_search=reported.append)
+
+    move, stats = ai.eval_with_stats(game)
+    assert reported == [stats] and ai.stats is stats
+    assert stats.method == "minimax" and stats.move == move
+    assert stats.nodes > 0 and stats.cutoffs > 0
+    assert stats.depth == 9
+    assert stats.elapsed > 0 and stats.nps > 0
+
+    ai.level = 0
+    assert ai.eval_with_stats(game)[1].method == "random"
+
+
+def _plain_minimax(game, depth):
+    """Exhaustive minimax without pruning, scored for the player to move."""
+    state = game.final_state()
+    if state is not None:
+        win_score = game.layout.cells + 1
+        return 0 if state == 0 else (win_score - depth if state == game.current_player else depth - win_score)
+    best = float('-inf')
+    for move in game.get_empty_squares():
+        game.make_move(*move)
+        best = max(best, -_plain_minimax(game, depth + 1))
+        game.unmake_move()
+    return best
+
+
+def test_ordered_search_plays_first_best_move(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    for opening in ([(1, 1)], [(0, 0), (1, 1)], [(0, 1), (2, 2), (1, 0)]):
+        game = Game(ai_first=False)
+        for move in opening:
+            game.make_move(*move)
+        scores = {}
+        for move in game.get_empty_squares():
+            game.make_move(*move)
+            scores[move] = -_plain_minimax(game, 1)
+            game.unmake_move()
+
+        ai = AI(game, player=game.current_player)
+        move, stats = ai.eval_with_stats(game)
+        assert stats.value == max(scores.values())
+        assert move == next(m for m, score in scores.items() if score == stats.value)
+
+
+def test_analysis_scores_every_move_exactly():
+    for opening in ([], [(0, 0), (1, 1)], [(0, 1), (2, 2), (1, 0)]):
+        game = Game(ai_first=False)
+        for move in opening:
+            game.make_move(*move)
+        scores = {}
+        for move in game.get_empty_squares():
+            game.make_move(*move)
+            scores[move] = -_plain_minimax(game, 1)
+            game.unmake_move()
+
+        ai = AI(game, player=game.current_player)
+        analysis = ai.analyze(game.snapshot())
+        assert {move: score.value for move, score in analysis.items()} == scores
+        for score in analysis.values():
+            if score.outcome == 0:
+                assert score.plies == 9 - len(opening)
+            else:
+                assert score.plies == game.layout.cells + 1 - abs(score.value)
+        # Every move was solved, so a second analysis is answered from the table
+        nodes = ai._nodes
+        assert ai.analyze(game) == analysis and ai._nodes < nodes
+
+        # Capped to the best moves, the others are only proven worse
+        top = AI(game, player=game.current_player).analyze(game, top=2)
+        assert len(top) >= 2 and all(analysis[move] == score for move, score in top.items())
+        assert all(scores[move] <= min(score.value for score in top.values()) for move in scores if move not in top)
+
+
+def test_parallel_search_matches_sequential(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    cases = [(3, 3, [], None), (3, 3, [(0, 1), (2, 2)], None), (5, 4, [(2, 2), (1, 1)], 3)]
+    for size, win_length, opening, max_depth in cases:
+        game = Game(ai_first=False, size=size, win_length=win_length)
+        for move in opening:
+            game.make_move(*move)
+        results = []
+        for workers in (0, 2):
+            ai = AI(game, player=game.current_player, workers=workers)
+            ai.budget = ai.budget._replace(time_limit=None, max_depth=max_depth)
+            stats = ai.eval_with_stats(game)[1]
+            ai.close()
+            results.append((stats.value, stats.move, stats.depth))
+        assert results[0] == results[1]
+
+
+def test_parallel_search_needs_no_move_history(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    # O has a win in one; neither position was reached through make_move
+    snapshot = GameState(player_1=0b000000110, player_2=0b000010001, current_player=2, first_player=1)
+    masked = Game(ai_first=True)
+    masked.masks = [0b000011000, 0b100000011]
+    masked.current_player = 1
+    for position in (snapshot, masked):
+        results = []
+        for workers in (0, 2):
+            ai = AI(Game(), player=position.current_player, workers=workers)
+            ai.budget = ai.budget._replace(time_limit=None)
+            stats = ai.eval_with_stats(position)[1]
+            ai.close()
+            results.append((stats.value, stats.move))
+        assert results[0] == results[1]
+        assert results[0][0] >= 1
@@ -0,0 +1,46 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.batch import GameBatch, ONGOING
+from src.game import Game
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (5, 4)])
+def test_batch_matches_game(size, win_length):
+    rng = np.random.default_rng(7)
+    batch = GameBatch(64, size, win_length, first_player=rng.integers(1, 3, 64))
+    games = [Game(ai_first=player == 2, size=size, win_length=win_length) for player in batch.current_player]
+
+    while batch.ongoing().any():
+        moves = batch.random_moves(rng)
+        batch.step(moves)
+        for game, move in zip(games, moves):
+            if move >= 0:
+                game.make_move(*game.layout.cell_position(int(move)))
+
+        for i, game in enumerate(games):
+            assert batch.boards[i].tolist() == [list(row) for row in game.board]
+            state = game.final_state()
+            assert batch.status[i] == (ONGOING if state is None else state)
+            if state is None:
+                assert batch.current_player[i] == game.current_player
+
+    np.testing.assert_array_equal(batch.compute_status(), batch.status)
+
+
+def test_from_game_copies_position():
+    game = Game(ai_first=False)
+    game.make_move(0, 0)
+    game.make_move(1, 1)
+    batch = GameBatch.from_game(game, 3)
+    assert batch.boards[2].tolist() == [list(row) for row in game.board]
+    assert (batch.current_player == 1).all()
+    statuses = batch.play_random(np.random.default_rng(0))
+    assert (statuses != ONGOING).all()
@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import run
+
+
+def test_compare_flags_regressions():
+    baseline = {"fast": 1.0, "slow": 1.0, "removed": 1.0}
+    results = {"fast": 0.8, "slow": 1.5, "new": 2.0}
+    assert run.compare(results, baseline, threshold=0.25) == ["slow"]
+
+
+def test_engine_benchmarks_run():
+    results = run.run("game.final_state")
+    assert set(results) == {f"game.final_state[{name}]" for name in run.POSITIONS}
+    assert all(seconds > 0 for seconds in results.values())
+
+
+def test_game_state_stays_within_memory_target():
+    results = run.run("memory.")
+    # A snapshot stays well below a Game, and within 160 bytes on 3x3
+    assert results["memory.game_state[midgame]"] <= 160
+    assert results["memory.game_state[midgame]"] * 3 < results["memory.game[midgame]"]
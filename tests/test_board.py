@@ -0,0 +1,109 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from src import constants
+from src.board import Board
+from src.game import Game
+
+
+def full_repaint(game):
+    screen = pygame.Surface((constants.WIDTH, constants.HEIGHT))
+    Board(constants.WIDTH, constants.HEIGHT, game).render(screen)
+    return pygame.image.tostring(screen, "RGB")
+
+
+def test_dirty_rendering_matches_full_repaint():
+    pygame.init()
+    game = Game(ai_first=False)
+    board = Board(constants.WIDTH, constants.HEIGHT, game)
+    screen = pygame.Surface((constants.WIDTH, constants.HEIGHT))
+
+    assert board.render(screen) == [board.rect]
+    assert board.render(screen) == []
+    for move in [(1, 1), (0, 0), (2, 1), (0, 2)]:
+        game.make_move(*move)
+        dirty = board.render(screen)
+        assert dirty
+        assert pygame.image.tostring(screen, "RGB") == full_repaint(game)
+
+    # The status text is only repainted when it changes
+    assert board.draw_turn_indicator(screen, "O")
+    assert board.draw_turn_indicator(screen, "O") == []
+    assert len(board.draw_turn_indicator(screen, "X")) == 2
+
+    # Erasing the status text brings back the board underneath
+    board.restore(screen, board._status[2])
+    assert pygame.image.tostring(screen, "RGB") == full_repaint(game)
+
+
+def test_text_cache_reuses_and_evicts_surfaces():
+    from src import text
+    cache = text.TextCache(capacity=2)
+    first = cache.render("Turn: X", (255, 255, 255), 36)
+    assert cache.render("Turn: X", (255, 255, 255), 36) is first
+    cache.render("Turn: O", (255, 255, 255), 36)
+    cache.render("Turn: X", (0, 0, 0), 36)
+    assert len(cache) == 2 and (cache.hits, cache.misses) == (1, 3)
+    # The least recently used surface was evicted
+    assert cache.render("Turn: X", (255, 255, 255), 36) is not first
+    assert text.get_font(None, 36) is text.get_font(None, 36)
+    assert text.overlay((10, 10), (0, 0, 0, 128)) is text.overlay((10, 10), (0, 0, 0, 128))
+
+
+def test_analysis_overlay_is_drawn_once_and_erased():
+    from src.ai import AI
+    from src.worker import AnalysisWorker
+    pygame.init()
+    game = Game(ai_first=False)
+    game.make_move(1, 1)
+    board = Board(constants.WIDTH, constants.HEIGHT, game)
+    screen = pygame.Surface((constants.WIDTH, constants.HEIGHT))
+    board.render(screen)
+
+    worker = AnalysisWorker(AI(game, player=game.current_player))
+    assert worker.get(game) is None
+    worker._thread.join()
+    analysis = worker.get(game)
+    assert set(analysis) == set(game.get_empty_squares())
+
+    assert len(board.draw_analysis(screen, analysis)) == len(analysis)
+    assert board.draw_analysis(screen, analysis) == []
+    assert pygame.image.tostring(screen, "RGB") != full_repaint(game)
+    board.draw_analysis(screen, None)
+    assert pygame.image.tostring(screen, "RGB") == full_repaint(game)
+
+
+def test_rotation_animation_plays_cached_frames_on_time():
+    pygame.init()
+    game = Game(ai_first=False)
+    board = Board(constants.WIDTH, constants.HEIGHT, game)
+    screen = pygame.Surface((constants.WIDTH, constants.HEIGHT))
+    board.render(screen)
+    game.make_move(0, 1)
+
+    board.start_rotation(1000)
+    frames = board._rotation[0]
+    assert len(frames) == Board.ROTATION_FRAMES and board.rotating
+    # The first frame is the board before it turned, with the mark where it was played
+    board.draw_rotation(screen, 1000)
+    assert screen.get_at((300, 100 - constants.CIRCLE_RADIUS + 5))[:3] != constants.BACKGROUND_COLOR
+    assert screen.get_at((100, 300 - constants.CIRCLE_RADIUS + 5))[:3] == constants.BACKGROUND_COLOR
+
+    # Frames follow the clock, not the calls, and are drawn once each
+    assert board.draw_rotation(screen, 1000 + Board.ROTATION_MS // Board.ROTATION_FRAMES - 1) == []
+    assert board.draw_rotation(screen, 1000 + Board.ROTATION_MS - 1) == [board.rect]
+    assert board.draw_rotation(screen, 1000 + Board.ROTATION_MS) == [] and not board.rotating
+    board.render(screen)
+    assert pygame.image.tostring(screen, "RGB") == full_repaint(game)
+
+    # The same board state reuses its frames
+    board.start_rotation(2000)
+    assert board._rotation[0] is frames
@@ -0,0 +1,143 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pickle
+import pytest
+
+from src.ai import AI
+from src.game import Game, GameState
+
+
+def test_move_rotates_board_like_rot90():
+    game = Game(ai_first=False)
+    game._mark_move(0, 0, 1)
+    # np.rot90(k=1) moves the top left corner to the bottom left corner
+    assert game.board[2][0] == 1
+    assert game.get_empty_squares() == [
+        (0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 1), (2, 2)
+    ]
+
+    game._mark_move(0, 1, 2)
+    assert game.board == ((0, 0, 0), (2, 0, 0), (0, 0, 1))
+
+
+def test_final_state_detects_win_after_rotation():
+    game = Game(ai_first=False)
+    # Player 1's marks end up in the left column once the board has rotated
+    for row, col in [(0, 0), (0, 1), (2, 0), (0, 0), (0, 1)]:
+        game.make_move(row, col)
+    assert game.board == ((1, 2, 0), (1, 0, 0), (1, 0, 2))
+    assert game.final_state() == 1
+    assert game.winning_line() == [(0, 0), (1, 0), (2, 0)]
+
+    game.unmake_move()
+    assert game.final_state() is None
+
+
+def test_larger_board_with_shorter_lines():
+    game = Game(ai_first=False, size=5, win_length=4)
+    assert len(game.get_empty_squares()) == 25
+
+    for i in range(4):
+        assert game.final_state() is None
+        game._mark_move(i, i, 1)
+        # Four rotations bring the board back to where it was
+        for _ in range(3):
+            game._rotate_board()
+    assert game.final_state() == 1
+    assert game.winning_line() == [(0, 0), (1, 1), (2, 2), (3, 3)]
+
+
+def test_full_board_is_a_draw():
+    game = Game(ai_first=False)
+    game.masks = [0b011100101, 0b100011010]
+    assert game.is_board_full()
+    assert game.get_empty_squares() == []
+    assert game.final_state() == 0
+
+
+def test_handle_move_rejects_taken_square():
+    game = Game(ai_first=False)
+    assert game.handle_move(1, 1) == "continue"
+    assert game.current_player == 2
+    assert game.handle_move(1, 1) == "continue"
+    assert game.current_player == 2
+    assert game.marked_squares == 1
+
+
+def test_ai_moves_are_part_of_the_history():
+    game = Game(ai_first=False)
+    game.handle_move(1, 1)
+    before = (list(game.masks), game.marked_squares, game.current_player)
+    assert game.handle_ai_move(AI(game, level=0)) == "continue"
+    assert len(game.moves) == 2
+    game.unmake_move()
+    assert (list(game.masks), game.marked_squares, game.current_player) == before
+
+def test_unmake_move_restores_everything():
+    game = Game(ai_first=False)
+    game.make_move(0, 1)
+    before = (list(game.masks), list(game.hashes), game.marked_squares, game.current_player, game.board)
+
+    game.make_move(1, 1)
+    game.make_move(2, 2)
+    assert game.current_player == 2
+    game.unmake_move()
+    game.unmake_move()
+
+    after = (list(game.masks), list(game.hashes), game.marked_squares, game.current_player, game.board)
+    assert after == before
+
+
+def test_restart_clears_the_move_count(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    game = Game(ai_first=False)
+    for _ in range(4):
+        game.handle_move(*game.get_empty_squares()[0])
+    assert game.marked_squares == 4
+
+    game.restart()
+    assert game.marked_squares == 0 and game.final_state() is None
+    # The search sees a whole empty board again, down to the last ply
+    move, stats = AI(game, player=1).eval_with_stats(game)
+    assert move is not None and stats.depth == 9
+
+
+def test_game_state_snapshot_round_trip():
+    game = Game(ai_first=True)
+    for row, col in [(0, 0), (0, 1), (2, 0), (0, 0), (0, 1)]:
+        state = game.snapshot()
+        restored = Game.from_state(state)
+        assert restored.board == game.board and restored.hashes == game.hashes
+        assert restored.current_player == game.current_player and restored.marked_squares == game.marked_squares
+        assert restored.snapshot() == state and hash(restored.snapshot()) == hash(state)
+        assert AI(restored, player=restored.current_player).eval(state) == AI(game, player=game.current_player).eval(game)
+        game.handle_move(row, col)
+
+    state = game.snapshot()
+    assert Game.from_state(state).final_state() == game.final_state() == 2
+    assert state.moves == 5 and state.first_player == 2
+    assert state.copy() is state and pickle.loads(pickle.dumps(state)) == state
+    assert state != GameState() and len({state, game.snapshot(), GameState()}) == 2
+    with pytest.raises(AttributeError):
+        state.player_1 = 0
+
+
+def test_snapshot_searches_like_the_game(monkeypatch):
+    monkeypatch.setattr(AI, "_probe", lambda self, game: None)
+    monkeypatch.setattr(AI, "_book", lambda self, game: None)
+    game = Game(ai_first=False)
+    for row, col in [(1, 1), (0, 0), (2, 1)]:
+        game.handle_move(row, col)
+    state = game.snapshot()
+
+    expected = AI(game, player=game.current_player).eval_with_stats(game)[1]
+    parallel = AI(Game(), player=state.current_player, workers=2)
+    stats = parallel.eval_with_stats(state)[1]
+    parallel.close()
+    assert (stats.value, stats.move, stats.depth) == (expected.value, expected.move, expected.depth)
+    assert AI(Game(), player=state.current_player).analyze(state) == AI(game, player=game.current_player).analyze(game)
@@ -0,0 +1,31 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import subprocess
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def loaded_after(statement):
+    """Run ``statement`` in a fresh interpreter and return which of pygame and numpy it imported."""
+    check = f"{statement}; import sys; print(sorted(m for m in ('pygame', 'numpy') if m in sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", check], cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+def test_engine_imports_without_pygame_or_numpy():
+    assert loaded_after(
+        "import src; from src.game import Game; from src.ai import AI; from src import constants; "
+        "import src.tournament, src.server, src.worker; AI(Game()).eval(Game())"
+    ) == "[]"
+
+
+def test_render_layer_is_imported_on_first_use():
+    assert "pygame" not in loaded_after("import src")
+    assert "pygame" in loaded_after("import src; src.board")
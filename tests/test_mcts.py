@@ -0,0 +1,49 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.ai import AI, MCTS_LEVEL
+from src.game import Game
+from src.mcts import MCTS
+
+
+def test_mcts_takes_immediate_win():
+    game = Game(ai_first=True, size=5, win_length=4)
+    # Three AI marks on the top row, with the fourth cell free
+    game.masks = [0b11000_00000, 0b00111]
+    game.current_player = 2
+    ai = AI(game, MCTS_LEVEL, node_limit=256, rng=random.Random(0))
+    row, col = ai.eval(game)
+    game.make_move(row, col)
+    assert game.final_state() == 2
+
+
+def test_mcts_leaves_game_untouched_and_reuses_tree():
+    game = Game(ai_first=True, size=4, win_length=3)
+    search = MCTS(batch_size=16, rng=random.Random(1))
+    masks, hashes = list(game.masks), list(game.hashes)
+    value, move = search.search(game, playout_limit=2000)
+    assert game.masks == masks and game.hashes == hashes
+    assert move in game.get_empty_squares() and -1 <= value <= 1
+    assert search.reused == 0 and search.playouts >= 2000
+
+    # The opponent's answer was explored, so the next search starts with its playouts
+    game.make_move(*move)
+    game.make_move(*game.get_empty_squares()[0])
+    search.search(game, playout_limit=4000)
+    assert search.reused > 0
+
+
+def test_mcts_level_reports_stats():
+    game = Game(ai_first=True)
+    ai = AI(game, MCTS_LEVEL, node_limit=512, rng=random.Random(2))
+    move, stats = ai.eval_with_stats(game)
+    assert stats.method == "mcts" and stats.move == move
+    assert stats.nodes >= 512 and stats.depth > 0
@@ -0,0 +1,82 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import pytest
+
+from src import record
+from src import tournament
+from src.game import Game
+from src.record import GameRecord, RecordWriter, read_records, replay
+from src.tournament import TournamentConfig, run
+
+
+def test_tournament_games_round_trip_through_record_file(tmp_path):
+    path = str(tmp_path / "games.twr")
+    config = TournamentConfig(p1_level=0, p2_level=0, seed=7, record=True)
+    # Two writers append to the same file
+    with RecordWriter(path) as writer:
+        first = run(config, 30, chunk_size=10, writer=writer)
+    with RecordWriter(path) as writer:
+        run(config._replace(size=5, win_length=4), 5, writer=writer)
+
+    games = list(read_records(path))
+    assert len(games) == 35
+    assert sum(game.result == 0 for game in games[:30]) == first.summary()["results"]["draw"]
+    for game_record in games:
+        game = replay(game_record)
+        assert game.final_state() == game_record.result
+        assert GameRecord.from_game(game, game_record.levels, game_record.seed) == game_record
+
+    # Moves take half a byte on 3x3, after a fixed header
+    sizes = [record.HEADER.size + (len(game.moves) + 1) // 2 for game in games[:30]]
+    assert len(record.encode(games[0])) == sizes[0]
+    assert os.path.getsize(path) == len(record.MAGIC) + sum(sizes) + sum(
+        len(record.encode(game)) for game in games[30:]
+    )
+
+
+def test_recorded_seed_reproduces_each_game(tmp_path):
+    config = TournamentConfig(p1_level=0, p2_level=0, seed=11, record=True)
+    files = []
+    for workers, chunk_size in ((0, 4), (2, 3)):
+        path = str(tmp_path / f"games-{workers}.twr")
+        with RecordWriter(path) as writer:
+            run(config, 12, workers=workers, chunk_size=chunk_size, writer=writer)
+        with open(path, "rb") as file:
+            files.append(file.read())
+    # The same seed writes the same file, whatever the workers and chunks
+    assert files[0] == files[1]
+
+    for game_record in read_records(str(tmp_path / "games-0.twr")):
+        game = Game(ai_first=game_record.first_player == 2)
+        rng = random.Random()
+        players = tournament._players(game, config, rng)
+        tournament.seed_players(players, rng, game_record.seed)
+        result = tournament.TournamentResult()
+        tournament.play_game(game, players, result, game_record.seed)
+        assert result.records == [game_record]
+
+
+def test_reader_and_replay_reject_bad_data(tmp_path):
+    path = tmp_path / "games.twr"
+    game_record = GameRecord(3, 3, 1, (None, 1), 0, None, (4, 4))
+    path.write_bytes(record.MAGIC + record.encode(game_record)[:-1])
+    with pytest.raises(ValueError):
+        list(read_records(str(path)))
+
+    path.write_bytes(record.MAGIC + record.encode(game_record))
+    (decoded,) = read_records(str(path))
+    assert decoded == game_record
+    with pytest.raises(ValueError):
+        replay(decoded)
+
+    # Games are never appended to a file of another format
+    foreign = tmp_path / "notes.txt"
+    foreign.write_bytes(b"not a record file")
+    with pytest.raises(ValueError):
+        RecordWriter(str(foreign))
+    assert foreign.read_bytes() == b"not a record file"
@@ -0,0 +1,79 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import random
+
+from src.client import Client, play_random_games
+from src.game import Game
+from src.server import GameServer
+from src.tournament import LatencyStats
+
+
+async def serve(**options):
+    server = GameServer(**options)
+    await server.start(port=0)
+    return server
+
+
+def test_player_vs_player_rotates_like_game():
+    async def scenario():
+        server = await serve()
+        first = await Client.connect(port=server.port)
+        second = await Client.connect(port=server.port)
+
+        session = (await first.request("new", mode="pvp"))["session"]
+        assert (await second.request("join", session=session))["player"] == 2
+        assert (await first.events.get())["event"] == "joined"
+
+        game = Game(ai_first=False)
+        for client, (row, col) in zip([first, second, first, second], [(0, 0), (0, 1), (2, 0), (1, 1)]):
+            reply = await client.request("move", session=session, row=row, col=col)
+            game.handle_move(row, col)
+            assert reply["state"]["board"] == [list(cells) for cells in game.board]
+            event = await (second if client is first else first).events.get()
+            assert event["state"] == reply["state"]
+
+        # ai_first must be a JSON boolean, not a string such as "false"
+        assert (await first.request("new", mode="pvp", ai_first="false"))["error"] == "ai_first must be true or false"
+
+        # Moving out of turn or on a taken cell is refused
+        assert (await second.request("move", session=session, row=2, col=2))["error"] == "not your turn"
+        taken = next((r, c) for r in range(3) for c in range(3) if game.board[r][c])
+        assert (await first.request("move", session=session, row=taken[0], col=taken[1]))["error"] == "illegal move"
+
+        await second.close()
+        assert (await first.events.get())["event"] == "left"
+        await first.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_games_against_ai_and_memory_accounting():
+    async def scenario():
+        server = await serve(node_limit=200)
+        clients = [await Client.connect(port=server.port) for _ in range(8)]
+        latency = LatencyStats()
+        moves = await asyncio.gather(*(
+            play_random_games(client, 2, 1, random.Random(number), latency)
+            for number, client in enumerate(clients)
+        ))
+        assert all(count > 0 for count in moves)
+
+        session = (await clients[0].request("new", mode="ai", ai_first=True))["session"]
+        stats = (await clients[0].request("stats"))["stats"]
+        assert stats["sessions"] == 1 and stats["memory_bytes"] > 0
+        await clients[0].request("leave", session=session)
+        assert server.stats()["memory_bytes"] == 0
+
+        server.max_sessions = 0
+        assert (await clients[0].request("new"))["error"] == "server full"
+        for client in clients:
+            await client.close()
+        await server.close()
+
+    asyncio.run(scenario())
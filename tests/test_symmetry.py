@@ -0,0 +1,68 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import symmetry
+from src.game import Game
+
+
+def position(masks, player, size=3, win_length=3):
+    """Set up a game directly from its masks."""
+    game = Game(ai_first=player == 2, size=size, win_length=win_length)
+    for index, mask in enumerate(masks):
+        game.masks[index] = mask
+        for cell in range(game.layout.cells):
+            if mask >> cell & 1:
+                game._toggle_hash(index + 1, cell)
+    game.marked_squares = sum(bin(mask).count("1") for mask in masks)
+    return game
+
+
+def value(game, depth=0):
+    """Exhaustive minimax, scored for the player to move."""
+    state = game.final_state()
+    if state is not None:
+        win_score = game.layout.cells + 1
+        return 0 if state == 0 else (win_score - depth if state == game.current_player else depth - win_score)
+    best = float('-inf')
+    for move in game.get_empty_squares():
+        game.make_move(*move)
+        best = max(best, -value(game, depth + 1))
+        game.unmake_move()
+    return best
+
+
+def test_hashes_follow_every_symmetry():
+    game = Game(ai_first=False, size=4, win_length=3)
+    for move in [(0, 1), (2, 3), (1, 1), (3, 0), (0, 0)]:
+        game.make_move(*move)
+        for transform in range(symmetry.TRANSFORMS):
+            image = [symmetry.transform_mask(game.layout, mask, transform) for mask in game.masks]
+            assert position(image, game.current_player, 4, 3).hash == game.hashes[transform]
+
+
+def test_canonical_form_and_move_mapping():
+    game = Game(ai_first=False)
+    for move in [(0, 1), (1, 1), (2, 2)]:
+        game.make_move(*move)
+    form, transform = symmetry.canonical(game)
+    for t in range(symmetry.TRANSFORMS):
+        image = position([symmetry.transform_mask(game.layout, mask, t) for mask in game.masks], game.current_player)
+        assert symmetry.canonical(image)[0] == form
+        assert image.canonical_hash == game.canonical_hash
+
+    for move in game.get_empty_squares():
+        mapped = symmetry.to_canonical(game.layout, move, transform)
+        assert symmetry.from_canonical(game.layout, mapped, transform) == move
+
+
+def test_value_is_invariant_under_symmetries():
+    # The twist only rotates, yet reflections keep the value as well
+    for masks in ([0b000000001, 0b000000010], [0b000010000, 0b000000110], [0b100000001, 0b000010000]):
+        values = {
+            value(position([symmetry.transform_mask(position(masks, 1).layout, mask, t) for mask in masks], 1))
+            for t in range(symmetry.TRANSFORMS)
+        }
+        assert len(values) == 1
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import tournament
+from src.ai import SearchBudget
+from src.game import Game
+
+
+def test_tournament_is_reproducible_across_workers():
+    config = tournament.TournamentConfig(p1_level=0, p2_level=1, node_limit=300, seed=5)
+    inline = tournament.run(config, games=12, workers=0, chunk_size=4).summary()
+    pooled = tournament.run(config, games=12, workers=2, chunk_size=4).summary()
+
+    assert inline["games"] == 12
+    assert inline["results"] == pooled["results"]
+    assert inline["by_first_player"] == pooled["by_first_player"]
+    # First mover alternates like Game.reset
+    assert sum(inline["by_first_player"]["1"].values()) == 6
+    assert sum(inline["by_first_player"]["2"].values()) == 6
+
+
+def test_node_limited_tournament_ignores_the_clock():
+    config = tournament.TournamentConfig(p1_level=1, p2_level=1, size=4, win_length=3, node_limit=2000, seed=3)
+    players = tournament._players(Game(), config, None)
+    assert all(ai.budget == SearchBudget(node_limit=2000) for ai in players.values())
+
+    first = tournament.run(config, games=2, workers=0).summary()
+    second = tournament.run(config, games=2, workers=0).summary()
+    assert first["results"] == second["results"]
+    assert first["nodes"] == second["nodes"]
+
+
+def test_latency_percentiles():
+    stats = tournament.LatencyStats()
+    for microseconds in (10, 20, 30, 1000):
+        stats.add(microseconds / 1e6)
+    assert stats.count == 4
+    assert stats.percentile(0.5) <= 32e-6
+    assert stats.percentile(1.0) == stats.maximum
@@ -0,0 +1,33 @@
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+from src.ai import AI
+from src.game import Game
+from src.worker import AIWorker
+
+
+def test_cancelled_worker_can_start_again():
+    done = threading.Event()
+    worker = AIWorker(on_done=done.set)
+    assert worker.poll() == (False, None)
+
+    # A search that would run for a long time, cancelled right away
+    game = Game(ai_first=True, size=7, win_length=4)
+    worker.start(AI(game, time_limit=30.0), game)
+    assert worker.busy
+    worker.cancel()
+    assert not worker.busy and worker.poll() == (False, None)
+
+    done.clear()
+    worker.start(AI(game, node_limit=2000), game)
+    assert done.wait(30)
+    ready, move = worker.poll()
+    assert ready and move in game.get_empty_squares()
+    assert not worker.busy and worker.stats.move == move
+    # The move was searched on a copy
+    assert game.marked_squares == 0